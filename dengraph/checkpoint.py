@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Binary checkpoints of the state of a :py:class:`~dengraph.dengraph.DenGraphIO`
+
+A checkpoint stores the parameters and complete clustering state, but not
+the base graph. Restoring a checkpoint attaches the state to an existing base
+graph, which must contain the same nodes and edges as when the checkpoint was
+written. Neither clustering nor neighbour queries are performed on restore.
+
+.. code:: python
+
+    with open('clustering.dgcp', 'wb') as checkpoint:
+        write_checkpoint(clustering, checkpoint)
+    with open('clustering.dgcp', 'rb') as checkpoint:
+        clustering = read_checkpoint(checkpoint, base_graph)
+
+Nodes are interned as dense ids, and the state of nodes is stored as
+:py:class:`array.array` data indexed by id. Only the list of nodes itself is
+serialized via :py:mod:`pickle`, so checkpoints must come from trusted sources.
+"""
+from __future__ import absolute_import
+import array
+import json
+import pickle
+import struct
+import sys
+
+import dengraph.cluster
+import dengraph.dengraph
+import dengraph.events
+import dengraph.utilities.node_table
+
+
+#: identifier at the start of every checkpoint
+CHECKPOINT_MAGIC = b'DGCP'
+#: version of the checkpoint format
+CHECKPOINT_VERSION = 1
+
+_SIZE = struct.Struct('<Q')
+
+
+class CheckpointError(Exception):
+    """A checkpoint is malformed or does not match the base graph"""
+
+
+def _write_block(stream, data):
+    stream.write(_SIZE.pack(len(data)))
+    stream.write(data)
+
+
+def _read_block(stream):
+    size = _SIZE.unpack(_read_exactly(stream, _SIZE.size))[0]
+    return _read_exactly(stream, size)
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise CheckpointError('checkpoint is truncated')
+    return data
+
+
+def _array_bytes(values):
+    try:
+        return values.tobytes()
+    except AttributeError:  # python 2
+        return values.tostring()
+
+
+def _bytes_array(typecode, data, byteorder):
+    values = array.array(typecode)
+    try:
+        values.frombytes(data)
+    except AttributeError:  # python 2
+        values.fromstring(data)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+
+def write_checkpoint(clustering, stream):
+    """
+    Write the state of a clustering to a binary stream
+
+    :param clustering: the clustering to store
+    :type clustering: :py:class:`~dengraph.dengraph.DenGraphIO`
+    :param stream: binary stream to write to
+    :raises ValueError: if `clustering` does not maintain neighbour counts for incremental updates
+    """
+    neighbour_counts = clustering._neighbour_counts
+    node_table = dengraph.utilities.node_table.NodeTable(clustering.graph)
+    if len(neighbour_counts) != len(node_table):
+        raise ValueError('%s does not maintain state for incremental updates' % clustering.__class__.__name__)
+    clusters = list(clustering.clusters)
+    node_count = len(node_table)
+    states = array.array('b', [dengraph.events.NOISE_NODE]) * node_count
+    core_clusters = array.array('i', [-1]) * node_count
+    counts = array.array('i', (neighbour_counts[node] for node in node_table))
+    border_ids, border_clusters = array.array('i'), array.array('i')
+    for index, cluster in enumerate(clusters):
+        for node in cluster.core_nodes:
+            node_id = node_table.node_id(node)
+            states[node_id] = dengraph.events.CORE_NODE
+            core_clusters[node_id] = index
+        for node in cluster.border_nodes:
+            node_id = node_table.node_id(node)
+            states[node_id] = dengraph.events.BORDER_NODE
+            border_ids.append(node_id)
+            border_clusters.append(index)
+    header = {
+        'cluster_distance': clustering.cluster_distance,
+        'core_neighbours': clustering.core_neighbours,
+        'node_count': node_count,
+        'cluster_ids': [cluster.cluster_id for cluster in clusters],
+        'next_cluster_id': clustering.clusters.next_cluster_id,
+        'cluster_lineage': [
+            [cluster_id, lineage.relation, lineage.cluster_id]
+            for cluster_id, lineage in clustering.cluster_lineage.items()
+        ],
+        'byteorder': sys.byteorder,
+    }
+    stream.write(CHECKPOINT_MAGIC)
+    stream.write(struct.pack('<I', CHECKPOINT_VERSION))
+    _write_block(stream, json.dumps(header, sort_keys=True).encode('utf-8'))
+    _write_block(stream, pickle.dumps(list(node_table), protocol=2))
+    for values in (states, counts, core_clusters, border_ids, border_clusters):
+        _write_block(stream, values.typecode.encode('ascii') + _array_bytes(values))
+
+
+def read_checkpoint(stream, base_graph):
+    """
+    Restore a clustering of `base_graph` from a binary stream
+
+    :param stream: binary stream to read from
+    :param base_graph: the graph the checkpoint was written for
+    :returns: the restored clustering
+    :rtype: :py:class:`~dengraph.dengraph.DenGraphIO`
+    :raises CheckpointError: if the checkpoint is malformed or has different nodes than `base_graph`
+
+    The cost of restoring depends only on the size of the checkpoint. The
+    edges of `base_graph` are not verified.
+    """
+    if _read_exactly(stream, len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+        raise CheckpointError('not a checkpoint')
+    version = struct.unpack('<I', _read_exactly(stream, 4))[0]
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError('unsupported checkpoint version %d' % version)
+    header = json.loads(_read_block(stream).decode('utf-8'))
+    nodes = pickle.loads(_read_block(stream))
+    arrays = []
+    for _ in range(5):
+        data = _read_block(stream)
+        arrays.append(_bytes_array(data[:1].decode('ascii'), data[1:], header['byteorder']))
+    states, counts, core_clusters, border_ids, border_clusters = arrays
+    if not len(nodes) == len(states) == len(counts) == len(core_clusters) == header['node_count']:
+        raise CheckpointError('checkpoint is inconsistent')
+    if len(border_ids) != len(border_clusters):
+        raise CheckpointError('checkpoint is inconsistent')
+    if len(nodes) != len(base_graph):
+        raise CheckpointError('checkpoint and graph differ in size')
+    if not all(node in base_graph for node in nodes):
+        raise CheckpointError('checkpoint and graph differ in nodes')
+    clustering = dengraph.dengraph.DenGraphIO._unclustered(
+        base_graph, cluster_distance=header['cluster_distance'], core_neighbours=header['core_neighbours']
+    )
+    clusters = []
+    for cluster_id in header['cluster_ids']:
+        cluster = dengraph.cluster.DenGraphCluster(base_graph)
+        cluster.cluster_id = cluster_id
+        clusters.append(cluster)
+    neighbour_counts, noise = clustering._neighbour_counts, clustering.noise
+    for node_id, node in enumerate(nodes):
+        neighbour_counts[node] = counts[node_id]
+        if states[node_id] == dengraph.events.CORE_NODE:
+            clusters[core_clusters[node_id]].core_nodes.add(node)
+        elif states[node_id] == dengraph.events.NOISE_NODE:
+            noise.add(node)
+    for node_id, index in zip(border_ids, border_clusters):
+        clusters[index].border_nodes.add(nodes[node_id])
+    clustering.clusters = dengraph.cluster.ClusterRegistry(clusters, first_cluster_id=header['next_cluster_id'])
+    for cluster in clusters:
+        clustering._index_cluster(cluster)
+    for cluster_id, relation, other_id in header['cluster_lineage']:
+        clustering.cluster_lineage[cluster_id] = dengraph.dengraph.ClusterLineage(relation, other_id)
+    return clustering
@@ -1,6 +1,10 @@
 from __future__ import absolute_import
+import itertools
+
+import dengraph.compat
 import dengraph.graph
 import dengraph.utilities.pretty
+import dengraph.utilities.memory
 
 
 class GraphError(Exception):
@@ -17,6 +21,8 @@ class DenGraphCluster(dengraph.graph.Graph):
     :type core_nodes: set or None
     :param border_nodes: initial set of border nodes
     :type border_nodes: set or None
+
+    :ivar cluster_id: identifier of the cluster, assigned when it is added to a :py:class:`~.ClusterRegistry`
     """
     CORE_NODE = 1
     BORDER_NODE = 2
@@ -25,6 +31,7 @@ class DenGraphCluster(dengraph.graph.Graph):
         self.graph = graph
         self.core_nodes = set(core_nodes) if core_nodes is not None else set()
         self.border_nodes = set(border_nodes) if border_nodes is not None else set()
+        self.cluster_id = None
 
     @property
     def symmetric(self):
@@ -99,12 +106,13 @@ class DenGraphCluster(dengraph.graph.Graph):
         if isinstance(self, other.__class__):
             if self.graph != other.graph:
                 raise GraphError
-            if self == other:
+            if self is other:
                 return self
+            # only touch the nodes of other, which is usually the smaller cluster
             self.core_nodes.update(other.core_nodes)
-            self.border_nodes.update(other.border_nodes)
-            # ensure that none of the core nodes are in list of border nodes
-            self.border_nodes = self.border_nodes - self.core_nodes
+            self.border_nodes.difference_update(other.core_nodes)
+            core_nodes = self.core_nodes
+            self.border_nodes.update(node for node in other.border_nodes if node not in core_nodes)
             return self
         return NotImplemented
 
@@ -173,12 +181,15 @@ class FrozenDenGraphCluster(DenGraphCluster):
     Clusters of this type cannot be modified but behave properly in `dict` and other mappings.
     """
     def __init__(self, graph, core_nodes=None, border_nodes=None):
+        cluster_id = None
         if isinstance(graph, DenGraphCluster):
             assert core_nodes is None and border_nodes is None, "Cloning takes only one argument"
             core_nodes = graph.core_nodes
             border_nodes = graph.border_nodes
+            cluster_id = graph.cluster_id
             graph = graph.graph
         super(FrozenDenGraphCluster, self).__init__(graph, core_nodes=core_nodes, border_nodes=border_nodes)
+        self.cluster_id = cluster_id
         self.core_nodes = frozenset(self.core_nodes)
         self.border_nodes = frozenset(self.border_nodes)
 
@@ -193,3 +204,137 @@ class FrozenDenGraphCluster(DenGraphCluster):
 
     def __isub__(self, other):
         raise TypeError('%s object does not support content modification' % self.__class__.__name__)
+
+
+class ClusterRegistry(dengraph.compat.collections_abc.Sequence):
+    """
+    Sequence of clusters, ordered by size
+
+    :param clusters: initial clusters
+    :type clusters: iterable[:py:class:`~.DenGraphCluster`]
+    :param first_cluster_id: the id of the first new cluster
+
+    Clusters are added and removed by identity in constant time. Iteration and
+    indexing provide a view ordered by :py:meth:`sort`, which defaults to the
+    size of clusters. As clusters may change their size in place, calling
+    :py:meth:`sort` marks the view as outdated. The view is only reordered
+    once it is used again, which is cheap for a view that is nearly ordered.
+
+    Every cluster without a :py:attr:`~.DenGraphCluster.cluster_id` receives
+    the next free id, starting at `first_cluster_id`, when it is added. Ids
+    are never reused by a registry.
+    """
+    def __init__(self, clusters=(), first_cluster_id=0):
+        self._cluster_ids = itertools.count(first_cluster_id)
+        self._members = {}  # {id(cluster): cluster, ...}
+        self._view = []
+        self._sort_key, self._sort_reverse = len, False
+        self._unsorted = self._pruned = False
+        self.extend(clusters)
+
+    def append(self, cluster):
+        """Add `cluster`, unless it is already part of the registry"""
+        if self._members.get(id(cluster)) is not cluster:
+            if cluster.cluster_id is None:
+                cluster.cluster_id = next(self._cluster_ids)
+            self._members[id(cluster)] = cluster
+            self._view.append(cluster)
+            self._unsorted = True
+
+    def extend(self, clusters):
+        """Add all `clusters`"""
+        for cluster in clusters:
+            self.append(cluster)
+
+    def discard(self, cluster):
+        """Remove `cluster` if it is part of the registry"""
+        if self._members.get(id(cluster)) is cluster:
+            del self._members[id(cluster)]
+            self._pruned = True
+
+    def remove(self, cluster):
+        """
+        Remove `cluster`
+
+        :raises ValueError: if `cluster` is not part of the registry
+
+        Clusters are removed by identity. Like for a :py:class:`list`, a
+        cluster which is only equal to `cluster` is removed otherwise.
+        """
+        if self._members.get(id(cluster)) is not cluster:
+            for member in self:
+                if member == cluster:
+                    cluster = member
+                    break
+            else:
+                raise ValueError('%s.remove(x): x not in registry' % self.__class__.__name__)
+        self.discard(cluster)
+
+    def clear(self):
+        """Remove all clusters"""
+        self._members.clear()
+        self._view = []
+        self._unsorted = self._pruned = False
+
+    @property
+    def next_cluster_id(self):
+        """The id the next new cluster receives"""
+        cluster_id = next(self._cluster_ids)
+        self._cluster_ids = itertools.count(cluster_id)
+        return cluster_id
+
+    def sort(self, key=len, reverse=False):
+        """
+        Order clusters by `key`
+
+        The order is updated lazily, the next time the clusters are accessed.
+        """
+        self._sort_key, self._sort_reverse = key, reverse
+        self._unsorted = True
+
+    def _ordered(self):
+        """Get the up-to-date view of all clusters"""
+        if self._pruned:
+            members, seen, view = self._members, set(), []
+            for cluster in self._view:
+                if members.get(id(cluster)) is cluster and id(cluster) not in seen:
+                    seen.add(id(cluster))
+                    view.append(cluster)
+            self._view, self._pruned = view, False
+        if self._unsorted:
+            self._view.sort(key=self._sort_key, reverse=self._sort_reverse)
+            self._unsorted = False
+        return self._view
+
+    def memory_usage(self):
+        """Estimate the bytes used by the registry, excluding the clusters themselves"""
+        return dengraph.utilities.memory.sizeof_containers((self, self._members, self._view))
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(self._ordered())
+
+    def __getitem__(self, item):
+        return self._ordered()[item]
+
+    def __contains__(self, cluster):
+        if self._members.get(id(cluster)) is cluster:
+            return True
+        return any(member == cluster for member in self._members.values())
+
+    def __eq__(self, other):
+        if isinstance(other, (ClusterRegistry, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (ClusterRegistry, list, tuple)):
+            return list(self) != list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self._ordered())
@@ -1,14 +1,33 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
+import array
+import collections
+import contextlib
+
+import dengraph.compat
 import dengraph.graph
 import dengraph.cluster
+import dengraph.events
 import dengraph.utilities.pretty
+import dengraph.utilities.disjoint_set
+import dengraph.utilities.memory
 
 
 class NoSuchCluster(Exception):
     pass
 
 
+#: labels of nodes as returned by :py:meth:`DenGraphIO.cluster_labels`
+ClusterLabels = collections.namedtuple('ClusterLabels', ['labels', 'core_mask', 'overlaps'])
+
+#: relation of a cluster id that was merged into the cluster with `cluster_id`
+MERGED_INTO = 'merged_into'
+#: relation of a cluster id that was split off from the cluster with `cluster_id`
+SPLIT_FROM = 'split_from'
+#: lineage of a cluster id, see :py:attr:`DenGraphIO.cluster_lineage`
+ClusterLineage = collections.namedtuple('ClusterLineage', ['relation', 'cluster_id'])
+
+
 class DenGraphIO(dengraph.graph.Graph):
     """
     Density Graph Clustering allowing for Overlap and Incremental updates.
@@ -16,6 +35,14 @@ class DenGraphIO(dengraph.graph.Graph):
     :param base_graph: the underlying graph
     :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
     :param core_neighbours: number of neighbours required for core nodes (η)
+
+    :ivar event_listeners: callables receiving every :py:mod:`~dengraph.events` event after each update
+    :ivar cluster_lineage: mapping of `{cluster_id: lineage, ...}` for merged and split clusters
+
+    Every cluster has a stable :py:attr:`~dengraph.cluster.DenGraphCluster.cluster_id`.
+    When clusters are merged or split, the largest part keeps its id. The
+    :py:attr:`cluster_lineage` tracks which ids have been merged into or
+    split off from which other ids.
     """
 
     def __init__(self, base_graph, cluster_distance, core_neighbours):
@@ -24,24 +51,168 @@ class DenGraphIO(dengraph.graph.Graph):
         :param cluster_distance: eta
         :param core_neighbours: epsilon
         """
+        self._init_state(base_graph, cluster_distance, core_neighbours)
+        self._init_cluster()
+
+    @classmethod
+    def _unclustered(cls, base_graph, cluster_distance, core_neighbours):
+        """Create an instance with empty state, without performing the initial clustering"""
+        self = cls.__new__(cls)
+        self._init_state(base_graph, cluster_distance, core_neighbours)
+        return self
+
+    def _init_state(self, base_graph, cluster_distance, core_neighbours):
+        """Set the parameters and empty state"""
         if not base_graph.symmetric:
             raise ValueError('undefined behaviour for unsymmetric graphs')
         self.graph = base_graph
         self.cluster_distance = cluster_distance
         self.core_neighbours = core_neighbours
-        self.clusters = []
+        self.clusters = dengraph.cluster.ClusterRegistry()
         self.noise = set()
-        self._init_cluster()
+        # reverse index of cluster membership
+        self._core_cluster = {}  # {node: cluster, ...} for core nodes
+        self._border_clusters = {}  # {node: {cluster, cluster, ...}, ...} for border nodes
+        # number of neighbours within cluster_distance, maintained on updates
+        self._neighbour_counts = {}  # {node: count, ...}
+        self.event_listeners = []
+        self.cluster_lineage = {}  # {cluster_id: ClusterLineage, ...}
+        # changes during an update, only tracked if there are listeners
+        self._touched_nodes = None  # {node: state_before_update, ...}
+        self._events = None
+
+    @contextlib.contextmanager
+    def _update(self):
+        """Context of an update, after which all changes are emitted to the `event_listeners`"""
+        if not self.event_listeners or self._events is not None:
+            yield
+            return
+        self._touched_nodes, self._events = {}, []
+        try:
+            yield
+        finally:
+            events, touched_nodes = self._events, self._touched_nodes
+            self._touched_nodes = self._events = None
+            for node, old_state in dengraph.compat.viewitems(touched_nodes):
+                new_state = self._node_state(node)
+                if new_state != old_state:
+                    events.append(dengraph.events.NodeChanged(node, old_state, new_state))
+            for event in events:
+                for listener in self.event_listeners:
+                    listener(event)
+
+    def _node_state(self, node):
+        """Get the state of `node`, which is `None` if the node is unknown"""
+        if node in self._core_cluster:
+            return dengraph.events.CORE_NODE
+        elif node in self._border_clusters:
+            return dengraph.events.BORDER_NODE
+        elif node in self.noise:
+            return dengraph.events.NOISE_NODE
+        return None
+
+    def _touch(self, node):
+        """Mark the state of `node` as possibly changing during the current update"""
+        if self._touched_nodes is not None and node not in self._touched_nodes:
+            self._touched_nodes[node] = self._node_state(node)
+
+    def _emit(self, event):
+        """Emit `event` at the end of the current update"""
+        if self._events is not None:
+            self._events.append(event)
 
     def _merge_clusters(self, base_cluster, cluster):
+        """
+        Merge two clusters, folding the smaller into the larger one
+
+        :return: the merged cluster, which is the larger of both
+
+        The cost of merging depends only on the size of the smaller cluster.
+        """
+        if base_cluster is cluster:
+            return base_cluster
+        if len(base_cluster) < len(cluster):
+            base_cluster, cluster = cluster, base_cluster
         base_cluster += cluster
-        if base_cluster != cluster:
-            try:
-                self.clusters.remove(cluster)
-            except ValueError:
-                pass
+        # redirect membership of the absorbed cluster
+        core_index, border_index = self._core_cluster, self._border_clusters
+        for node in cluster.core_nodes:
+            core_index[node] = base_cluster
+            self._unindex_border(node, base_cluster)
+        for node in cluster.border_nodes:
+            self._unindex_border(node, cluster)
+            if node not in base_cluster.core_nodes:
+                border_index.setdefault(node, set()).add(base_cluster)
+        self.clusters.discard(cluster)
+        self.cluster_lineage[cluster.cluster_id] = ClusterLineage(MERGED_INTO, base_cluster.cluster_id)
+        self._emit(dengraph.events.ClustersMerged(base_cluster, cluster))
         return base_cluster
 
+    def current_cluster_id(self, cluster_id):
+        """
+        Get the id of the cluster into which `cluster_id` has been merged
+
+        :param cluster_id: id of any current or previous cluster
+        :return: id of the cluster containing the former cluster, which is `cluster_id` if it was not merged
+        """
+        lineage = self.cluster_lineage.get(cluster_id)
+        while lineage is not None and lineage.relation == MERGED_INTO:
+            cluster_id = lineage.cluster_id
+            lineage = self.cluster_lineage.get(cluster_id)
+        return cluster_id
+
+    def _split_lineage(self, cluster, parts):
+        """
+        Pass the id of `cluster` to the largest of `parts` split off from it
+
+        The size of parts is judged by their core nodes, as border nodes may
+        not be updated yet. All other parts are recorded as split off from
+        the one keeping the id.
+        """
+        largest = max(parts, key=lambda part: len(part.core_nodes))
+        if len(largest.core_nodes) > len(cluster.core_nodes):
+            cluster.cluster_id, largest.cluster_id = largest.cluster_id, cluster.cluster_id
+        else:
+            largest = cluster
+        for part in [cluster] + list(parts):
+            if part is not largest:
+                self.cluster_lineage[part.cluster_id] = ClusterLineage(SPLIT_FROM, largest.cluster_id)
+
+    def _unindex_border(self, node, cluster):
+        """Remove `cluster` from the border index of `node`"""
+        self._touch(node)
+        try:
+            border_clusters = self._border_clusters[node]
+        except KeyError:
+            return
+        border_clusters.discard(cluster)
+        if not border_clusters:
+            del self._border_clusters[node]
+
+    def _index_cluster(self, cluster):
+        """Add all nodes of `cluster` to the membership index"""
+        core_index, border_index = self._core_cluster, self._border_clusters
+        for node in cluster.core_nodes:
+            self._touch(node)
+            core_index[node] = cluster
+        for node in cluster.border_nodes:
+            self._touch(node)
+            border_index.setdefault(node, set()).add(cluster)
+
+    def _unindex_cluster(self, cluster):
+        """Remove all nodes of `cluster` from the membership index"""
+        core_index = self._core_cluster
+        for node in cluster.core_nodes:
+            self._touch(node)
+            if core_index.get(node) is cluster:
+                del core_index[node]
+        for node in cluster.border_nodes:
+            self._unindex_border(node, cluster)
+
+    def _is_clustered(self, node):
+        """Whether `node` belongs to any cluster"""
+        return node in self._core_cluster or node in self._border_clusters
+
     def core_cluster_for_node(self, core_node):
         """
         Method determines the current clusters a node belongs to and is labeled as core node.
@@ -50,10 +221,10 @@ class DenGraphIO(dengraph.graph.Graph):
         :return: Cluster that nas node as a core node
         :raise: NoSuchCluster
         """
-        for cluster in self.clusters:
-            if core_node in cluster.core_nodes:
-                return cluster
-        raise NoSuchCluster
+        try:
+            return self._core_cluster[core_node]
+        except KeyError:
+            raise NoSuchCluster
 
     def clusters_for_node(self, node):
         """
@@ -62,173 +233,451 @@ class DenGraphIO(dengraph.graph.Graph):
         :param node: the node to check clusters for
         :return: Cluster generator
         """
-        for cluster in self.clusters:
-            if node in cluster:
-                yield cluster
-
-    def _add_node_to_cluster(self, node, cluster, state):
-        """Mark a node as belonging to a specific cluster"""
-        cluster.categorize_node(node, state)
-        self.noise.discard(node)
+        try:
+            yield self._core_cluster[node]
+        except KeyError:
+            pass
+        for cluster in tuple(self._border_clusters.get(node, ())):
+            yield cluster
 
-    def _test_change_to_core(self, node):
+    def cluster_labels(self, nodes=None):
         """
-        Method determines if a given node does become a core node. This method returns False,
-        if the node is already a core node.
+        Get the cluster label of each node, similar to `labels_` of :py:mod:`sklearn`
+
+        :param nodes: the nodes to label, in order, defaults to all nodes of the graph
+        :return: labels, core mask and overlaps of `nodes`
+        :rtype: :py:class:`~.ClusterLabels`
+        :raises NoSuchNode: if any of `nodes` is not part of the graph
 
-        :param node: The node to check
-        :return: True, if node changes to core node, False otherwise
+        The label of a cluster is its index in :py:attr:`clusters`, and
+        noise has the label `-1`. All results are aligned to `nodes`:
+
+        `labels`
+            :py:class:`array.array` of the label of each node;
+            border nodes of several clusters have the smallest label
+
+        `core_mask`
+            :py:class:`array.array` of `1` for each core node and `0` otherwise
+
+        `overlaps`
+            mapping of `{index: (label, ...), ...}` for border nodes of
+            several clusters, holding all labels besides the one in `labels`
+
+        The labels are computed in a single pass over `nodes`.
         """
-        result = False
-        # determine the neighbours of current node
-        neighbours = set(self.graph.get_neighbours(node, self.cluster_distance))
-        try:
-            cluster = self.core_cluster_for_node(core_node=node)
-        except NoSuchCluster:
-            result = len(neighbours) >= self.core_neighbours
-            cluster = None
-        # return the current result and also the neighbours for further reference
-        return result, cluster, neighbours
-
-    def _test_change_from_core(self, node):
-        result = False
-        neighbours = set(self.graph.get_neighbours(node, self.cluster_distance))
-        try:
-            cluster = self.core_cluster_for_node(core_node=node)
-        except NoSuchCluster:
-            # node was no core before, so False is returned
-            cluster = None
+        nodes = self.graph if nodes is None else nodes
+        cluster_labels = {id(cluster): label for label, cluster in enumerate(self.clusters)}
+        labels, core_mask, overlaps = array.array('i'), array.array('b'), {}
+        for index, node in enumerate(nodes):
+            clusters = list(self.clusters_for_node(node))
+            if not clusters:
+                if node not in self.graph:
+                    raise dengraph.graph.NoSuchNode
+                labels.append(-1)
+                core_mask.append(0)
+                continue
+            if len(clusters) == 1:
+                labels.append(cluster_labels[id(clusters[0])])
+                core_mask.append(1 if node in clusters[0].core_nodes else 0)
+                continue
+            node_labels = sorted(cluster_labels[id(cluster)] for cluster in clusters)
+            labels.append(node_labels[0])
+            core_mask.append(0)
+            overlaps[index] = tuple(node_labels[1:])
+        return ClusterLabels(labels, core_mask, overlaps)
+
+    def _add_node_to_cluster(self, node, cluster, state):
+        """Mark a node as belonging to a specific cluster"""
+        self._touch(node)
+        cluster.categorize_node(node, state)
+        if state == cluster.CORE_NODE:
+            self._core_cluster[node] = cluster
+            self._unindex_border(node, cluster)
         else:
-            result = len(neighbours) < self.core_neighbours
-        return result, cluster, neighbours
-
-    # TODO: to be changed
-    def _recluster(self, cluster):
-        clustering = DenGraphIO(
-            base_graph=cluster,
-            cluster_distance=self.cluster_distance,
-            core_neighbours=self.core_neighbours
-        )
-        self.noise.update(clustering.noise)
-        self.clusters.remove(cluster)
-        self.clusters.extend(clustering.clusters)
+            if self._core_cluster.get(node) is cluster:
+                del self._core_cluster[node]
+            self._border_clusters.setdefault(node, set()).add(cluster)
+        self.noise.discard(node)
 
     def _cluster_removed(self, cluster):
-        for node in cluster.border_nodes:
-            clusters = self.clusters_for_node(node=node)
-            try:
-                # check whether there is at least one additional cluster containing node
-                next(clusters)
-                next(clusters)
-            except StopIteration:
+        self._unindex_cluster(cluster)
+        for node in cluster:
+            # nodes not contained in any additional cluster become noise
+            if not self._is_clustered(node):
                 self.noise.add(node)
-        try:
-            self.clusters.remove(cluster)
-        except ValueError:
-            pass
+        self.clusters.discard(cluster)
+        self._emit(dengraph.events.ClusterRemoved(cluster))
+
+    def _remove_noise(self, candidates):
+        for candidate in candidates:
+            # noise is contained in no clusters
+            if not self._is_clustered(candidate):
+                self.noise.add(candidate)
 
     def _cluster_added(self, cluster):
+        self._index_cluster(cluster)
         for node in cluster:
             self.noise.discard(node)
         self.clusters.append(cluster)
 
-    def _validate_cluster(self, cluster, nodes, base=None):
-        unchecked, checked = set(nodes), set(nodes)
-        tmp_cluster = dengraph.cluster.DenGraphCluster(graph=self.graph)
-        while unchecked:
-            checking = unchecked.pop()
-            if checking == base:
-                return
-            neighbours = set(cluster.get_neighbours(node=checking,
-                                                distance=self.cluster_distance))
-            if len(neighbours) >= self.core_neighbours:
-                tmp_cluster.categorize_node(checking, tmp_cluster.CORE_NODE)
-                self._expand_unchecked(unchecked=unchecked, checked=checked, neighbours=neighbours)
-            elif neighbours:
-                tmp_cluster.categorize_node(checking, tmp_cluster.BORDER_NODE)
-        return tmp_cluster
+    def _split_cluster(self, cluster, seeds, neighbourhoods):
+        """
+        Split off all parts of `cluster` which are no longer connected to its other core nodes
 
-    def _remove_noise(self, candidates):
-        for candidate in candidates:
-            clusters = self.clusters_for_node(node=candidate)
-            try:
-                # noise is contained in no clusters
-                next(clusters)
-            except StopIteration:
-                self.noise.add(candidate)
+        :param cluster: cluster whose core nodes may no longer be connected
+        :param seeds: core nodes of `cluster` which may have lost their connection
+        :param neighbourhoods: known neighbours of nodes, which is extended for all explored nodes
+        :return: nodes of split off parts, which may have to change their clusters
 
-    def _edge_removed(self, node):
-        is_downgraded, cluster, _ = self._test_change_from_core(node=node)
-        if is_downgraded:
-            self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.BORDER_NODE)
-            if not cluster.core_nodes:
-                # remove cluster
-                self._cluster_removed(cluster=cluster)
+        Every part of `cluster` that is no longer connected must contain one of
+        the `seeds`. A search is started from each seed, and searches expand one
+        node each in turn. Searches which meet are merged, until only a single
+        search remains. Any search exhausted before that has explored a separate
+        part, which is split off as a new cluster. The cost is bounded by the
+        size of the separated parts, not by the size of `cluster`.
+        """
+        core_nodes = cluster.core_nodes
+        searches = dengraph.utilities.disjoint_set.DisjointSet(seeds)
+        explored = {seed: seed for seed in seeds}  # {node: seed of search which found it, ...}
+        frontiers = {seed: [seed] for seed in seeds}  # {search: [node, ...], ...}
+        parts = {seed: [seed] for seed in seeds}  # {search: [node, ...], ...}
+        split_parts = []
+        while len(frontiers) > 1:
+            for search in list(frontiers):
+                if len(frontiers) <= 1:
+                    break
+                if search not in frontiers:  # merged into another search
+                    continue
+                if not frontiers[search]:
+                    del frontiers[search]
+                    split_parts.append(self._split_part(cluster, parts.pop(search), neighbourhoods))
+                    continue
+                checking = frontiers[search].pop()
+                for neighbour in self._explore(checking, neighbourhoods):
+                    if neighbour not in core_nodes:
+                        continue
+                    try:
+                        other_search = searches.find(explored[neighbour])
+                    except KeyError:
+                        explored[neighbour] = search
+                        frontiers[search].append(neighbour)
+                        parts[search].append(neighbour)
+                        continue
+                    if other_search is not search:
+                        searches.union(search, other_search)
+                        search, other_search = (
+                            (search, other_search) if searches.find(search) is search else (other_search, search)
+                        )
+                        for pending in (frontiers, parts):
+                            if len(pending[search]) < len(pending[other_search]):
+                                pending[search], pending[other_search] = pending[other_search], pending[search]
+                            pending[search].extend(pending.pop(other_search))
+        adjacent = set()
+        if split_parts:
+            self._split_lineage(cluster, split_parts)
+            for part in split_parts:
+                adjacent.update(part)
+        return adjacent
+
+    def _split_part(self, cluster, core_nodes, neighbourhoods):
+        """
+        Move `core_nodes` from `cluster` to a new cluster
 
-    def _check_cluster(self, nodes, core_cluster):
-        missing = set(nodes)
+        :return: the new cluster, with all neighbours of `core_nodes` as border nodes
+        """
+        this_cluster = dengraph.cluster.DenGraphCluster(self.graph, core_nodes=core_nodes)
+        cluster.core_nodes.difference_update(this_cluster.core_nodes)
+        adjacent = set()
+        for node in this_cluster.core_nodes:
+            adjacent.update(neighbourhoods[node])
+        this_cluster.border_nodes.update(adjacent - this_cluster.core_nodes)
+        self._cluster_added(this_cluster)
+        self._emit(dengraph.events.ClusterSplit(cluster, this_cluster))
+        return this_cluster
+
+    def _explore(self, node, neighbourhoods):
+        """Get the neighbours of `node` when a search for split off parts reaches it"""
+        return self._cached_neighbours(node, neighbourhoods)
+
+    def _cached_neighbours(self, node, neighbourhoods):
+        """Get the neighbours of `node`, querying the graph only if they are not in `neighbourhoods`"""
         try:
-            new_cluster = self._validate_cluster(cluster=core_cluster, nodes=[missing.pop()])
-            missing -= new_cluster.core_nodes
-            noise = core_cluster.core_nodes.union(core_cluster.border_nodes) - \
-                new_cluster.core_nodes - new_cluster.border_nodes
-            while missing:
-                split_cluster = self._validate_cluster(cluster=core_cluster, nodes=[missing.pop()])
-                if split_cluster.core_nodes:
-                    self._cluster_added(split_cluster)
-                    noise -= split_cluster.core_nodes.union(split_cluster.border_nodes)
-                    missing -= split_cluster.core_nodes
-            self._cluster_removed(cluster=core_cluster)
-            if new_cluster.core_nodes:
-                self._cluster_added(new_cluster)
-            self._remove_noise(candidates=noise)
+            return neighbourhoods[node]
         except KeyError:
-            if len(core_cluster.core_nodes) <= 1:
-                self._cluster_removed(core_cluster)
+            neighbours = neighbourhoods[node] = set(self.graph.get_neighbours(
+                node=node, distance=self.cluster_distance
+            ))
+            self._neighbour_counts[node] = len(neighbours)
+            return neighbours
 
-    def _node_removed(self, node, neighbours):
-        if node not in self.noise:
-            for neighbour in neighbours:
-                del self.graph[node:neighbour]
-                self._edge_removed(node=neighbour)
-            cluster = self.core_cluster_for_node(core_node=node)
-            self._check_cluster(
-                nodes=[neighbour for neighbour in neighbours if neighbour in cluster.core_nodes],
-                core_cluster=cluster)
-        self.noise.discard(node)
+    def _items_removed(self, nodes, edges):
+        """
+        Method removes a batch of nodes and edges from the graph and updates the clustering once.
+
+        :param nodes: The nodes to remove
+        :param edges: The edges to remove, as `slice` of their nodes
 
-    def _merge_neighbours(self, neighbours, cluster):
-        for neighbour in neighbours:
+        All core nodes which are downgraded are determined first, using the
+        neighbour counts of nodes. Afterwards, each cluster which may have been
+        split is validated exactly once, by searching only around the removed
+        connections.
+        """
+        core_index, cluster_distance = self._core_cluster, self.cluster_distance
+        counts = self._neighbour_counts
+        removed = set(nodes)
+        removed_neighbourhoods = {}
+        for node in removed:
+            removed_neighbourhoods[node] = set(self.graph.get_neighbours(node=node, distance=cluster_distance))
+        # edges of removed nodes vanish along with them
+        removed_edges, edge_nodes = [], set()
+        for edge in edges:
+            if edge.start not in removed and edge.stop not in removed:
+                if frozenset((edge.start, edge.stop)) not in edge_nodes:
+                    edge_nodes.add(frozenset((edge.start, edge.stop)))
+                    removed_edges.append(edge)
+        # nodes whose neighbourhood shrinks
+        candidates = set()
+        for neighbours in dengraph.compat.viewvalues(removed_neighbourhoods):
+            candidates.update(neighbours)
+        # core nodes that may have lost their connection to the rest of their cluster
+        seeds = set()
+        neighbour_edges = [edge for edge in removed_edges if self.graph[edge] <= cluster_distance]
+        for edge in neighbour_edges:
+            candidates.add(edge.start)
+            candidates.add(edge.stop)
+            if edge.start in core_index and edge.stop in core_index:
+                seeds.add(edge.start)
+                seeds.add(edge.stop)
+        for edge in removed_edges:
+            del self.graph[edge]
+        for node in removed:
+            del self.graph[node]
+        candidates -= removed
+        for node in removed:
+            counts.pop(node, None)
+            for neighbour in removed_neighbourhoods[node]:
+                if neighbour not in removed:
+                    counts[neighbour] -= 1
+        for edge in neighbour_edges:
+            for node in {edge.start, edge.stop}:
+                counts[node] -= 1
+        affected = set()  # clusters which lost core nodes
+        for node in removed:
+            self._touch(node)
+            for cluster in list(self.clusters_for_node(node=node)):
+                if node in cluster.core_nodes:
+                    affected.add(cluster)
+                    seeds.update(removed_neighbourhoods[node])
+                else:
+                    self._unindex_border(node, cluster)
+                del cluster[node]
+            core_index.pop(node, None)
+            self.noise.discard(node)
+        neighbourhoods = {}
+        for node in list(candidates):
             try:
-                neighbouring_cluster = self.core_cluster_for_node(core_node=neighbour)
-                cluster = self._merge_clusters(neighbouring_cluster, cluster)
-            except NoSuchCluster:
-                # node is no core
-                self._add_node_to_cluster(node=neighbour, cluster=cluster, state=cluster.BORDER_NODE)
-        return cluster
-
-    def _edge_added(self, nodes, new_node=None):
+                cluster = core_index[node]
+            except KeyError:
+                continue
+            if counts[node] < self.core_neighbours:
+                # node is no longer core; it is categorized with the other candidates
+                neighbours = self._cached_neighbours(node, neighbourhoods)
+                self._touch(node)
+                del core_index[node]
+                cluster.core_nodes.discard(node)
+                affected.add(cluster)
+                seeds.update(neighbours)
+                candidates.update(neighbours)
+        cluster_seeds = {}
+        for node in seeds:
+            if node in core_index:
+                cluster_seeds.setdefault(core_index[node], set()).add(node)
+        for cluster in affected.union(cluster_seeds):
+            if cluster.core_nodes:
+                candidates.update(self._split_cluster(cluster, cluster_seeds.get(cluster, ()), neighbourhoods))
+            else:
+                self._cluster_removed(cluster)
+        # nodes which are not core may only be border nodes of a subset of their clusters
+        for node in candidates:
+            if node in core_index:
+                continue
+            clusters = {
+                core_index[neighbour] for neighbour in self._cached_neighbours(node, neighbourhoods)
+                if neighbour in core_index
+            }
+            for cluster in list(self._border_clusters.get(node, ())):
+                if cluster not in clusters:
+                    self._unindex_border(node, cluster)
+                    cluster.border_nodes.discard(node)
+            for cluster in clusters:
+                self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.BORDER_NODE)
+            if not clusters:
+                self.noise.add(node)
+
+    def remove_many(self, items):
+        """
+        Remove several nodes and edges and update the clustering once
+
+        :param items: nodes and edges to remove, with edges given as `slice`
+        :type items: iterable
+
+        This is equivalent to `del dengraph[item]` for every item. However,
+        the clustering is updated only once for the entire batch. In specific,
+        each cluster which may have been split is validated only once.
+        """
+        nodes, edges = [], []
+        for item in items:
+            if isinstance(item, slice):
+                edges.append(item)
+            else:
+                nodes.append(item)
+        with self._update():
+            self._items_removed(nodes, edges)
+        self.clusters.sort(key=len)
+
+    def _neighbours_added(self, nodes=(), edges=()):
+        """
+        Method calculates for a batch of newly added nodes and edges, how they influence the current clustering.
+        Each node might become core, border, or even noise, and may promote its neighbours to core.
+
+        :param nodes: The nodes that were just added
+        :param edges: The edges that were just added within the cluster distance, as `slice` of their nodes
+
+        Only the new nodes are queried. Their neighbours merely update their
+        neighbour counts, and are queried only if they are promoted to core.
+        Newly connected clusters are merged once per batch.
+        """
+        core_index, counts = self._core_cluster, self._neighbour_counts
+        neighbourhoods = {}
         for node in nodes:
-            becomes_core, cluster, neighbours = self._test_change_to_core(node=node)
-            if becomes_core:
+            if node not in neighbourhoods:
+                self._touch(node)
+                neighbours = neighbourhoods[node] = set(self.graph.get_neighbours(
+                    node=node, distance=self.cluster_distance
+                ))
+                counts[node] = len(neighbours)
+        grown = set(neighbourhoods)  # nodes whose neighbour count increased
+        for neighbours in list(dengraph.compat.viewvalues(neighbourhoods)):
+            for neighbour in neighbours:
+                if neighbour not in neighbourhoods:
+                    counts[neighbour] += 1
+                    grown.add(neighbour)
+        for edge in edges:
+            for node in {edge.start, edge.stop}:
+                counts[node] += 1
+                grown.add(node)
+        promoted = [node for node in grown if node not in core_index and counts[node] >= self.core_neighbours]
+        # connect all new core nodes with each other and their core neighbours,
+        # including any new edges between nodes which are core already
+        connected_cores = dengraph.utilities.disjoint_set.DisjointSet(promoted)
+        for node in promoted:
+            for neighbour in self._cached_neighbours(node, neighbourhoods):
+                if neighbour in connected_cores:
+                    connected_cores.union(node, neighbour)
+                elif neighbour in core_index:
+                    connected_cores.add(neighbour)
+                    connected_cores.union(node, neighbour)
+        for edge in edges:
+            if edge.start in core_index and edge.stop in core_index:
+                connected_cores.add(edge.start)
+                connected_cores.add(edge.stop)
+                connected_cores.union(edge.start, edge.stop)
+        for core_nodes in dengraph.compat.viewvalues(connected_cores.groups()):
+            # clusters are looked up anew, as they may have been merged for a previous group
+            clusters = {core_index[node] for node in core_nodes if node in core_index}
+            if clusters:
+                clusters = iter(clusters)
+                this_cluster = next(clusters)
+                for cluster in clusters:
+                    this_cluster = self._merge_clusters(this_cluster, cluster)
+            else:
                 this_cluster = dengraph.cluster.DenGraphCluster(self.graph)
                 self.clusters.append(this_cluster)
-                self._add_node_to_cluster(node=node, cluster=this_cluster, state=this_cluster.CORE_NODE)
-                self._merge_neighbours(neighbours=neighbours, cluster=this_cluster)
-            elif cluster and new_node:
-                self._add_node_to_cluster(node=new_node, cluster=cluster, state=cluster.BORDER_NODE)
+                self._emit(dengraph.events.ClusterCreated(this_cluster))
+            for node in core_nodes:
+                if node not in core_index:
+                    self._add_node_to_cluster(node=node, cluster=this_cluster, state=this_cluster.CORE_NODE)
+        # attach border nodes once all core nodes are known
+        for node in promoted:
+            cluster = core_index[node]
+            for neighbour in neighbourhoods[node]:
+                if neighbour not in core_index:
+                    self._add_node_to_cluster(node=neighbour, cluster=cluster, state=cluster.BORDER_NODE)
+        for edge in edges:
+            for node, neighbour in ((edge.start, edge.stop), (edge.stop, edge.start)):
+                if neighbour in core_index and node not in core_index:
+                    cluster = core_index[neighbour]
+                    self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.BORDER_NODE)
+        for node in nodes:
+            if node in core_index:
+                continue
+            for neighbour in neighbourhoods[node]:
+                try:
+                    cluster = core_index[neighbour]
+                except KeyError:
+                    continue
+                self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.BORDER_NODE)
+            if not self._is_clustered(node):
+                self.noise.add(node)
+
+    def _nodes_set(self, nodes_values):
+        """
+        Set nodes in the graph and update the clustering once
+
+        :param nodes_values: pairs of `(node, adjacency)` to set, in order
+        :raises NoSuchNode: if any adjacency refers to a node neither in the graph nor set
 
-    def _node_added(self, node):
+        Nodes which exist already keep their edges if `adjacency` is `None`,
+        the node itself or its current adjacency. Otherwise, they are removed
+        from the clustering and added anew with their new adjacency.
+
+        All nodes are put into the graph before any adjacency is written, so
+        that adjacencies may refer to any node set by the batch. Adjacencies
+        are then written in order, as if each node were set on its own.
         """
-        Method calculates for a newly added node, how it influences the current clustering.
-        The node might become core, border, or even noise.
+        graph = self.graph
+        batch = set(node for node, _ in nodes_values)
+        replaced, added = [], []
+        for node, value in nodes_values:
+            if node not in graph:
+                added.append(node)
+            elif value is not None and value is not node and value is not graph[node]:
+                replaced.append(node)
+            else:
+                continue
+            if isinstance(value, dengraph.compat.collections_abc.Mapping):
+                for neighbour in value:
+                    if neighbour not in batch and neighbour not in graph:
+                        raise dengraph.graph.NoSuchNode
+        if replaced:
+            self._items_removed(nodes=replaced, edges=())
+        for node in added + replaced:
+            graph[node] = None
+        for node, value in nodes_values:
+            if value is not None and value is not node:
+                graph[node] = value
+        self._neighbours_added(nodes=added + replaced)
 
-        :param node: The node that was just added
+    def update_many(self, nodes):
         """
-        self.noise.add(node)
-        neighbours = set(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
-        neighbours.add(node)
-        self._edge_added(neighbours, new_node=node)
+        Add several nodes and update the clustering once
+
+        :param nodes: nodes to add as an iterable, or a mapping of `{node: adjacency, ...}`
+        :type nodes: iterable or :py:class:`~collections.abc.Mapping`
+
+        This is equivalent to `dengraph[node] = adjacency` for every node in
+        order, with `adjacency` being `None` for plain iterables. This also
+        applies to nodes which exist already. However, the clustering is
+        updated only once for the entire batch. In addition, adjacencies may
+        refer to nodes which are added later in the batch.
+        """
+        if isinstance(nodes, dengraph.compat.collections_abc.Mapping):
+            nodes_values = list(dengraph.compat.viewitems(nodes))
+        else:
+            nodes_values = [(node, None) for node in nodes]
+        with self._update():
+            self._nodes_set(nodes_values)
+        self.clusters.sort(key=len)
 
     @staticmethod
     def _expand_unchecked(unchecked, neighbours, checked=None):
@@ -236,17 +685,77 @@ class DenGraphIO(dengraph.graph.Graph):
         unchecked.update(to_be_checked)
         checked.update(to_be_checked)
 
+    def _init_neighbours(self, node, sparse_neighbourhoods):
+        """
+        Get the neighbourhood of `node` during initial clustering
+
+        :param node: the node to get neighbours for
+        :param sparse_neighbourhoods: neighbourhoods of nodes already known not to be core
+        :return: set of neighbours of `node`
+
+        Each node is queried only once: core nodes are expanded exactly once,
+        while other nodes may be reached repeatedly from several clusters and
+        the outer loop. Neighbourhoods of the latter are kept in
+        `sparse_neighbourhoods`, which has less than `core_neighbours`
+        elements per node.
+        """
+        try:
+            return sparse_neighbourhoods[node]
+        except KeyError:
+            neighbours = set(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
+            self._neighbour_counts[node] = len(neighbours)
+            if len(neighbours) < self.core_neighbours:
+                sparse_neighbourhoods[node] = neighbours
+            return neighbours
+
+    def _init_explore(self, node, sparse_neighbourhoods):
+        """Get the neighbours of `node` when the expansion of a new cluster reaches it"""
+        return self._init_neighbours(node, sparse_neighbourhoods)
+
+    def _expand_cluster(self, cluster, node, neighbours, sparse_neighbourhoods):
+        """
+        Expand a new `cluster` from its first core `node` during initial clustering
+
+        :param cluster: the cluster to expand
+        :param node: the first core node of `cluster`
+        :param neighbours: the neighbours of `node`
+        :param sparse_neighbourhoods: neighbourhoods of nodes already known not to be core
+        """
+        outstanding_nodes = set()  # nodes which still need categorizing
+        connected_nodes = {node}  # nodes which need not be scheduled for categorizing again
+        outstanding_nodes.update(neighbours)
+        connected_nodes.update(neighbours)
+        while outstanding_nodes:
+            checking = outstanding_nodes.pop()
+            neighbours = self._init_explore(checking, sparse_neighbourhoods)
+            if len(neighbours) >= self.core_neighbours:
+                self._add_node_to_cluster(
+                    node=checking,
+                    cluster=cluster,
+                    state=cluster.CORE_NODE
+                )
+                self._expand_unchecked(outstanding_nodes, neighbours, connected_nodes)
+            else:
+                self._add_node_to_cluster(
+                    node=checking,
+                    cluster=cluster,
+                    state=cluster.BORDER_NODE
+                )
+
     def _init_cluster(self):
         """Perform initial clustering"""
         self.clusters = type(self.clusters)()
+        self._core_cluster, self._border_clusters = {}, {}
+        self._neighbour_counts = {}
         # Avoid nodes for which a decision has been made:
         # - Core nodes can only belong to one cluster; once a node is a cluster
         #   core node, it cannot change state.
         # - Border nodes are treated when clusters are created, so we can skip them
         self.noise = set(self.graph)
+        sparse_neighbourhoods = {}
         for node in self.graph:  # nodes from single iteration over graph
             if node in self.noise:
-                neighbours = set(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
+                neighbours = self._init_neighbours(node, sparse_neighbourhoods)
                 if len(neighbours) >= self.core_neighbours:
                     # node forms a new cluster
                     this_cluster = dengraph.cluster.DenGraphCluster(self.graph)
@@ -256,42 +765,20 @@ class DenGraphIO(dengraph.graph.Graph):
                         cluster=this_cluster,
                         state=this_cluster.CORE_NODE
                     )
-                    outstanding_nodes = set()  # nodes which still need categorizing
-                    connected_nodes = {node}  # nodes which need not be scheduled for categorizing again
-                    outstanding_nodes.update(neighbours)
-                    connected_nodes.update(neighbours)
-                    while outstanding_nodes:
-                        checking = outstanding_nodes.pop()
-                        neighbours = set(self.graph.get_neighbours(
-                            node=checking,
-                            distance=self.cluster_distance
-                        ))
-                        if len(neighbours) >= self.core_neighbours:
-                            self._add_node_to_cluster(
-                                node=checking,
-                                cluster=this_cluster,
-                                state=this_cluster.CORE_NODE
-                            )
-                            self._expand_unchecked(outstanding_nodes, neighbours, connected_nodes)
-                        else:
-                            self._add_node_to_cluster(
-                                node=checking,
-                                cluster=this_cluster,
-                                state=this_cluster.BORDER_NODE
-                            )
+                    self._expand_cluster(this_cluster, node, neighbours, sparse_neighbourhoods)
         # sort clusters by length to reduce '__contains__' checks
         # having big clusters first means on average, searched elements are
         # more likely to be in earlier containers.
         self.clusters.sort(key=len)
 
+    def _is_neighbour(self, edge):
+        """Whether `edge` exists in the graph and is within the cluster distance"""
+        return edge in self.graph and self.graph[edge] <= self.cluster_distance
+
     def __contains__(self, item):
         if isinstance(item, slice):
             return item.start in self and item.stop in self
-        else:
-            for cluster in self.clusters:
-                if item in cluster:
-                    return True
-        return False
+        return self._is_clustered(item)
 
     def __len__(self):
         return sum(len(clstr) for clstr in self.clusters)
@@ -306,37 +793,27 @@ class DenGraphIO(dengraph.graph.Graph):
             raise dengraph.graph.NoSuchNode  # Node not in any Cluster
 
     def __setitem__(self, key, value):
-        # add stuff to graph
-        try:
-            self.graph[key] = value
-        except:
-            raise
-        else:
+        with self._update():
             if isinstance(key, slice):
-                nodes = [key.start, key.stop]
-                self._edge_added(nodes)
+                was_neighbour = self._is_neighbour(key)
+                if was_neighbour and not value <= self.cluster_distance:
+                    # the edge no longer connects its nodes
+                    self._items_removed(nodes=(), edges=[key])
+                self.graph[key] = value
+                if not was_neighbour and self._is_neighbour(key):
+                    self._neighbours_added(edges=[key])
             else:
-                self._node_added(key)
-            self.clusters.sort(key=len)
+                self._nodes_set([(key, value)])
+        self.clusters.sort(key=len)
 
     def __delitem__(self, item):
-        # a:b -> slice -> edge
-        if isinstance(item, slice):
-            del self.graph[item]
-            self._edge_removed(node=item.start)
-            self._edge_removed(node=item.stop)
-            try:
-                cluster = self.core_cluster_for_node(core_node=item.start)
-            except NoSuchCluster:
-                try:
-                    cluster = self.core_cluster_for_node(core_node=item.stop)
-                except NoSuchCluster:
-                    return
-            self._check_cluster(nodes=[item.start, item.stop], core_cluster=cluster)
-        else:
-            neighbours = set(self.graph.get_neighbours(node=item, distance=self.cluster_distance))
-            self._node_removed(node=item, neighbours=neighbours)
-            del self.graph[item]
+        with self._update():
+            # a:b -> slice -> edge
+            if isinstance(item, slice):
+                self._items_removed(nodes=(), edges=[item])
+            else:
+                self._items_removed(nodes=[item], edges=())
+        self.clusters.sort(key=len)
 
     def __iter__(self):
         for cluster in self.clusters:
@@ -364,8 +841,193 @@ class DenGraphIO(dengraph.graph.Graph):
             dengraph.utilities.pretty.repr_container(self.noise),
         )
 
+    def memory_usage(self):
+        """
+        Estimate the memory used by this clustering, by structure
+
+        :return: estimated bytes by name of each structure
+        :rtype: dict[str, int]
+
+        Only the state of the clustering itself is estimated. Nodes are owned
+        by the base graph, and are included in `graph.memory_usage()`.
+        """
+        sizeof_containers = dengraph.utilities.memory.sizeof_containers
+        return {
+            'clusters': self.clusters.memory_usage() + sizeof_containers(
+                container for cluster in self.clusters
+                for container in (cluster, cluster.core_nodes, cluster.border_nodes)
+            ),
+            'noise': sizeof_containers((self.noise,)),
+            'core_index': sizeof_containers((self._core_cluster,)),
+            'border_index': self._border_index_usage(),
+            'neighbour_counts': sizeof_containers((self._neighbour_counts,)),
+        }
+
+    def _border_index_usage(self):
+        """Estimate the bytes used by the index of border nodes"""
+        sizeof_containers = dengraph.utilities.memory.sizeof_containers
+        return sizeof_containers((self._border_clusters,)) + sizeof_containers(
+            dengraph.compat.viewvalues(self._border_clusters)
+        )
+
     def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
         raise NotImplementedError  # TODO: find closest nodes
 
 #: alias to have a separate name for future optimizations
 DenGraphO = DenGraphIO
+
+
+class StaticDenGraph(DenGraphIO):
+    """
+    Density Graph Clustering allowing for Overlap, computed once via union-find
+
+    :param base_graph: the underlying graph
+    :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
+    :param core_neighbours: number of neighbours required for core nodes (η)
+
+    The resulting clusters are the same as for :py:class:`~.DenGraphIO`,
+    including border nodes shared by several clusters. Instead of expanding
+    clusters node by node, core nodes are connected in a disjoint-set forest
+    and clusters are created only once all nodes are known. This requires a
+    single neighbour query per node, and scales almost linearly with the
+    number of edges.
+
+    The clustering is static: nodes and edges cannot be added or removed.
+    """
+    def _init_cluster(self):
+        """Perform initial clustering"""
+        self.clusters = type(self.clusters)()
+        self._core_cluster, self._border_clusters = {}, {}
+        self._neighbour_counts = {}
+        cores = dengraph.utilities.disjoint_set.DisjointSet()
+        sparse_neighbourhoods = {}  # neighbours of nodes which are not core
+        for node in self.graph:
+            neighbours = list(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
+            self._neighbour_counts[node] = len(neighbours)
+            if len(neighbours) >= self.core_neighbours:
+                cores.add(node)
+                # graph is symmetric, so each core-core edge is seen once both are known
+                for neighbour in neighbours:
+                    if neighbour in cores:
+                        cores.union(node, neighbour)
+            else:
+                sparse_neighbourhoods[node] = neighbours
+        clusters = {}
+        for root, core_nodes in cores.groups().items():
+            clusters[root] = dengraph.cluster.DenGraphCluster(self.graph, core_nodes=core_nodes)
+        self.noise = set()
+        for node, neighbours in sparse_neighbourhoods.items():
+            roots = {cores.find(neighbour) for neighbour in neighbours if neighbour in cores}
+            if not roots:
+                self.noise.add(node)
+            for root in roots:
+                clusters[root].border_nodes.add(node)
+        for cluster in clusters.values():
+            self._index_cluster(cluster)
+            self.clusters.append(cluster)
+
+    def __setitem__(self, key, value):
+        raise TypeError('%s does not support incremental updates' % self.__class__.__name__)
+
+    def __delitem__(self, item):
+        raise TypeError('%s does not support incremental updates' % self.__class__.__name__)
+
+
+class NonOverlappingDenGraph(StaticDenGraph):
+    """
+    Density Graph Clustering without Overlap, computed once via union-find
+
+    :param base_graph: the underlying graph
+    :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
+    :param core_neighbours: number of neighbours required for core nodes (η)
+
+    Core nodes and clusters are the same as for :py:class:`~.StaticDenGraph`.
+    However, every border node belongs to only one cluster, namely the one of
+    its nearest core neighbour. Of several equally near core neighbours, the
+    one reported first by `base_graph.get_neighbours` is chosen. Neighbours of
+    border nodes are only compared by distance if they belong to different
+    clusters.
+
+    Since each border node belongs to a single cluster, border nodes are
+    indexed by a single mapping of `{node: cluster}`, instead of a set of
+    clusters per node.
+
+    The clustering is static: nodes and edges cannot be added or removed.
+    """
+    def _init_state(self, base_graph, cluster_distance, core_neighbours):
+        super(NonOverlappingDenGraph, self)._init_state(base_graph, cluster_distance, core_neighbours)
+        del self._border_clusters
+        self._border_cluster = {}  # {node: cluster, ...} for border nodes
+
+    def _init_cluster(self):
+        """Perform initial clustering"""
+        self.clusters = type(self.clusters)()
+        self._core_cluster, self._border_cluster = {}, {}
+        cores = dengraph.utilities.disjoint_set.DisjointSet()
+        sparse_neighbourhoods = {}  # neighbours of nodes which are not core
+        for node in self.graph:
+            neighbours = list(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
+            if len(neighbours) >= self.core_neighbours:
+                cores.add(node)
+                # graph is symmetric, so each core-core edge is seen once both are known
+                for neighbour in neighbours:
+                    if neighbour in cores:
+                        cores.union(node, neighbour)
+            else:
+                sparse_neighbourhoods[node] = neighbours
+        clusters = {}
+        for root, core_nodes in cores.groups().items():
+            clusters[root] = dengraph.cluster.DenGraphCluster(self.graph, core_nodes=core_nodes)
+        self.noise = set()
+        for node, neighbours in sparse_neighbourhoods.items():
+            core_neighbours = [neighbour for neighbour in neighbours if neighbour in cores]
+            if not core_neighbours:
+                self.noise.add(node)
+                continue
+            if len({cores.find(neighbour) for neighbour in core_neighbours}) > 1:
+                # sorting is stable, so the first of equally near core neighbours wins
+                core_neighbours.sort(key=lambda neighbour: self.graph[node:neighbour])
+            clusters[cores.find(core_neighbours[0])].border_nodes.add(node)
+        for cluster in clusters.values():
+            self._index_cluster(cluster)
+            self.clusters.append(cluster)
+
+    def _index_cluster(self, cluster):
+        """Add all nodes of `cluster` to the membership index"""
+        core_index, border_index = self._core_cluster, self._border_cluster
+        for node in cluster.core_nodes:
+            self._touch(node)
+            core_index[node] = cluster
+        for node in cluster.border_nodes:
+            self._touch(node)
+            border_index[node] = cluster
+
+    def _node_state(self, node):
+        if node in self._core_cluster:
+            return dengraph.events.CORE_NODE
+        elif node in self._border_cluster:
+            return dengraph.events.BORDER_NODE
+        elif node in self.noise:
+            return dengraph.events.NOISE_NODE
+        return None
+
+    def _is_clustered(self, node):
+        return node in self._core_cluster or node in self._border_cluster
+
+    def clusters_for_node(self, node):
+        """
+        Method yields the cluster the given node is part of, if any.
+
+        :param node: the node to check clusters for
+        :return: Cluster generator
+        """
+        try:
+            yield self._core_cluster[node]
+        except KeyError:
+            try:
+                yield self._border_cluster[node]
+            except KeyError:
+                pass
+
+    def _border_index_usage(self):
+        return dengraph.utilities.memory.sizeof_containers((self._border_cluster,))
@@ -28,6 +28,26 @@ class DenGraphVIO(DenGraphIO):
         self.virtual_nodes = {}
         super(DenGraphVIO, self).__init__(base_graph, cluster_distance, core_neighbours)
 
+    def _merge_clusters(self, base_cluster, cluster):
+        merged_cluster = super(DenGraphVIO, self)._merge_clusters(base_cluster, cluster)
+        absorbed_cluster = cluster if merged_cluster is base_cluster else base_cluster
+        # virtual nodes must not refer to the absorbed cluster anymore
+        for saved_node in self.virtual_nodes.values():
+            saved_node["distances"].pop(absorbed_cluster, None)
+        self._forget_means((merged_cluster, absorbed_cluster))
+        return merged_cluster
+
+    def _split_lineage(self, cluster, parts):
+        super(DenGraphVIO, self)._split_lineage(cluster, parts)
+        # ids may have moved to another part, and all parts have lost members
+        self._forget_means([cluster] + list(parts))
+
+    def _forget_means(self, clusters):
+        """Drop the cached means of `clusters` for all virtual nodes"""
+        for saved_node in self.virtual_nodes.values():
+            for cluster in clusters:
+                saved_node["clusters"].pop(cluster.cluster_id, None)
+
     def persist(self, virtual_node):
         del self.virtual_nodes[id(virtual_node)]
         self.graph[virtual_node] = None
@@ -44,11 +64,12 @@ class DenGraphVIO(DenGraphIO):
         saved_node = self.virtual_nodes.setdefault(id(virtual_node), {"clusters": {}, "distances": {}})
         distance = self.graph.distance
         for cluster in self.clusters:
+            # means are cached by id, which is kept by the largest part of split clusters
             try:
-                cluster_mean = saved_node["clusters"][cluster]
+                cluster_mean = saved_node["clusters"][cluster.cluster_id]
             except KeyError:
                 cluster_mean = distance.mean(cluster)
-                saved_node["clusters"][cluster] = cluster_mean
+                saved_node["clusters"][cluster.cluster_id] = cluster_mean
             if changes is not None:
                 # update distance
                 saved_node["distances"][cluster] = distance.update(
@@ -0,0 +1,34 @@
+from __future__ import absolute_import
+import math
+
+import dengraph.distance
+
+
+class EuclideanDistance(dengraph.distance.Distance):
+    """
+    Euclidean distance of vectors, such as tuples of coordinates
+
+    The mean and median of several vectors are computed per dimension.
+    """
+    def __call__(self, x, y, default=None):
+        return math.sqrt(sum((x_i - y_i) ** 2 for x_i, y_i in zip(x, y)))
+
+    def mean(self, *args, **kwargs):
+        if len(args) == 1:
+            args = args[0]
+        args = list(args)
+        if not args:
+            if "default" in kwargs:
+                return kwargs.get("default")
+            raise ValueError()
+        return tuple(sum(coordinates) / float(len(args)) for coordinates in zip(*args))
+
+    def median(self, *args, **kwargs):
+        if len(args) == 1:
+            args = args[0]
+        args = list(args)
+        if not args:
+            if "default" in kwargs:
+                return kwargs.get("default")
+            raise ValueError()
+        return tuple(sorted(coordinates)[int(len(args) / 2)] for coordinates in zip(*args))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Events describing changes of an incremental clustering
+
+A :py:class:`~dengraph.dengraph.DenGraphIO` calls each of its
+`event_listeners` with every event once an update is complete. Any callable
+taking a single event can be used as a listener, for example an
+:py:class:`EventQueue`:
+
+.. code:: python
+
+    queue = EventQueue()
+    clustering.event_listeners.append(queue)
+    clustering[node] = None
+    for event in queue.drain():
+        print(event)
+
+Events of clusters are emitted in the order they happened, followed by
+events of all nodes whose state changed.
+"""
+from __future__ import absolute_import
+import collections
+
+import dengraph.cluster
+
+
+#: state of nodes which belong to no cluster
+NOISE_NODE = 0
+#: state of core nodes, same as :py:attr:`~dengraph.cluster.DenGraphCluster.CORE_NODE`
+CORE_NODE = dengraph.cluster.DenGraphCluster.CORE_NODE
+#: state of border nodes, same as :py:attr:`~dengraph.cluster.DenGraphCluster.BORDER_NODE`
+BORDER_NODE = dengraph.cluster.DenGraphCluster.BORDER_NODE
+
+#: the state of `node` changed, with a state of `None` for nodes not in the graph
+NodeChanged = collections.namedtuple('NodeChanged', ['node', 'old_state', 'new_state'])
+#: a new `cluster` was created
+ClusterCreated = collections.namedtuple('ClusterCreated', ['cluster'])
+#: the `absorbed` cluster was merged into `cluster`
+ClustersMerged = collections.namedtuple('ClustersMerged', ['cluster', 'absorbed'])
+#: the `part` cluster was split off from `cluster`
+ClusterSplit = collections.namedtuple('ClusterSplit', ['cluster', 'part'])
+#: `cluster` was removed
+ClusterRemoved = collections.namedtuple('ClusterRemoved', ['cluster'])
+
+
+class EventQueue(object):
+    """
+    Listener collecting events until they are drained
+
+    :param maxlen: maximum number of events to keep, discarding the oldest events
+    :type maxlen: int or None
+    """
+    def __init__(self, maxlen=None):
+        self._events = collections.deque(maxlen=maxlen)
+
+    def __call__(self, event):
+        self._events.append(event)
+
+    def drain(self):
+        """Remove and yield all collected events, oldest first"""
+        events = self._events
+        while events:
+            yield events.popleft()
+
+    def __len__(self):
+        return len(self._events)
+
+    def __repr__(self):
+        return '%s(<%d events>)' % (self.__class__.__name__, len(self._events))
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import dengraph.utilities.placeholder
+import dengraph.utilities.memory
 import dengraph.compat
 
 
@@ -163,6 +164,20 @@ class Graph(dengraph.compat.ABCBase):
         """
         raise NotImplementedError
 
+    def memory_usage(self):
+        """
+        Estimate the memory used by this graph, by structure
+
+        :return: estimated bytes by name of each structure
+        :rtype: dict[str, int]
+
+        The default only estimates the nodes, as `node_table`. Subclasses
+        add further structures, such as adjacency or cached edge values.
+
+        :see: :py:mod:`dengraph.utilities.memory` for the accuracy of estimates.
+        """
+        return {'node_table': dengraph.utilities.memory.sizeof_objects(self)}
+
     # TODO:
     # -- intra distance
     # -- inter distance
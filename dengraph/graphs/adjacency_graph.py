@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 
+import bisect
 import itertools
 import dengraph.graph
 import dengraph.utilities.pretty
+import dengraph.utilities.memory
 import dengraph.compat
 
 
@@ -178,6 +180,18 @@ class AdjacencyGraph(dengraph.graph.Graph):
                 return iter(adjacency_list)
             return (neighbour for neighbour in adjacency_list if adjacency_list[neighbour] <= distance)
 
+    def memory_usage(self):
+        adjacency = self._adjacency
+        return {
+            'node_table': dengraph.utilities.memory.sizeof_containers((adjacency,)) +
+            dengraph.utilities.memory.sizeof_objects(adjacency),
+            'adjacency': dengraph.utilities.memory.sizeof_containers(dengraph.compat.viewvalues(adjacency)),
+            'edge_values': dengraph.utilities.memory.sizeof_objects(
+                value for neighbours in dengraph.compat.viewvalues(adjacency)
+                for value in dengraph.compat.viewvalues(neighbours)
+            ),
+        }
+
     def __add__(self, other):
         if isinstance(other, dengraph.graph.Graph):
             new_adjacency = {}
@@ -247,3 +261,148 @@ class BoundedAdjacencyGraph(AdjacencyGraph):
             ):
                 return iter(adjacency_list)
             return (neighbour for neighbour in adjacency_list if adjacency_list[neighbour] <= distance)
+
+
+class SortedAdjacencyGraph(BoundedAdjacencyGraph):
+    """
+    Graph storing distances via bounded adjacency lists ordered by distance
+
+    :param source: adjacency mapping or graph
+    :param max_distance: maximum allowed distance
+
+    :see: :py:class:`~AdjacencyGraph` for formats of the `source` parameter.
+
+    In addition to the adjacency of :py:class:`~BoundedAdjacencyGraph`, the
+    neighbours of each node are kept ordered by distance. Querying neighbours
+    via :py:meth:`get_neighbours` takes logarithmic time to find all
+    neighbours within a distance, instead of testing every neighbour, and
+    :py:meth:`neighbour_count` requires no iteration at all. This is useful
+    if the graph is built for a large `max_distance`, but queried for much
+    smaller distances.
+
+    Adding and removing edges keeps the order up to date, at a cost linear
+    in the number of neighbours of the affected nodes. Distances must be
+    comparable to each other.
+
+    :note: Modifying the adjacency returned by `graph[node]` does not update
+           the order of neighbours.
+    """
+    def __init__(self, source=None, max_distance=dengraph.graph.ANY_DISTANCE, symmetric=False):
+        self._ordered = {}  # {node: ([distance, ...], [neighbour, ...]), ...}
+        super(SortedAdjacencyGraph, self).__init__(source=source, max_distance=max_distance, symmetric=symmetric)
+        for node in self._adjacency:
+            self._order_node(node)
+
+    def _order_node(self, node):
+        """Order all neighbours of `node` anew"""
+        adjacency_list = self._adjacency[node]
+        neighbours = sorted(adjacency_list, key=adjacency_list.__getitem__)
+        self._ordered[node] = [adjacency_list[neighbour] for neighbour in neighbours], neighbours
+
+    def _order_edge(self, node_from, node_to, distance):
+        """Insert the edge `node_from:node_to` at the position of `distance`"""
+        distances, neighbours = self._ordered[node_from]
+        position = bisect.bisect_right(distances, distance)
+        distances.insert(position, distance)
+        neighbours.insert(position, node_to)
+
+    def _unorder_edge(self, node_from, node_to, distance):
+        """Remove the edge `node_from:node_to` from the position of `distance`"""
+        distances, neighbours = self._ordered[node_from]
+        position = bisect.bisect_left(distances, distance)
+        while neighbours[position] != node_to:
+            position += 1
+        del distances[position]
+        del neighbours[position]
+
+    def _edge_distances(self, edges):
+        """Get `(node_from, node_to, distance)` of all existing `edges`"""
+        adjacency = self._adjacency
+        return [
+            (node_from, node_to, adjacency[node_from][node_to]) for node_from, node_to in edges
+            if node_from in adjacency and node_to in adjacency[node_from]
+        ]
+
+    def __setitem__(self, item, value):
+        adjacency = self._adjacency
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            node_from, node_to = item.start, item.stop
+            edges = [(node_from, node_to), (node_to, node_from)] if self.symmetric else [(node_from, node_to)]
+            old_edges = self._edge_distances(edges)
+            super(SortedAdjacencyGraph, self).__setitem__(item, value)
+            # the edge is unchanged if it exceeds our maximum distance
+            new_edges = self._edge_distances(edges)
+            if new_edges != old_edges:
+                for node_a, node_b, distance in old_edges:
+                    self._unorder_edge(node_a, node_b, distance)
+                for node_a, node_b, distance in new_edges:
+                    self._order_edge(node_a, node_b, distance)
+        else:
+            if adjacency.get(item, object()) is value:
+                return
+            # neighbours are changed by the base class, so remember their old distances
+            old_neighbours = dict(adjacency.get(item, {})) if self.symmetric else {}
+            super(SortedAdjacencyGraph, self).__setitem__(item, value)
+            if item in self._ordered and not isinstance(value, dengraph.compat.collections_abc.Mapping):
+                return
+            for node, distance in dengraph.compat.viewitems(old_neighbours):
+                self._unorder_edge(node, item, distance)
+            self._order_node(item)
+            if self.symmetric:
+                for node, distance in dengraph.compat.viewitems(adjacency[item]):
+                    self._order_edge(node, item, distance)
+
+    def __delitem__(self, item):
+        adjacency = self._adjacency
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            node_from, node_to = item.start, item.stop
+            distance = adjacency.get(node_from, {}).get(node_to)
+            super(SortedAdjacencyGraph, self).__delitem__(item)
+            self._unorder_edge(node_from, node_to, distance)
+            if self.symmetric:
+                self._unorder_edge(node_to, node_from, distance)
+        else:
+            if self.symmetric:
+                old_edges = [(node, distance) for node, distance in dengraph.compat.viewitems(adjacency.get(item, {}))]
+            else:
+                old_edges = [(node, adjacency[node][item]) for node in adjacency if item in adjacency[node]]
+            super(SortedAdjacencyGraph, self).__delitem__(item)
+            del self._ordered[item]
+            for node, distance in old_edges:
+                if node != item:
+                    self._unorder_edge(node, item, distance)
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        try:
+            distances, neighbours = self._ordered[node]
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return iter(neighbours[:])
+        return iter(neighbours[:bisect.bisect_right(distances, distance)])
+
+    def neighbour_count(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        """
+        Count all nodes with edge weight to `node` smaller or equal to `distance`
+
+        :raises NoSuchNode: if ``node`` not in graph
+
+        This is equivalent to `len(list(graph.get_neighbours(node, distance)))`,
+        but takes only logarithmic time.
+        """
+        try:
+            distances, neighbours = self._ordered[node]
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return len(distances)
+        return bisect.bisect_right(distances, distance)
+
+    def memory_usage(self):
+        usage = super(SortedAdjacencyGraph, self).memory_usage()
+        usage['ordered_adjacency'] = dengraph.utilities.memory.sizeof_containers((self._ordered,)) + sum(
+            dengraph.utilities.memory.sizeof_containers(row) for row in dengraph.compat.viewvalues(self._ordered)
+        ) + dengraph.utilities.memory.sizeof_containers(dengraph.compat.viewvalues(self._ordered))
+        return usage
@@ -0,0 +1,205 @@
+from __future__ import absolute_import
+import array
+import bisect
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import dengraph.graph
+import dengraph.compat
+import dengraph.utilities.pretty
+import dengraph.utilities.memory
+import dengraph.utilities.node_table
+
+# typecode of offsets, which may exceed 32bit for large graphs
+try:
+    array.array('q')
+    _OFFSET_TYPECODE = 'q'
+except ValueError:  # python 2
+    _OFFSET_TYPECODE = 'l'
+
+
+class CSRGraph(dengraph.graph.Graph):
+    """
+    Immutable graph storing distances in compressed sparse row arrays
+
+    :param source: adjacency mapping or graph
+    :param max_distance: maximum allowed distance
+    :param symmetric: whether the graph is symmetric
+
+    :see: :py:class:`~dengraph.graphs.adjacency_graph.AdjacencyGraph` for formats of the `source` parameter.
+
+    Every node is interned as a dense id. The neighbours of all nodes are
+    stored in contiguous :py:class:`array.array` sequences: for the node with
+    id `i`, the ids and distances of its neighbours are at positions
+    `offsets[i]` up to `offsets[i+1]` of `neighbour_ids` and `distances`.
+    This requires 12 bytes per edge, instead of several hundred bytes for
+    mappings of nodes.
+
+    The neighbours of each node are ordered by distance. Querying neighbours
+    and counting them via :py:meth:`neighbour_count` takes logarithmic time
+    to find all neighbours within a distance, instead of testing each one.
+    If :py:mod:`numpy` is available, :py:meth:`neighbour_counts` counts the
+    neighbours of all nodes at once.
+
+    Distances must be numbers, and nodes must be hashable. The graph cannot be
+    modified after creation. Looking up a single edge takes time linear in
+    the number of neighbours of its first node. Symmetry of `source` is not
+    validated, in order to construct the graph in linear time.
+    """
+    def __init__(self, source, max_distance=dengraph.graph.ANY_DISTANCE, symmetric=False):
+        self._symmetric = symmetric
+        self._node_table = dengraph.utilities.node_table.NodeTable()
+        self._offsets = array.array(_OFFSET_TYPECODE, [0])
+        self._neighbour_ids = array.array('i')
+        self._distances = array.array('d')
+        if isinstance(source, dengraph.graph.Graph):
+            self._add_rows(source, lambda node: (
+                (other, source[node:other]) for other in source.get_neighbours(node, max_distance)
+            ))
+        elif isinstance(source, dengraph.compat.collections_abc.Mapping):
+            self._add_rows(source, lambda node: (
+                (other, distance) for other, distance in dengraph.compat.viewitems(source[node])
+                if max_distance is dengraph.graph.ANY_DISTANCE or distance <= max_distance
+            ))
+        else:
+            raise TypeError("parameter 'source' must be an instance of Graph or a Mapping")
+
+    def _add_rows(self, nodes, neighbours_of):
+        """Add all `nodes` with the `(neighbour, distance)` pairs provided by `neighbours_of(node)`"""
+        node_table, offsets = self._node_table, self._offsets
+        neighbour_ids, distances = self._neighbour_ids, self._distances
+        # intern all nodes first, so that rows are stored in the order of ids
+        for node in nodes:
+            node_table.add(node)
+        for node_id in dengraph.compat.range(len(node_table)):
+            row = sorted((distance, node_table.add(other)) for other, distance in neighbours_of(node_table[node_id]))
+            neighbour_ids.extend(neighbour_id for _, neighbour_id in row)
+            distances.extend(distance for distance, _ in row)
+            offsets.append(len(neighbour_ids))
+        # nodes only known as neighbours have no edges of their own
+        while len(offsets) <= len(node_table):
+            offsets.append(len(neighbour_ids))
+
+    @property
+    def symmetric(self):
+        """Whether this graph is symmetric. Read-only attribute."""
+        return self._symmetric
+
+    def _row(self, node):
+        """Get the `(start, stop)` positions of the neighbours of `node`"""
+        try:
+            node_id = self._node_table.node_id(node)
+        except (KeyError, TypeError):
+            raise dengraph.graph.NoSuchNode
+        return self._offsets[node_id], self._offsets[node_id + 1]
+
+    def _row_stop(self, start, stop, distance):
+        """Get the position after the last neighbour in `start:stop` within `distance`"""
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return stop
+        return bisect.bisect_right(self._distances, distance, start, stop)
+
+    def __contains__(self, item):
+        # a:b -> slice -> edge
+        if item.__class__ == slice:
+            try:
+                self._edge_position(item.start, item.stop)
+            except dengraph.graph.NoSuchEdge:
+                return False
+            return True
+        # node
+        try:
+            return item in self._node_table
+        except TypeError:
+            return False
+
+    def _edge_position(self, node_from, node_to):
+        try:
+            start, stop = self._row(node_from)
+            neighbour_id = self._node_table.node_id(node_to)
+        except (dengraph.graph.NoSuchNode, KeyError, TypeError):
+            raise dengraph.graph.NoSuchEdge
+        neighbour_ids = self._neighbour_ids
+        for position in dengraph.compat.range(start, stop):
+            if neighbour_ids[position] == neighbour_id:
+                return position
+        raise dengraph.graph.NoSuchEdge
+
+    def __len__(self):
+        return len(self._node_table)
+
+    def __getitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
+            return self._distances[self._edge_position(item.start, item.stop)]
+        start, stop = self._row(item)
+        node_table, neighbour_ids, distances = self._node_table, self._neighbour_ids, self._distances
+        return {
+            node_table[neighbour_ids[position]]: distances[position] for position in dengraph.compat.range(start, stop)
+        }
+
+    def __setitem__(self, item, value):
+        raise TypeError('%s does not support modification' % self.__class__.__name__)
+
+    def __delitem__(self, item):
+        raise TypeError('%s does not support modification' % self.__class__.__name__)
+
+    def __iter__(self):
+        return iter(self._node_table)
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        start, stop = self._row(node)
+        node_table, stop = self._node_table, self._row_stop(start, stop, distance)
+        return (node_table[neighbour_id] for neighbour_id in self._neighbour_ids[start:stop])
+
+    def neighbour_count(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        """
+        Count all nodes with edge weight to `node` smaller or equal to `distance`
+
+        :raises NoSuchNode: if ``node`` not in graph
+
+        This is equivalent to `len(list(graph.get_neighbours(node, distance)))`,
+        but takes only logarithmic time.
+        """
+        start, stop = self._row(node)
+        return self._row_stop(start, stop, distance) - start
+
+    def neighbour_counts(self, distance=dengraph.graph.ANY_DISTANCE):
+        """
+        Count the neighbours of all nodes within `distance`
+
+        :return: the number of neighbours of every node, in the order of `iter(graph)`
+        :rtype: :py:class:`array.array`
+        """
+        offsets = self._offsets
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return array.array(_OFFSET_TYPECODE, (offsets[index + 1] - offsets[index] for index in range(len(self))))
+        if numpy is not None and len(self._distances):
+            # number of neighbours within distance up to each position
+            within = numpy.cumsum(numpy.frombuffer(self._distances, numpy.float64) <= distance)
+            within = numpy.concatenate(([0], within))
+            bounds = numpy.frombuffer(offsets, 'i%d' % offsets.itemsize)
+            return array.array(_OFFSET_TYPECODE, (within[bounds[1:]] - within[bounds[:-1]]).tolist())
+        row_stop = self._row_stop
+        return array.array(_OFFSET_TYPECODE, (
+            row_stop(offsets[index], offsets[index + 1], distance) - offsets[index] for index in range(len(self))
+        ))
+
+    def memory_usage(self):
+        return {
+            'node_table': self._node_table.memory_usage() + dengraph.utilities.memory.sizeof_objects(self._node_table),
+            'adjacency': dengraph.utilities.memory.sizeof_containers((self._offsets, self._neighbour_ids)),
+            'edge_values': dengraph.utilities.memory.sizeof_containers((self._distances,)),
+        }
+
+    def __repr__(self):
+        return '%s(nodes=%s, edges=%d, symmetric=%r)' % (
+            self.__class__.__name__,
+            dengraph.utilities.pretty.repr_container(list(self._node_table)),
+            len(self._neighbour_ids),
+            self.symmetric,
+        )
@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 from dengraph import graph
 import dengraph.utilities.pretty
+import dengraph.utilities.memory
+import dengraph.compat
 
 
 class DistanceGraph(graph.Graph):
@@ -77,6 +79,12 @@ class DistanceGraph(graph.Graph):
         else:
             return (candidate for candidate in self if self[node:candidate] <= distance and candidate != node)
 
+    def memory_usage(self):
+        return {
+            'node_table': dengraph.utilities.memory.sizeof_containers((self._nodes,)) +
+            dengraph.utilities.memory.sizeof_objects(self._nodes),
+        }
+
     def __add__(self, other):
         if isinstance(self, other.__class__) and self.distance == other.distance:
             return self.__class__(self._nodes.union(other), self.distance, self.symmetric and other.symmetric)
@@ -155,3 +163,13 @@ class CachedDistanceGraph(DistanceGraph):
                     if self.symmetric:
                         continue
                     self._distance_values.pop((node, item), None)
+
+    def memory_usage(self):
+        usage = super(CachedDistanceGraph, self).memory_usage()
+        distance_values = self._distance_values
+        usage['distance_cache'] = (
+            dengraph.utilities.memory.sizeof_containers((distance_values,)) +
+            dengraph.utilities.memory.sizeof_containers(distance_values) +
+            dengraph.utilities.memory.sizeof_objects(dengraph.compat.viewvalues(distance_values))
+        )
+        return usage
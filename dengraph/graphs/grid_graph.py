@@ -0,0 +1,164 @@
+from __future__ import absolute_import
+import itertools
+import math
+
+import dengraph.graph
+import dengraph.compat
+import dengraph.utilities.pretty
+import dengraph.utilities.memory
+import dengraph.distances.euclidean_distance
+
+
+class GridGraph(dengraph.graph.Graph):
+    """
+    Graph of vectors connected by euclidean distance up to a maximum distance
+
+    :param nodes: all nodes contained in the graph, as vectors of numbers such as `(x, y)` tuples
+    :param max_distance: maximum distance of connected nodes
+
+    Nodes are hashed into a uniform grid of cells, each `max_distance` wide
+    in every dimension. All neighbours of a node are in the cell of the node
+    or one of the cells adjacent to it. Querying neighbours thus only tests
+    nodes of `3 ** dimensions` cells, instead of all nodes of the graph.
+    Adding and removing nodes takes constant time, so that the graph supports
+    incremental clustering via :py:class:`~dengraph.dengraph.DenGraphIO`.
+
+    The graph is suitable for low-dimensional vectors, such as points in 2D
+    or 3D space, and a clustering with `cluster_distance` of about
+    `max_distance`. Edges longer than `max_distance` are not part of the
+    graph. All nodes must have the same number of dimensions.
+
+    :note: The graph cannot be modified by setting or deleting edges.
+    """
+    symmetric = True
+
+    def __init__(self, nodes, max_distance):
+        if not max_distance > 0:
+            raise ValueError('max_distance must be positive')
+        self.max_distance = max_distance
+        self.distance = dengraph.distances.euclidean_distance.EuclideanDistance()
+        self._cells = {}  # {(cell_x, cell_y, ...): {node, ...}, ...}
+        self._dimensions = None
+        self._offsets = ()  # offsets to adjacent cells, including the cell itself
+        self._length = 0
+        for node in nodes:
+            self._add_node(node)
+
+    def _cell(self, node):
+        """Get the cell containing `node`"""
+        max_distance = self.max_distance
+        return tuple([int(math.floor(coordinate / max_distance)) for coordinate in node])
+
+    def _node_cell(self, node):
+        """Get the cell containing `node`, which must be in the graph"""
+        try:
+            cell = self._cell(node)
+        except TypeError:
+            raise dengraph.graph.NoSuchNode
+        if node not in self._cells.get(cell, ()):
+            raise dengraph.graph.NoSuchNode
+        return cell
+
+    def _add_node(self, node):
+        if self._dimensions is None:
+            self._dimensions = len(node)
+            self._offsets = tuple(itertools.product((-1, 0, 1), repeat=self._dimensions))
+        elif len(node) != self._dimensions:
+            raise ValueError('expected node with %d dimensions, got %r' % (self._dimensions, node))
+        cell = self._cell(node)
+        try:
+            members = self._cells[cell]
+        except KeyError:
+            members = self._cells[cell] = set()
+        if node not in members:
+            members.add(node)
+            self._length += 1
+
+    def _distance_within(self, node_from, node_to):
+        """Get the distance of two nodes, or raise :py:exc:`~NoSuchEdge` if it exceeds `max_distance`"""
+        self._node_cell(node_from)
+        self._node_cell(node_to)
+        distance = self.distance(node_from, node_to)
+        if distance > self.max_distance:
+            raise dengraph.graph.NoSuchEdge
+        return distance
+
+    def __contains__(self, item):
+        # a:b -> slice -> edge
+        if item.__class__ == slice:
+            try:
+                self._distance_within(item.start, item.stop)
+            except (dengraph.graph.NoSuchNode, dengraph.graph.NoSuchEdge):
+                return False
+            return True
+        # node
+        try:
+            self._node_cell(item)
+        except dengraph.graph.NoSuchNode:
+            return False
+        return True
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
+            try:
+                return self._distance_within(item.start, item.stop)
+            except dengraph.graph.NoSuchNode:
+                raise dengraph.graph.NoSuchEdge
+        distance = self.distance
+        return {neighbour: distance(item, neighbour) for neighbour in self.get_neighbours(item)}
+
+    def __setitem__(self, item, value):
+        if value or isinstance(item, slice):
+            raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
+        self._add_node(item)
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            raise TypeError('%s does not support edge deletion' % self.__class__.__name__)
+        cell = self._node_cell(item)
+        members = self._cells[cell]
+        members.remove(item)
+        if not members:
+            del self._cells[cell]
+        self._length -= 1
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(dengraph.compat.viewvalues(self._cells))
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        cell = self._node_cell(node)
+        if distance is dengraph.graph.ANY_DISTANCE or distance > self.max_distance:
+            distance = self.max_distance
+        return self._neighbours(node, cell, distance)
+
+    def _neighbours(self, node, cell, max_distance):
+        cells, distance = self._cells, self.distance
+        for offset in self._offsets:
+            members = cells.get(tuple([index + shift for index, shift in zip(cell, offset)]))
+            if not members:
+                continue
+            for candidate in members:
+                if candidate != node and distance(node, candidate) <= max_distance:
+                    yield candidate
+
+    def memory_usage(self):
+        cells = self._cells
+        return {
+            'node_table': dengraph.utilities.memory.sizeof_objects(self),
+            'grid_cells': dengraph.utilities.memory.sizeof_containers((cells,)) +
+            dengraph.utilities.memory.sizeof_containers(dengraph.compat.viewvalues(cells)) +
+            dengraph.utilities.memory.sizeof_objects(cells),
+        }
+
+    def __repr__(self):
+        return '%s(max_distance=%r, nodes=%s)' % (
+            self.__class__.__name__,
+            self.max_distance,
+            dengraph.utilities.pretty.repr_container(list(self)),
+        )
@@ -0,0 +1,258 @@
+from __future__ import absolute_import
+import math
+import operator
+
+import dengraph.graph
+import dengraph.utilities.pretty
+import dengraph.utilities.memory
+import dengraph.distances.euclidean_distance
+
+
+class KDTreeGraph(dengraph.graph.Graph):
+    """
+    Graph of vectors connected by euclidean distance, indexed by a k-d tree
+
+    :param nodes: all nodes contained in the graph, as vectors of numbers such as `(x, y, z)` tuples
+    :param leaf_size: maximum number of nodes in each leaf of the tree
+
+    Like :py:class:`~dengraph.graphs.distance_graph.DistanceGraph`, every pair
+    of nodes is connected by an edge. Nodes are indexed by a k-d tree, which
+    recursively splits nodes at the median of their widest dimension. Querying
+    neighbours via :py:meth:`get_neighbours` only tests nodes in leaves that
+    may be within `distance`, which takes about `O(log N + k)` time for `k`
+    neighbours of any `distance`. This makes the graph suitable to cluster
+    numeric vectors of low to medium dimension for several `cluster_distance`
+    values.
+
+    Adding and removing nodes does not modify existing trees. Instead, up to
+    `leaf_size` new nodes are tested by every query, before the next query
+    indexes them by a new tree. Trees of similar size are merged, so that
+    there are at most about `log(N)` trees and every node is re-indexed only
+    `log(N)` times. Removed nodes are skipped by queries, until more than a
+    `rebuild_fraction` of all nodes has been removed and all trees are
+    rebuilt by the next query. Use :py:meth:`get_neighbours_many` to query the
+    neighbours of many nodes at once.
+
+    All nodes must have the same number of dimensions.
+
+    :note: The graph cannot be modified by setting or deleting edges.
+    """
+    symmetric = True
+    #: fraction of nodes which may be removed before all trees are rebuilt
+    rebuild_fraction = 0.25
+
+    def __init__(self, nodes, leaf_size=16):
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be positive')
+        self.leaf_size = leaf_size
+        self.distance = dengraph.distances.euclidean_distance.EuclideanDistance()
+        self._nodes = set()
+        self._dimensions = None
+        # [(ordered, tree), ...] of decreasing size, with each `ordered` such that each tree node covers
+        # a slice, and each `tree` as [(start, stop, lower, upper, left, right), ...] with the root first
+        self._trees = []
+        self._pending = set()  # nodes added since building the last tree
+        self._removed = set()  # nodes in any tree which have been removed
+        for node in nodes:
+            self._add_node(node)
+        self._build()
+
+    def _add_node(self, node):
+        if self._dimensions is None:
+            self._dimensions = len(node)
+        elif len(node) != self._dimensions:
+            raise ValueError('expected node with %d dimensions, got %r' % (self._dimensions, node))
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        if node in self._removed:
+            self._removed.discard(node)
+        else:
+            self._pending.add(node)
+
+    def _build(self):
+        """Build a single tree from all current nodes"""
+        self._trees = [self._index(list(self._nodes))] if self._nodes else []
+        self._pending, self._removed = set(), set()
+
+    def _index(self, ordered):
+        """Build the tree of the nodes in `ordered`, returning `(ordered, tree)`"""
+        tree = []
+        self._split(ordered, tree, 0, len(ordered))
+        return ordered, tree
+
+    def _split(self, ordered, tree, start, stop):
+        """Add the tree node covering `start:stop` and its children, returning its index"""
+        index = len(tree)
+        tree.append(None)
+        columns = list(zip(*ordered[start:stop]))
+        lower, upper = tuple(min(column) for column in columns), tuple(max(column) for column in columns)
+        if stop - start <= self.leaf_size:
+            tree[index] = (start, stop, lower, upper, -1, -1)
+            return index
+        dimension = max(range(self._dimensions), key=lambda dim: upper[dim] - lower[dim])
+        ordered[start:stop] = sorted(ordered[start:stop], key=operator.itemgetter(dimension))
+        middle = (start + stop) // 2
+        left = self._split(ordered, tree, start, middle)
+        right = self._split(ordered, tree, middle, stop)
+        tree[index] = (start, stop, lower, upper, left, right)
+        return index
+
+    def _refresh(self):
+        """Index pending nodes and rebuild the trees if too many nodes have been removed"""
+        removed = self._removed
+        if len(removed) > max(self.leaf_size, self.rebuild_fraction * len(self._nodes)):
+            self._build()
+        elif len(self._pending) > self.leaf_size:
+            self._index_pending()
+
+    def _index_pending(self):
+        """Build a tree of all pending nodes, merging it with all trees of at most its size"""
+        trees, removed, ordered = self._trees, self._removed, list(self._pending)
+        self._pending = set()
+        # merging doubles the size of trees, so that nodes are merged at most log(N) times
+        while trees and len(trees[-1][0]) <= len(ordered):
+            merged = trees.pop()[0]
+            if removed:
+                ordered.extend(node for node in merged if node not in removed)
+                removed.difference_update(merged)
+            else:
+                ordered.extend(merged)
+        trees.append(self._index(ordered))
+
+    def _query(self, point, distance):
+        """Get all nodes within `distance` of `point`, including `point` itself"""
+        measure = self.distance
+        result = [node for node in self._pending if measure(point, node) <= distance]
+        for ordered, tree in self._trees:
+            self._query_tree(point, distance, ordered, tree, result)
+        return result
+
+    def _query_tree(self, point, distance, ordered, tree, result):
+        """Add all nodes of a single tree within `distance` of `point` to `result`"""
+        removed, measure = self._removed, self.distance
+        stack = [0]
+        while stack:
+            start, stop, lower, upper, left, right = tree[stack.pop()]
+            # squared distance to the nearest and farthest corner of the bounding box,
+            # summed like the distance itself so that rounding never prunes a neighbour
+            near, far = 0, 0
+            for coordinate, low, high in zip(point, lower, upper):
+                if coordinate < low:
+                    near += (low - coordinate) ** 2
+                elif coordinate > high:
+                    near += (coordinate - high) ** 2
+                far += max((coordinate - low) ** 2, (high - coordinate) ** 2)
+            if math.sqrt(near) > distance:
+                continue
+            if math.sqrt(far) <= distance:
+                result.extend(node for node in ordered[start:stop] if node not in removed)
+            elif left < 0:
+                result.extend(
+                    node for node in ordered[start:stop]
+                    if node not in removed and measure(point, node) <= distance
+                )
+            else:
+                stack.append(right)
+                stack.append(left)
+
+    def __contains__(self, item):
+        # a:b -> slice -> edge
+        if item.__class__ == slice:
+            return item.start in self and item.stop in self
+        # node
+        try:
+            return item in self._nodes
+        except TypeError:
+            return False
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
+            node_from, node_to = item.start, item.stop
+            if node_from not in self or node_to not in self:
+                raise dengraph.graph.NoSuchEdge
+            return self.distance(node_from, node_to)
+        if item not in self:
+            raise dengraph.graph.NoSuchNode
+        return {candidate: self.distance(item, candidate) for candidate in self._nodes if candidate != item}
+
+    def __setitem__(self, item, value):
+        if value or isinstance(item, slice):
+            raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
+        self._add_node(item)
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            raise TypeError('%s does not support edge deletion' % self.__class__.__name__)
+        if item not in self:
+            raise dengraph.graph.NoSuchNode
+        self._nodes.remove(item)
+        if item in self._pending:
+            self._pending.discard(item)
+        else:
+            self._removed.add(item)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        if node not in self:
+            raise dengraph.graph.NoSuchNode
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return (candidate for candidate in self._nodes if candidate != node)
+        self._refresh()
+        return (candidate for candidate in self._query(node, distance) if candidate != node)
+
+    def get_neighbours_many(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        """
+        Get the neighbours of several nodes at once
+
+        :param nodes: nodes from which edges originate
+        :param distance: maximum allowed distance to other nodes
+        :return: mapping of `{node: [neighbour, ...], ...}`
+        :raises NoSuchNode: if any of ``nodes`` is not in graph
+
+        This is equivalent to `list(graph.get_neighbours(node, distance))` for
+        every node. However, the tree is validated only once, and nodes are
+        queried in the order of the tree so that nearby nodes visit the same
+        leaves in succession.
+        """
+        nodes = set(nodes)
+        if not nodes <= self._nodes:
+            raise dengraph.graph.NoSuchNode
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return {node: [candidate for candidate in self._nodes if candidate != node] for node in nodes}
+        self._refresh()
+        pending = [node for node in self._pending if node in nodes]
+        query = self._query
+        return {
+            node: [candidate for candidate in query(node, distance) if candidate != node]
+            for node in [node for ordered, _ in self._trees for node in ordered if node in nodes] + pending
+        }
+
+    def memory_usage(self):
+        return {
+            'node_table': dengraph.utilities.memory.sizeof_containers((self._nodes,)) +
+            dengraph.utilities.memory.sizeof_objects(self._nodes),
+            'tree': dengraph.utilities.memory.sizeof_containers(
+                container for ordered, tree in self._trees for container in (ordered, tree)
+            ) + dengraph.utilities.memory.sizeof_containers(
+                entry for _, tree in self._trees for entry in tree
+            ) + dengraph.utilities.memory.sizeof_objects(
+                bound for _, tree in self._trees for entry in tree for bound in (entry[2], entry[3])
+            ),
+            'tree_changes': dengraph.utilities.memory.sizeof_containers((self._trees, self._pending, self._removed)),
+        }
+
+    def __repr__(self):
+        return '%s(leaf_size=%r, nodes=%s)' % (
+            self.__class__.__name__,
+            self.leaf_size,
+            dengraph.utilities.pretty.repr_container(self._nodes),
+        )
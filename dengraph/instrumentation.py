@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in counters and phase timers for clusterings and graphs
+
+Instrumentation is added to individual objects, not to their classes.
+Clusterings and graphs which are not instrumented run exactly the same code
+as without this module, and have no overhead at all.
+
+.. code:: python
+
+    stats = ClusteringStats()
+    clustering = instrumented(DenGraphIO, graph, cluster_distance=2, core_neighbours=3, stats=stats)
+    clustering[node] = None
+    print(stats.counters['neighbour_queries'], stats.phase_times['incremental_add'])
+
+The following events are counted:
+
+``neighbour_queries``
+    calls to :py:meth:`~dengraph.graph.Graph.get_neighbours` of the graph,
+    and nodes queried at once via `get_neighbours_many`, such as by a
+    :py:class:`~dengraph.graphs.kdtree_graph.KDTreeGraph`
+
+``distance_calls``
+    calls to the `distance` of graphs, such as a
+    :py:class:`~dengraph.graphs.distance_graph.DistanceGraph`
+
+``cluster_merges``
+    clusters merged by incremental updates
+
+``cluster_splits``
+    parts split off from clusters by incremental updates, each of which
+    emits a :py:class:`~dengraph.events.ClusterSplit` event
+
+``node_visits``
+    nodes reached while expanding new clusters during initial clustering,
+    and while searching for parts split off from clusters after removals
+
+The following phases are timed:
+
+``init``
+    initial clustering of the base graph
+
+``expansion``
+    expanding each new cluster from its first core node, as part of ``init``;
+    clusterings which do not expand clusters node by node, such as a
+    :py:class:`~dengraph.dengraph.StaticDenGraph`, never enter this phase
+
+``split_search``
+    searching clusters which may have been split, as part of ``incremental_remove``
+
+``incremental_add``, ``incremental_remove``
+    updating the clustering for added and removed nodes and edges
+"""
+from __future__ import absolute_import
+import contextlib
+import functools
+import time
+
+import dengraph.distance
+
+try:
+    _timer = time.perf_counter
+except AttributeError:  # python 2
+    _timer = time.time
+
+
+class ClusteringStats(object):
+    """
+    Counters and phase timers of an instrumented clustering
+
+    :ivar counters: number of events by name
+    :ivar phase_times: total seconds spent in each phase by name
+    :ivar phase_calls: number of times each phase was entered by name
+    """
+    #: names of all counters
+    COUNTERS = ('neighbour_queries', 'distance_calls', 'cluster_merges', 'cluster_splits', 'node_visits')
+    #: names of all phases
+    PHASES = ('init', 'expansion', 'split_search', 'incremental_add', 'incremental_remove')
+
+    def __init__(self):
+        self.counters, self.phase_times, self.phase_calls = {}, {}, {}
+        self.reset()
+
+    def reset(self):
+        """Set all counters and timers to zero"""
+        self.counters.update((name, 0) for name in self.COUNTERS)
+        self.phase_times.update((name, 0.0) for name in self.PHASES)
+        self.phase_calls.update((name, 0) for name in self.PHASES)
+
+    def count(self, name, amount=1):
+        """Increase the counter `name` by `amount`"""
+        self.counters[name] += amount
+
+    @contextlib.contextmanager
+    def timed(self, phase):
+        """Add the time spent in the context to `phase`"""
+        start = _timer()
+        try:
+            yield
+        finally:
+            self.phase_times[phase] += _timer() - start
+            self.phase_calls[phase] += 1
+
+    def as_dict(self):
+        """Get all counters and timers as a flat, new :py:class:`dict`"""
+        stats = dict(self.counters)
+        stats.update(('%s_time' % name, value) for name, value in self.phase_times.items())
+        stats.update(('%s_calls' % name, value) for name, value in self.phase_calls.items())
+        return stats
+
+    def __repr__(self):
+        return '%s(%s)' % (
+            self.__class__.__name__,
+            ', '.join('%s=%r' % (name, self.counters[name]) for name in self.COUNTERS)
+        )
+
+
+class CountingDistance(dengraph.distance.Distance):
+    """
+    Distance counting how often it is called
+
+    :param distance: the distance to count calls of
+    :param stats: the stats to count calls in
+
+    All other attributes are provided by `distance`.
+    """
+    def __init__(self, distance, stats):
+        self.distance = distance
+        self.stats = stats
+        self.is_symmetric = distance.is_symmetric
+
+    def __call__(self, *args, **kwargs):
+        self.stats.counters['distance_calls'] += 1
+        return self.distance(*args, **kwargs)
+
+    def mean(self, *args, **kwargs):
+        return self.distance.mean(*args, **kwargs)
+
+    def median(self, *args, **kwargs):
+        return self.distance.median(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name == 'distance':  # not yet initialised
+            raise AttributeError(name)
+        return getattr(self.distance, name)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.distance)
+
+
+def _counted(method, stats, name):
+    @functools.wraps(method)
+    def counted_method(*args, **kwargs):
+        stats.counters[name] += 1
+        return method(*args, **kwargs)
+    return counted_method
+
+
+def _timed(method, stats, phase):
+    @functools.wraps(method)
+    def timed_method(*args, **kwargs):
+        with stats.timed(phase):
+            return method(*args, **kwargs)
+    return timed_method
+
+
+def _counted_many(method, stats, name):
+    @functools.wraps(method)
+    def counted_method(*args, **kwargs):
+        result = method(*args, **kwargs)
+        stats.counters[name] += len(result)
+        return result
+    return counted_method
+
+
+#: marker for attributes which are not set on an instance
+_UNSET = object()
+
+
+def instrument_graph(graph, stats):
+    """
+    Count neighbour queries and distance calls of `graph` in `stats`
+
+    :param graph: the graph to instrument
+    :type graph: :py:class:`~dengraph.graph.Graph`
+    :param stats: the stats to count in
+    :type stats: :py:class:`~.ClusteringStats`
+    :returns: `graph`, which is modified in-place
+
+    Distance calls are only counted for graphs exposing their `distance`.
+    Instrumenting a graph again replaces its previous instrumentation, so
+    that it counts only in the new `stats`. Use :py:func:`uninstrument_graph`
+    to restore the original graph.
+    """
+    uninstrument_graph(graph)
+    originals = {}
+
+    def patch(name, value):
+        originals[name] = vars(graph).get(name, _UNSET)
+        setattr(graph, name, value)
+    patch('get_neighbours', _counted(graph.get_neighbours, stats, 'neighbour_queries'))
+    get_neighbours_many = getattr(graph, 'get_neighbours_many', None)
+    if get_neighbours_many is not None:
+        patch('get_neighbours_many', _counted_many(get_neighbours_many, stats, 'neighbour_queries'))
+    distance = getattr(graph, 'distance', None)
+    if isinstance(distance, dengraph.distance.Distance):
+        patch('distance', CountingDistance(distance, stats))
+    elif distance is not None:
+        patch('distance', _counted(distance, stats, 'distance_calls'))
+    graph._instrumentation_originals = originals
+    return graph
+
+
+def uninstrument_graph(graph):
+    """
+    Remove any instrumentation added by :py:func:`instrument_graph` from `graph`
+
+    :param graph: the graph to restore
+    :type graph: :py:class:`~dengraph.graph.Graph`
+    :returns: `graph`, which is modified in-place
+    """
+    originals = vars(graph).pop('_instrumentation_originals', None)
+    for name, value in (originals or {}).items():
+        if value is _UNSET:
+            delattr(graph, name)
+        else:
+            setattr(graph, name, value)
+    return graph
+
+
+def instrumented(clustering_class, base_graph, cluster_distance, core_neighbours, stats=None):
+    """
+    Create a clustering which records its work in `stats`
+
+    :param clustering_class: the type of clustering, such as :py:class:`~dengraph.dengraph.DenGraphIO`
+    :param base_graph: the underlying graph, which is instrumented as well
+    :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
+    :param core_neighbours: number of neighbours required for core nodes (η)
+    :param stats: the stats to record in, or `None` to create new ones
+    :type stats: :py:class:`~.ClusteringStats`
+    :returns: the clustering, with its stats available as `clustering.stats`
+
+    The `base_graph` stays instrumented for as long as it is used by the
+    clustering. Call :py:func:`uninstrument_graph` on it to stop counting.
+    """
+    stats = stats if stats is not None else ClusteringStats()
+    clustering = clustering_class.__new__(clustering_class)
+    clustering.stats = stats
+    for name, counter in (
+            ('_merge_clusters', 'cluster_merges'), ('_split_part', 'cluster_splits'),
+            ('_init_explore', 'node_visits'), ('_explore', 'node_visits'),
+    ):
+        setattr(clustering, name, _counted(getattr(clustering, name), stats, counter))
+    for name, phase in (
+            ('_init_cluster', 'init'), ('_expand_cluster', 'expansion'), ('_split_cluster', 'split_search'),
+            ('_neighbours_added', 'incremental_add'), ('_items_removed', 'incremental_remove'),
+    ):
+        setattr(clustering, name, _timed(getattr(clustering, name), stats, phase))
+    clustering.__init__(instrument_graph(base_graph, stats), cluster_distance, core_neighbours)
+    return clustering
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import array
+
+import dengraph.compat
+import dengraph.cluster
+import dengraph.dengraph
+import dengraph.utilities.node_table
+import dengraph.utilities.memory
+
+
+#: state of nodes which belong to no cluster
+NOISE_NODE = 0
+#: state of core nodes, same as :py:attr:`~dengraph.cluster.DenGraphCluster.CORE_NODE`
+CORE_NODE = dengraph.cluster.DenGraphCluster.CORE_NODE
+#: state of border nodes, same as :py:attr:`~dengraph.cluster.DenGraphCluster.BORDER_NODE`
+BORDER_NODE = dengraph.cluster.DenGraphCluster.BORDER_NODE
+
+
+class InternedNodes(dengraph.compat.collections_abc.Set):
+    """
+    Read-only set of nodes stored by an :py:class:`~.StaticInternedDenGraph`
+
+    :param clustering: the clustering storing the nodes
+    :param node_ids: ids of all nodes in this set
+    :param state: state shared by all nodes in this set
+    :param label: label of the cluster of all nodes in this set, or `None` for noise
+    """
+    def __init__(self, clustering, node_ids, state, label=None):
+        self._clustering = clustering
+        self._node_ids = node_ids
+        self._state = state
+        self._label = label
+
+    def __contains__(self, node):
+        clustering = self._clustering
+        try:
+            node_id = clustering.node_table.node_id(node)
+        except (KeyError, TypeError):
+            return False
+        if clustering.node_states[node_id] != self._state:
+            return False
+        return self._label is None or self._label in clustering.labels_of(node_id)
+
+    def __len__(self):
+        return len(self._node_ids)
+
+    def __iter__(self):
+        node_table = self._clustering.node_table
+        for node_id in self._node_ids:
+            yield node_table[node_id]
+
+    def union(self, *others):
+        return set(self).union(*others)
+
+    def difference(self, *others):
+        return set(self).difference(*others)
+
+    def issubset(self, other):
+        return all(node in other for node in self)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, set(self))
+
+
+class InternedCluster(dengraph.cluster.DenGraphCluster):
+    """
+    Read-only cluster of an :py:class:`~.StaticInternedDenGraph`
+
+    :param clustering: the clustering this cluster belongs to
+    :param label: label of this cluster in the clustering
+    :param core_ids: ids of all core nodes
+    :param border_ids: ids of all border nodes
+
+    The nodes of the cluster are views on the state of `clustering`, and
+    are not stored by the cluster itself.
+    """
+    def __init__(self, clustering, label, core_ids, border_ids):
+        super(InternedCluster, self).__init__(clustering.graph)
+        self.label = label
+        self.core_nodes = InternedNodes(clustering, core_ids, CORE_NODE, label)
+        self.border_nodes = InternedNodes(clustering, border_ids, BORDER_NODE, label)
+
+    def categorize_node(self, node, state):
+        raise TypeError('%s object does not support content modification' % self.__class__.__name__)
+
+    def __delitem__(self, key):
+        raise TypeError('%s object does not support content modification' % self.__class__.__name__)
+
+    def __iadd__(self, other):
+        raise TypeError('%s object does not support content modification' % self.__class__.__name__)
+
+    def __isub__(self, other):
+        raise TypeError('%s object does not support content modification' % self.__class__.__name__)
+
+
+class StaticInternedDenGraph(dengraph.dengraph.StaticDenGraph):
+    """
+    Static Density Graph Clustering allowing for Overlap, storing nodes as dense integer ids
+
+    :param base_graph: the underlying graph
+    :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
+    :param core_neighbours: number of neighbours required for core nodes (η)
+
+    The resulting clusters are the same as for :py:class:`~dengraph.dengraph.StaticDenGraph`.
+    However, every node is interned only once in a
+    :py:class:`~dengraph.utilities.node_table.NodeTable`. The state and cluster
+    labels of nodes are stored in compact :py:class:`array.array` sequences
+    indexed by node id, instead of sets of nodes and mappings of nodes to
+    clusters. The :py:attr:`clusters` and :py:attr:`noise` are read-only views
+    on these arrays.
+
+    :ivar node_table: the ids of all nodes
+    :ivar node_states: the state of each node by id, one of :py:data:`NOISE_NODE`,
+                       :py:data:`CORE_NODE` or :py:data:`BORDER_NODE`
+    :ivar node_labels: the smallest label of the clusters of each node by id, or `-1` for noise
+    :ivar overlap_labels: labels of any further clusters by node id, only for border nodes of several clusters
+
+    The label of a cluster is its index in :py:attr:`clusters`, the same as
+    for :py:meth:`~dengraph.dengraph.DenGraphIO.cluster_labels`.
+
+    This is a static-only variant of :py:class:`~dengraph.dengraph.StaticDenGraph`
+    for one-shot clustering: nodes and edges cannot be added or removed, and
+    modifying the clustering raises :py:exc:`TypeError`. Its state cannot be
+    used in place of the state of :py:class:`~dengraph.dengraph.DenGraphIO`;
+    use :py:class:`~dengraph.dengraph.DenGraphIO` for incremental updates.
+    """
+    def _init_cluster(self):
+        """Perform initial clustering"""
+        graph = self.graph
+        node_table = self.node_table = dengraph.utilities.node_table.NodeTable(graph)
+        node_count = len(node_table)
+        states = self.node_states = array.array('b', [NOISE_NODE]) * node_count
+        parents = array.array('i', dengraph.compat.range(node_count))
+        sparse_neighbourhoods = {}  # {node_id: neighbour_ids, ...} of nodes which are not core
+        for node_id, node in enumerate(node_table):
+            neighbour_ids = array.array('i', (
+                node_table.node_id(neighbour)
+                for neighbour in graph.get_neighbours(node=node, distance=self.cluster_distance)
+            ))
+            if len(neighbour_ids) >= self.core_neighbours:
+                states[node_id] = CORE_NODE
+                # graph is symmetric, so each core-core edge is seen once both are known
+                for neighbour_id in neighbour_ids:
+                    if states[neighbour_id] == CORE_NODE:
+                        self._union(parents, node_id, neighbour_id)
+            else:
+                sparse_neighbourhoods[node_id] = neighbour_ids
+        labels = self.node_labels = array.array('i', [-1]) * node_count
+        core_ids, border_ids = [], []  # [node_ids, ...] by label
+        for node_id in dengraph.compat.range(node_count):
+            if states[node_id] == CORE_NODE:
+                root = self._find(parents, node_id)
+                if labels[root] == -1:
+                    labels[root] = len(core_ids)
+                    core_ids.append(array.array('i'))
+                    border_ids.append(array.array('i'))
+                labels[node_id] = labels[root]
+                core_ids[labels[node_id]].append(node_id)
+        del parents
+        self.overlap_labels = {}
+        for node_id in sorted(sparse_neighbourhoods):
+            node_labels = sorted({
+                labels[neighbour_id] for neighbour_id in sparse_neighbourhoods[node_id]
+                if states[neighbour_id] == CORE_NODE
+            })
+            if node_labels:
+                states[node_id] = BORDER_NODE
+                labels[node_id] = node_labels[0]
+                if len(node_labels) > 1:
+                    self.overlap_labels[node_id] = tuple(node_labels[1:])
+                for label in node_labels:
+                    border_ids[label].append(node_id)
+        # clusters are ordered by size, and labelled by their position
+        label_order = sorted(
+            dengraph.compat.range(len(core_ids)), key=lambda label: len(core_ids[label]) + len(border_ids[label])
+        )
+        self._relabel(label_order)
+        self._label_clusters = [
+            InternedCluster(self, label, core_ids[old_label], border_ids[old_label])
+            for label, old_label in enumerate(label_order)
+        ]
+        self.clusters = dengraph.cluster.ClusterRegistry(self._label_clusters)
+        self.noise = InternedNodes(self, array.array('i', (
+            node_id for node_id in dengraph.compat.range(node_count) if states[node_id] == NOISE_NODE
+        )), NOISE_NODE)
+
+    def _relabel(self, label_order):
+        """
+        Renumber the labels of all nodes to match the order of :py:attr:`clusters`
+
+        :param label_order: the current labels, in the order of clusters sorted by size
+        """
+        new_labels = array.array('i', [0]) * len(label_order)
+        for new_label, label in enumerate(label_order):
+            new_labels[label] = new_label
+        labels, overlap_labels = self.node_labels, self.overlap_labels
+        overlaps = {
+            node_id: sorted(new_labels[label] for label in self.labels_of(node_id)) for node_id in overlap_labels
+        }
+        for node_id, label in enumerate(labels):
+            if label != -1:
+                labels[node_id] = new_labels[label]
+        # the first label of nodes in several clusters must remain the smallest
+        for node_id, node_labels in dengraph.compat.viewitems(overlaps):
+            labels[node_id], overlap_labels[node_id] = node_labels[0], tuple(node_labels[1:])
+
+    def update_many(self, nodes):
+        raise TypeError('%s does not support incremental updates' % self.__class__.__name__)
+
+    def remove_many(self, items):
+        raise TypeError('%s does not support incremental updates' % self.__class__.__name__)
+
+    @staticmethod
+    def _find(parents, node_id):
+        """Get the root of `node_id` in the forest of `parents`"""
+        while parents[node_id] != node_id:
+            # halve the path so future lookups take fewer steps
+            parents[node_id] = parents[parents[node_id]]
+            node_id = parents[node_id]
+        return node_id
+
+    def _union(self, parents, node_id_a, node_id_b):
+        """Merge the trees of `node_id_a` and `node_id_b` in the forest of `parents`"""
+        root_a, root_b = self._find(parents, node_id_a), self._find(parents, node_id_b)
+        if root_a < root_b:
+            parents[root_b] = root_a
+        elif root_b < root_a:
+            parents[root_a] = root_b
+
+    def labels_of(self, node_id):
+        """
+        Get the labels of all clusters of a node
+
+        :param node_id: the id of the node
+        :return: labels of all clusters of the node, which is empty for noise
+        :rtype: tuple[int]
+        """
+        label = self.node_labels[node_id]
+        if label == -1:
+            return ()
+        return (label,) + self.overlap_labels.get(node_id, ())
+
+    def _is_clustered(self, node):
+        try:
+            return self.node_states[self.node_table.node_id(node)] != NOISE_NODE
+        except KeyError:
+            return False
+
+    def core_cluster_for_node(self, core_node):
+        try:
+            node_id = self.node_table.node_id(core_node)
+        except KeyError:
+            raise dengraph.dengraph.NoSuchCluster
+        if self.node_states[node_id] != CORE_NODE:
+            raise dengraph.dengraph.NoSuchCluster
+        return self._label_clusters[self.node_labels[node_id]]
+
+    def clusters_for_node(self, node):
+        try:
+            node_id = self.node_table.node_id(node)
+        except KeyError:
+            return
+        for label in self.labels_of(node_id):
+            yield self._label_clusters[label]
+
+    def memory_usage(self):
+        sizeof_containers = dengraph.utilities.memory.sizeof_containers
+        return {
+            'node_table': self.node_table.memory_usage(),
+            'node_states': sizeof_containers((self.node_states,)),
+            'node_labels': sizeof_containers((self.node_labels,)) + sizeof_containers((self.overlap_labels,)) +
+            sizeof_containers(dengraph.compat.viewvalues(self.overlap_labels)),
+            'clusters': self.clusters.memory_usage() + sizeof_containers((self._label_clusters,)) + sizeof_containers(
+                container for cluster in self._label_clusters
+                for container in (cluster, cluster.core_nodes._node_ids, cluster.border_nodes._node_ids)
+            ),
+            'noise': sizeof_containers((self.noise._node_ids,)),
+        }
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only log of updates to a :py:class:`~dengraph.dengraph.DenGraphIO`
+
+An :py:class:`UpdateLog` records every node and edge that is set or deleted
+in a clustering. Together with a
+:py:mod:`~dengraph.checkpoint`, the log allows to recover a clustering after
+a crash: the last checkpoint is restored, and only the updates logged since
+are replayed.
+
+.. code:: python
+
+    log = UpdateLog(open('clustering.log', 'ab'))
+    updates = LoggedUpdates(clustering, log)
+    updates[node] = adjacency
+    del updates[node_a:node_b]
+    log.flush()
+
+    # after a crash
+    clustering = read_checkpoint(open('clustering.dgcp', 'rb'), base_graph)
+    replay_log(open('clustering.log', 'rb'), clustering)
+
+Updates are buffered and written in batches. Each batch carries a checksum,
+so that a batch which was only partially written is ignored on replay.
+Updates which have not been flushed yet are lost on a crash.
+
+Once a new checkpoint is written, the log should be truncated via
+:py:meth:`UpdateLog.truncate` or replaced by a new one. Recovery then only
+depends on the number of updates since the checkpoint.
+
+Records are serialized via :py:mod:`pickle`, so logs must come from trusted
+sources.
+"""
+from __future__ import absolute_import
+import collections
+import io
+import pickle
+import struct
+import zlib
+
+import dengraph.compat
+
+
+#: a node was set, with its adjacency as value
+NODE_SET = 1
+#: a node was deleted
+NODE_DELETE = 2
+#: an edge was set, with its distance as value
+EDGE_SET = 3
+#: an edge was deleted
+EDGE_DELETE = 4
+
+_BATCH_HEADER = struct.Struct('<QII')  # size, number of records, checksum
+
+
+def _record(operation, item, value=None):
+    """Create a record, storing edges as pairs of nodes instead of `slice`"""
+    if isinstance(item, slice):
+        return operation + 2, (item.start, item.stop), value
+    return operation, item, value
+
+
+class UpdateLog(object):
+    """
+    Buffered writer of updates to a binary stream
+
+    :param stream: binary stream to append updates to
+    :param batch_size: number of updates to buffer before writing them
+    :type batch_size: int
+
+    Use the log as a context manager to flush any pending updates on exit.
+
+    Each update is serialized as soon as it is logged, so that values may
+    be modified afterwards without affecting the log.
+    """
+    def __init__(self, stream, batch_size=1024):
+        self.stream = stream
+        self.batch_size = batch_size
+        self._buffer = io.BytesIO()
+        self._pending = 0
+
+    def _append(self, record):
+        pickle.dump(record, self._buffer, protocol=2)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def log_set(self, key, value):
+        """Log that a node or edge `key` is set to `value`"""
+        self._append(_record(NODE_SET, key, value))
+
+    def log_delete(self, item):
+        """Log that a node or edge `item` is deleted"""
+        self._append(_record(NODE_DELETE, item))
+
+    def flush(self):
+        """Write all pending updates as one batch"""
+        if self._pending:
+            data = self._buffer.getvalue()
+            self.stream.write(_BATCH_HEADER.pack(len(data), self._pending, zlib.crc32(data) & 0xffffffff) + data)
+            self._buffer, self._pending = io.BytesIO(), 0
+        self.stream.flush()
+
+    def truncate(self):
+        """Discard all logged updates, once they are contained in a checkpoint"""
+        self._buffer, self._pending = io.BytesIO(), 0
+        self.stream.seek(0)
+        self.stream.truncate()
+
+    def __len__(self):
+        return self._pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+        return False
+
+    def __repr__(self):
+        return '%s(%r, batch_size=%d, <%d pending>)' % (
+            self.__class__.__name__, self.stream, self.batch_size, self._pending
+        )
+
+
+class LoggedUpdates(object):
+    """
+    Apply updates to a clustering and log them
+
+    :param clustering: the clustering to update
+    :type clustering: :py:class:`~dengraph.dengraph.DenGraphIO`
+    :param log: the log to record updates in
+    :type log: :py:class:`~.UpdateLog`
+
+    Supports the same updates as `clustering` itself, namely setting and
+    deleting of nodes and edges as well as
+    :py:meth:`~dengraph.dengraph.DenGraphIO.update_many` and
+    :py:meth:`~dengraph.dengraph.DenGraphIO.remove_many`.
+    Updates are logged only once they have been applied successfully.
+    """
+    def __init__(self, clustering, log):
+        self.clustering = clustering
+        self.log = log
+
+    def __setitem__(self, key, value):
+        self.clustering[key] = value
+        self.log.log_set(key, value)
+
+    def __delitem__(self, item):
+        del self.clustering[item]
+        self.log.log_delete(item)
+
+    def update_many(self, nodes):
+        """Log and add several nodes, see :py:meth:`~dengraph.dengraph.DenGraphIO.update_many`"""
+        if isinstance(nodes, dengraph.compat.collections_abc.Mapping):
+            nodes_values = list(dengraph.compat.viewitems(nodes))
+        else:
+            nodes_values = [(node, None) for node in nodes]
+        self.clustering.update_many(collections.OrderedDict(nodes_values))
+        for node, value in nodes_values:
+            self.log.log_set(node, value)
+
+    def remove_many(self, items):
+        """Log and remove several nodes and edges, see :py:meth:`~dengraph.dengraph.DenGraphIO.remove_many`"""
+        items = list(items)
+        self.clustering.remove_many(items)
+        for item in items:
+            self.log.log_delete(item)
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__, self.clustering, self.log)
+
+
+def read_log(stream):
+    """
+    Read all completely written updates from a binary stream
+
+    :param stream: binary stream to read from
+    :returns: iterator of records `(operation, item, value)`
+
+    Edges are given as pairs of nodes. Reading stops at the first batch
+    which is truncated or corrupted.
+    """
+    while True:
+        header = stream.read(_BATCH_HEADER.size)
+        if len(header) != _BATCH_HEADER.size:
+            return
+        size, count, checksum = _BATCH_HEADER.unpack(header)
+        data = stream.read(size)
+        if len(data) != size or zlib.crc32(data) & 0xffffffff != checksum:
+            return
+        records = io.BytesIO(data)
+        for _ in range(count):
+            yield pickle.load(records)
+
+
+def replay_log(stream, clustering):
+    """
+    Apply all updates of a log to a clustering
+
+    :param stream: binary stream to read updates from
+    :param clustering: the clustering to update
+    :type clustering: :py:class:`~dengraph.dengraph.DenGraphIO`
+    :returns: the number of updates applied
+
+    Consecutive updates of nodes are applied in bulk via
+    :py:meth:`~dengraph.dengraph.DenGraphIO.update_many`, and consecutive
+    deletions via :py:meth:`~dengraph.dengraph.DenGraphIO.remove_many`.
+    Since bulk updates set nodes in order, this is the same as applying
+    every update on its own, even if nodes replace nodes they refer to.
+    """
+    count = 0
+    nodes_set, items_deleted = collections.OrderedDict(), []
+    for operation, item, value in read_log(stream):
+        count += 1
+        # a batch must not contain the same node twice, nor be applied after later updates
+        if nodes_set and (operation != NODE_SET or item in nodes_set):
+            clustering.update_many(nodes_set)
+            nodes_set = collections.OrderedDict()
+        if items_deleted and operation not in (NODE_DELETE, EDGE_DELETE):
+            clustering.remove_many(items_deleted)
+            items_deleted = []
+        if operation == NODE_SET:
+            nodes_set[item] = value
+        elif operation == NODE_DELETE:
+            items_deleted.append(item)
+        elif operation == EDGE_DELETE:
+            items_deleted.append(slice(*item))
+        elif operation == EDGE_SET:
+            clustering[slice(*item)] = value
+        else:
+            raise ValueError('unknown log operation %r' % operation)
+    if nodes_set:
+        clustering.update_many(nodes_set)
+    if items_deleted:
+        clustering.remove_many(items_deleted)
+    return count
@@ -0,0 +1,79 @@
+class DisjointSet(object):
+    """
+    Disjoint-set forest of hashable elements, also known as union-find
+
+    :param elements: initial elements, each forming its own set
+
+    Sets are merged via :py:meth:`union` and identified by a representative
+    element returned by :py:meth:`find`. Merging is done by size and lookups
+    compress paths, so any sequence of operations runs in almost linear time.
+
+    .. code:: python
+
+        >>> forest = DisjointSet(range(4))
+        >>> forest.union(0, 1)
+        >>> forest.find(0) == forest.find(1)
+        True
+        >>> forest.find(0) == forest.find(2)
+        False
+    """
+    def __init__(self, elements=()):
+        self._parent = {}  # {element: parent_element, ...}
+        self._size = {}  # {root_element: set_size, ...}
+        for element in elements:
+            self.add(element)
+
+    def add(self, element):
+        """Add `element` as a set of its own, unless it is already known"""
+        if element not in self._parent:
+            self._parent[element] = element
+            self._size[element] = 1
+
+    def find(self, element):
+        """
+        Get the representative element for the set of `element`
+
+        :raises KeyError: if `element` has not been added
+        """
+        parent = self._parent
+        root = element
+        while parent[root] is not root:
+            root = parent[root]
+        # compress the path so future lookups take a single step
+        while element is not root:
+            parent[element], element = root, parent[element]
+        return root
+
+    def union(self, element_a, element_b):
+        """Merge the sets of `element_a` and `element_b`"""
+        root_a, root_b = self.find(element_a), self.find(element_b)
+        if root_a is root_b:
+            return
+        size = self._size
+        if size[root_a] < size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        size[root_a] += size.pop(root_b)
+
+    def groups(self):
+        """
+        Get all sets by their representative element
+
+        :return: mapping of `{representative: [element, element, ...]}`
+        """
+        groups = {}
+        for element in self._parent:
+            groups.setdefault(self.find(element), []).append(element)
+        return groups
+
+    def __contains__(self, element):
+        return element in self._parent
+
+    def __len__(self):
+        return len(self._parent)
+
+    def __iter__(self):
+        return iter(self._parent)
+
+    def __repr__(self):
+        return '%s(<%d elements in %d sets>)' % (self.__class__.__name__, len(self._parent), len(self._size))
@@ -0,0 +1,36 @@
+"""
+Estimates of the memory used by containers and objects
+
+All estimates are based on :py:func:`sys.getsizeof`. They include the
+storage of containers, but not of memory allocator overhead or of objects
+shared with the interpreter, such as small integers. As such, estimates are
+suitable to compare structures and to extrapolate sizes, but not to account
+for memory byte by byte.
+"""
+import sys
+
+
+def sizeof_containers(containers):
+    """
+    Estimate the bytes used by `containers` themselves, excluding their elements
+
+    :param containers: iterable of containers, such as :py:class:`dict` or :py:class:`set`
+    :rtype: int
+    """
+    return sum(sys.getsizeof(container) for container in containers)
+
+
+def sizeof_objects(objects):
+    """
+    Estimate the bytes used by distinct `objects`
+
+    :param objects: iterable of objects, which are counted only once if repeated
+    :rtype: int
+    """
+    seen = set()
+    total = 0
+    for obj in objects:
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+    return total
@@ -0,0 +1,66 @@
+import sys
+
+
+class NodeTable(object):
+    """
+    Mapping of hashable nodes to dense integer ids
+
+    :param nodes: initial nodes, which receive ids in order
+
+    Each node is assigned the next free id when it is added, starting at `0`.
+    This allows to store properties of nodes in compact sequences, such as
+    :py:class:`array.array`, indexed by the id of each node.
+
+    .. code:: python
+
+        >>> table = NodeTable('abc')
+        >>> table.node_id('b')
+        1
+        >>> table[2]
+        'c'
+    """
+    def __init__(self, nodes=()):
+        self._ids = {}  # {node: node_id, ...}
+        self._nodes = []  # [node, ...] by node_id
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        """
+        Add `node` unless it is already known
+
+        :return: the id of `node`
+        """
+        try:
+            return self._ids[node]
+        except KeyError:
+            node_id = self._ids[node] = len(self._nodes)
+            self._nodes.append(node)
+            return node_id
+
+    def node_id(self, node):
+        """
+        Get the id of `node`
+
+        :raises KeyError: if `node` has not been added
+        """
+        return self._ids[node]
+
+    def memory_usage(self):
+        """Estimate the bytes used by the table, excluding the nodes themselves"""
+        return sys.getsizeof(self._ids) + sys.getsizeof(self._nodes)
+
+    def __getitem__(self, node_id):
+        return self._nodes[node_id]
+
+    def __contains__(self, node):
+        return node in self._ids
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __repr__(self):
+        return '%s(<%d nodes>)' % (self.__class__.__name__, len(self._nodes))
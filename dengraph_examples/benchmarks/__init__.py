@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Reproducible benchmarks of graphs and clusterings
+
+Each benchmark is a runnable module, for example
+``python -m dengraph_examples.benchmarks.scaling --help``. Results are
+written as JSON lines, one record per measurement, so that runs of
+different releases can be compared.
+"""
+from __future__ import print_function, division
+import collections
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+from dengraph_examples.distributions import Circle2D, Checkers, Moon, Gaussian
+import dengraph.__about__
+from dengraph.graphs import adjacency_graph, distance_graph, csr_graph, grid_graph, kdtree_graph
+
+try:
+    timer = time.perf_counter
+except AttributeError:  # python 2
+    timer = time.time
+
+
+def euclidean(point_a, point_b):
+    """Euclidean distance of two 2D points"""
+    return math.hypot(point_a[0] - point_b[0], point_a[1] - point_b[1])
+
+
+#: distributions of points by name, each as a function of `count` points
+DISTRIBUTIONS = collections.OrderedDict((
+    ('circles', lambda count: Circle2D(0.4, 0.04).get_n(count)),
+    ('moons', lambda count: Moon(radius_center=0.4, noise=0.03).get_n(count)),
+    ('dots', lambda count: Gaussian((0.0, 0.0), deviation=(0.2, 0.2)).get_n(count)),
+    ('checkers', lambda count: Checkers().get_n(count)),
+))
+
+
+Backend = collections.namedtuple('Backend', ['build', 'pairs'])
+Backend.__doc__ = """
+Graph implementation to benchmark
+
+:param build: function `build(points, cluster_distance)` creating a graph of `points`
+:param pairs: function `pairs(count)` estimating the distance evaluations to build and cluster `count` points
+"""
+
+
+def _quadratic(count):
+    return count * count
+
+
+def _grid_cells(count):
+    # each node is compared to the nodes of its 9 adjacent cells, holding a few points each
+    return 9 * 10 * count
+
+
+def _tree_leaves(count):
+    # each node is compared to the nodes of a few leaves of the tree
+    return 8 * 16 * count
+
+
+#: graph implementations by name
+BACKENDS = collections.OrderedDict((
+    ('distance', Backend(
+        lambda points, cluster_distance: distance_graph.DistanceGraph(points, euclidean, symmetric=True),
+        _quadratic,
+    )),
+    ('cached_distance', Backend(
+        lambda points, cluster_distance: distance_graph.CachedDistanceGraph(points, euclidean, symmetric=True),
+        _quadratic,
+    )),
+    ('adjacency', Backend(
+        lambda points, cluster_distance: adjacency_graph.AdjacencyGraph(
+            distance_graph.DistanceGraph(points, euclidean, symmetric=True),
+            max_distance=cluster_distance, symmetric=True,
+        ),
+        _quadratic,
+    )),
+    ('csr', Backend(
+        lambda points, cluster_distance: csr_graph.CSRGraph(
+            distance_graph.DistanceGraph(points, euclidean, symmetric=True),
+            max_distance=cluster_distance, symmetric=True,
+        ),
+        _quadratic,
+    )),
+    ('grid', Backend(
+        lambda points, cluster_distance: grid_graph.GridGraph(points, max_distance=cluster_distance),
+        _grid_cells,
+    )),
+    ('kdtree', Backend(
+        lambda points, cluster_distance: kdtree_graph.KDTreeGraph(points),
+        _tree_leaves,
+    )),
+))
+
+
+#: backends which support inserting and deleting nodes, as required by incremental updates
+MUTABLE_BACKENDS = ('distance', 'cached_distance', 'adjacency', 'grid', 'kdtree')
+
+
+def count_edges(graph):
+    """
+    Count the edges of a symmetric `graph`, regardless of their distance
+
+    Graphs which connect every pair of nodes, such as a
+    :py:class:`~dengraph.graphs.distance_graph.DistanceGraph`, have
+    `N * (N - 1) / 2` edges. The edges of other graphs are counted via the
+    neighbours of every node.
+    """
+    if isinstance(graph, (distance_graph.DistanceGraph, kdtree_graph.KDTreeGraph)):
+        return len(graph) * (len(graph) - 1) // 2
+    return sum(sum(1 for _ in graph.get_neighbours(node)) for node in graph) // 2
+
+
+def make_points(distribution, count, seed):
+    """Create `count` distinct points of `distribution`, reproducibly for `seed`"""
+    random.seed(seed)
+    return list(collections.OrderedDict.fromkeys(DISTRIBUTIONS[distribution](count)))
+
+
+def clustering_parameters(count, core_neighbours):
+    """
+    Get the clustering parameters `(cluster_distance, core_neighbours)` for `count` points
+
+    The distance is chosen so that points spread uniformly over a unit
+    area have twice `core_neighbours` neighbours on average.
+    """
+    return math.sqrt(2 * core_neighbours / (math.pi * count)), core_neighbours
+
+
+def measure(call, trace_memory=False):
+    """
+    Measure the time and peak memory of `call()`
+
+    :returns: tuple of `(result, seconds, peak_bytes)`, with `peak_bytes` being `None` if not traced
+
+    Tracing memory slows down `call` considerably; measure time and memory in separate runs.
+    """
+    gc.collect()
+    if trace_memory and tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            start = timer()
+            result = call()
+            seconds = timer() - start
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return result, seconds, peak_bytes
+    start = timer()
+    result = call()
+    return result, timer() - start, None
+
+
+def max_rss():
+    """Peak resident memory of the process in bytes, or `None` if unknown"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS reports bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def environment():
+    """Description of the running interpreter and package"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'dengraph': dengraph.__about__.__version__,
+    }
+
+
+class ResultWriter(object):
+    """
+    Writer of benchmark results as JSON lines
+
+    :param stream: text stream to write records to
+    :param benchmark: name of the benchmark, added to every record
+    """
+    def __init__(self, stream, benchmark):
+        self.stream = stream
+        self.benchmark = benchmark
+        self._environment = environment()
+
+    def write(self, **record):
+        """Write a single record, adding the benchmark name and environment"""
+        record.update(self._environment, benchmark=self.benchmark)
+        self.stream.write(json.dumps(record, sort_keys=True) + '\n')
+        self.stream.flush()
+
+
+def int_list(value):
+    """Parse a comma separated list of integers, such as `1000,10000`"""
+    return [int(float(item)) for item in value.split(',')]
+
+
+def name_list(choices):
+    """Create a parser for a comma separated list of `choices`"""
+    def parse_names(value):
+        names = value.split(',')
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise ValueError('unknown names %s, expected any of %s' % (', '.join(unknown), ', '.join(choices)))
+        return names
+    parse_names.__name__ = 'name list'
+    return parse_names
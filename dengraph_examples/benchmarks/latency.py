@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Latency of incremental updates of a clustering
+
+A :py:class:`~dengraph.dengraph.DenGraphIO` is built for points of several
+gaussian clusters, and a random stream of updates is applied to it:
+
+``insert``
+    adding a new point of one of the clusters, via ``clustering[node] = None``
+    for distance graphs or with the adjacency of the node for adjacency graphs
+
+``delete``
+    removing a random node, via ``del clustering[node]``
+
+``edge``
+    changing the distance of a random edge, or removing it, via
+    ``clustering[node_a:node_b] = distance`` or ``del clustering[node_a:node_b]``;
+    only for backends which store edges
+
+Only backends which support inserting and deleting nodes, as listed by
+:py:data:`~dengraph_examples.benchmarks.MUTABLE_BACKENDS`, are benchmarked
+by default. The latency of every update is measured. For each operation, the benchmark
+records the median, 99th percentile and maximum latency for every number of
+nodes and clusters.
+
+.. code:: bash
+
+    python -m dengraph_examples.benchmarks.latency --sizes 1000,4000 --clusters 1,4,16 --output latency.jsonl
+"""
+from __future__ import print_function, division
+import argparse
+import collections
+import math
+import random
+import sys
+
+from dengraph_examples import benchmarks
+from dengraph_examples.distributions import Gaussian
+from dengraph.dengraph import DenGraphIO
+
+
+#: backends which support setting and deleting edges
+EDGE_BACKENDS = ('adjacency',)
+
+
+def supported_operations(backend_name, operations):
+    """Get the `operations` which can be applied to graphs of `backend_name`"""
+    return [
+        operation for operation in operations
+        if (backend_name in EDGE_BACKENDS if operation == 'edge' else backend_name in benchmarks.MUTABLE_BACKENDS)
+    ]
+
+
+def cluster_points(count, clusters):
+    """Create `count` points spread over a grid of `clusters` gaussian clusters"""
+    side = int(math.ceil(math.sqrt(clusters)))
+    spacing = 1.0 / side
+    generators = [
+        iter(Gaussian(
+            center=((index % side + 0.5) * spacing - 0.5, (index // side + 0.5) * spacing - 0.5),
+            deviation=(spacing / 8, spacing / 8),
+        ))
+        for index in range(clusters)
+    ]
+    return [next(generators[index % clusters]) for index in range(count)]
+
+
+def percentile(ordered, fraction):
+    """Get the nearest-rank percentile of a sorted sequence"""
+    return ordered[min(len(ordered) - 1, max(0, int(math.ceil(fraction * len(ordered))) - 1))]
+
+
+class UpdateStream(object):
+    """
+    Random updates of a clustering
+
+    :param clustering: the clustering to update
+    :param new_points: points to insert, in order
+    :param with_edges: whether edges are stored by the graph and must be updated explicitly
+    """
+    def __init__(self, clustering, new_points, with_edges):
+        self.clustering = clustering
+        self.new_points = iter(new_points)
+        self.with_edges = with_edges
+        self.nodes = list(clustering.graph)
+        self._indices = {node: index for index, node in enumerate(self.nodes)}
+
+    def _forget(self, node):
+        index = self._indices.pop(node)
+        last = self.nodes.pop()
+        if last != node:
+            self.nodes[index] = last
+            self._indices[last] = index
+
+    def prepare(self, operation):
+        """Prepare `operation`, returning a function to perform it"""
+        clustering = self.clustering
+        if operation == 'insert':
+            node = next(self.new_points)
+            self._indices[node] = len(self.nodes)
+            self.nodes.append(node)
+            value = None
+            if self.with_edges:
+                cluster_distance = clustering.cluster_distance
+                value = {}
+                for other in self.nodes[:-1]:
+                    distance = benchmarks.euclidean(node, other)
+                    if distance <= cluster_distance:
+                        value[other] = distance
+
+            def insert():
+                clustering[node] = value
+            return insert
+        elif operation == 'delete':
+            node = random.choice(self.nodes)
+            self._forget(node)
+
+            def delete():
+                del clustering[node]
+            return delete
+        elif operation == 'edge':
+            graph = clustering.graph
+            node = random.choice(self.nodes)
+            if not graph[node]:
+                return None
+            neighbour = random.choice(list(graph[node]))
+            if random.random() < 0.5:
+                def delete_edge():
+                    del clustering[node:neighbour]
+                return delete_edge
+            distance = random.uniform(0, 2 * clustering.cluster_distance)
+
+            def set_edge():
+                clustering[node:neighbour] = distance
+            return set_edge
+        raise ValueError('unknown operation %r' % operation)
+
+
+def run_once(backend_name, size, clusters, core_neighbours, updates, operations, seed):
+    """
+    Measure the latency of `updates` random `operations` on a clustering
+
+    :returns: latencies in seconds by operation, and the clustering
+    :raises ValueError: if the backend supports none of `operations`
+
+    Operations not supported by the backend are not performed.
+    """
+    operations = supported_operations(backend_name, operations)
+    if not operations:
+        raise ValueError('backend %r does not support any of the operations' % backend_name)
+    random.seed(seed)
+    points = list(collections.OrderedDict.fromkeys(cluster_points(size + updates, clusters)))
+    initial, new_points = points[:size], points[size:]
+    cluster_distance, core_neighbours = benchmarks.clustering_parameters(size, core_neighbours)
+    graph = benchmarks.BACKENDS[backend_name].build(initial, cluster_distance)
+    clustering = DenGraphIO(graph, cluster_distance, core_neighbours)
+    stream = UpdateStream(clustering, new_points, with_edges=backend_name in EDGE_BACKENDS)
+    latencies = {operation: [] for operation in operations}
+    for _ in range(updates):
+        operation = random.choice(operations)
+        update = stream.prepare(operation)
+        if update is None:
+            continue
+        _, seconds, _ = benchmarks.measure(update)
+        latencies[operation].append(seconds)
+    return latencies, clustering
+
+
+def run(writer, backends, sizes, cluster_counts, core_neighbours=8, updates=1000,
+        operations=('insert', 'delete', 'edge'), max_pairs=10 ** 8, seed=42):
+    """Run the benchmark for all combinations of `backends`, `sizes` and `cluster_counts`"""
+    for size in sizes:
+        for clusters in cluster_counts:
+            for backend_name in backends:
+                if benchmarks.BACKENDS[backend_name].pairs(size) > max_pairs:
+                    print('skipping %s with %d points' % (backend_name, size), file=sys.stderr)
+                    continue
+                if not supported_operations(backend_name, operations):
+                    print(
+                        'skipping %s, which supports none of %s' % (backend_name, ', '.join(operations)),
+                        file=sys.stderr,
+                    )
+                    continue
+                latencies, clustering = run_once(
+                    backend_name, size, clusters, core_neighbours, updates, list(operations), seed
+                )
+                for operation, samples in sorted(latencies.items()):
+                    if not samples:
+                        continue
+                    samples.sort()
+                    writer.write(
+                        backend=backend_name, size=size, clusters=clusters, operation=operation, seed=seed,
+                        count=len(samples), mean=sum(samples) / len(samples),
+                        p50=percentile(samples, 0.5), p99=percentile(samples, 0.99), max=samples[-1],
+                        final_clusters=len(clustering.clusters),
+                        final_cluster_size=max(len(cluster) for cluster in clustering.clusters)
+                        if clustering.clusters else 0,
+                    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=benchmarks.int_list, default=[1000, 4000, 16000],
+        help='comma separated numbers of initial points [%(default)s]',
+    )
+    parser.add_argument(
+        '--clusters', type=benchmarks.int_list, default=[1, 4, 16, 64],
+        help='comma separated numbers of clusters [%(default)s]',
+    )
+    parser.add_argument(
+        '--backends', type=benchmarks.name_list(benchmarks.BACKENDS), default=list(benchmarks.MUTABLE_BACKENDS),
+        help='comma separated graph backends [%(default)s]',
+    )
+    parser.add_argument(
+        '--operations', type=benchmarks.name_list(('insert', 'delete', 'edge')), default=['insert', 'delete', 'edge'],
+        help='comma separated operations to mix [%(default)s]',
+    )
+    parser.add_argument('--updates', type=int, default=1000, help='number of updates per run [%(default)s]')
+    parser.add_argument('--core-neighbours', type=int, default=8, help='core neighbours (η) [%(default)s]')
+    parser.add_argument(
+        '--max-pairs', type=float, default=1e8, help='skip backends estimated to evaluate more pairs [%(default)s]'
+    )
+    parser.add_argument('--seed', type=int, default=42, help='seed for points and updates [%(default)s]')
+    parser.add_argument('--output', type=argparse.FileType('a'), default=sys.stdout, help='file to append results to')
+    options = parser.parse_args()
+    run(
+        benchmarks.ResultWriter(options.output, 'latency'),
+        backends=options.backends, sizes=options.sizes, cluster_counts=options.clusters,
+        core_neighbours=options.core_neighbours, updates=options.updates, operations=options.operations,
+        max_pairs=options.max_pairs, seed=options.seed,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Memory footprint of graphs and clusterings by number of nodes and edges
+
+Every combination of backend, distribution and number of points is measured
+in a fresh interpreter, so that the peak resident memory of the process is
+specific to that combination. The benchmark records the peak RSS after
+generating points, building the graph and clustering it with
+:py:class:`~dengraph.dengraph.DenGraphIO`, as well as the estimates of
+``memory_usage()`` for each structure of the graph and clustering.
+
+.. code:: bash
+
+    python -m dengraph_examples.benchmarks.memory --sizes 1000,4000 --output memory.jsonl
+"""
+from __future__ import print_function, division
+import argparse
+import json
+import subprocess
+import sys
+
+from dengraph_examples import benchmarks
+from dengraph.dengraph import DenGraphIO
+
+
+def measure_single(backend_name, distribution, size, core_neighbours, seed):
+    """
+    Measure memory of a single combination in the current process
+
+    :returns: measurements as a :py:class:`dict`
+    """
+    cluster_distance, core_neighbours = benchmarks.clustering_parameters(size, core_neighbours)
+    points = benchmarks.make_points(distribution, size, seed)
+    points_rss = benchmarks.max_rss()
+    graph = benchmarks.BACKENDS[backend_name].build(points, cluster_distance)
+    graph_rss = benchmarks.max_rss()
+    clustering = DenGraphIO(graph, cluster_distance, core_neighbours)
+    clustering_rss = benchmarks.max_rss()
+    return {
+        'nodes': len(graph),
+        'edges': benchmarks.count_edges(graph),
+        'cluster_distance': cluster_distance, 'core_neighbours': core_neighbours,
+        'points_rss': points_rss, 'graph_rss': graph_rss, 'clustering_rss': clustering_rss,
+        'graph_usage': graph.memory_usage(), 'clustering_usage': clustering.memory_usage(),
+    }
+
+
+def run(writer, distributions, backends, sizes, core_neighbours=8, max_pairs=10 ** 8, seed=42):
+    """Run the benchmark for all combinations, each in a separate process"""
+    for size in sizes:
+        for distribution in distributions:
+            for backend_name in backends:
+                if benchmarks.BACKENDS[backend_name].pairs(size) > max_pairs:
+                    print('skipping %s for %s with %d points' % (backend_name, distribution, size), file=sys.stderr)
+                    continue
+                output = subprocess.check_output([
+                    sys.executable, '-m', 'dengraph_examples.benchmarks.memory',
+                    '--single', '%s,%s,%d' % (backend_name, distribution, size),
+                    '--core-neighbours', str(core_neighbours), '--seed', str(seed),
+                ])
+                writer.write(
+                    backend=backend_name, distribution=distribution, size=size, seed=seed,
+                    **json.loads(output.decode('utf-8'))
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=benchmarks.int_list, default=[1000, 4000, 16000],
+        help='comma separated numbers of points [%(default)s]',
+    )
+    parser.add_argument(
+        '--distributions', type=benchmarks.name_list(benchmarks.DISTRIBUTIONS), default=list(benchmarks.DISTRIBUTIONS),
+        help='comma separated distributions [%(default)s]',
+    )
+    parser.add_argument(
+        '--backends', type=benchmarks.name_list(benchmarks.BACKENDS), default=list(benchmarks.BACKENDS),
+        help='comma separated graph backends [%(default)s]',
+    )
+    parser.add_argument('--core-neighbours', type=int, default=8, help='core neighbours (η) [%(default)s]')
+    parser.add_argument(
+        '--max-pairs', type=float, default=1e8, help='skip backends estimated to evaluate more pairs [%(default)s]'
+    )
+    parser.add_argument('--seed', type=int, default=42, help='seed for generating points [%(default)s]')
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    parser.add_argument('--output', type=argparse.FileType('a'), default=sys.stdout, help='file to append results to')
+    options = parser.parse_args()
+    if options.single:
+        backend_name, distribution, size = options.single.split(',')
+        print(json.dumps(measure_single(backend_name, distribution, int(size), options.core_neighbours, options.seed)))
+        return
+    run(
+        benchmarks.ResultWriter(options.output, 'memory'),
+        distributions=options.distributions, backends=options.backends, sizes=options.sizes,
+        core_neighbours=options.core_neighbours, max_pairs=options.max_pairs, seed=options.seed,
+    )
+
+
+if __name__ == '__main__':
+    main()
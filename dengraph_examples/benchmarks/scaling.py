@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Scaling of graph construction and initial clustering with the number of nodes
+
+For every distribution, backend and number of points, the benchmark records
+the time to build the graph and to cluster it with
+:py:class:`~dengraph.dengraph.DenGraphIO`. Peak memory of each phase is
+measured in a second, traced run. The number of neighbour queries and
+distance calls is counted in a third, instrumented run, so that counting
+does not slow down the timed runs.
+
+.. code:: bash
+
+    python -m dengraph_examples.benchmarks.scaling --sizes 1000,10000 --output scaling.jsonl
+
+Backends whose estimated distance evaluations exceed ``--max-pairs`` are
+skipped for large numbers of points.
+"""
+from __future__ import print_function, division
+import argparse
+import sys
+
+from dengraph_examples import benchmarks
+from dengraph.dengraph import DenGraphIO
+from dengraph.instrumentation import ClusteringStats, instrumented
+
+
+def run_once(backend, points, cluster_distance, core_neighbours, trace_memory=False):
+    """
+    Build and cluster a graph of `points`
+
+    :returns: measurements as a :py:class:`dict`
+    """
+    graph, build_time, build_peak = benchmarks.measure(
+        lambda: backend.build(points, cluster_distance), trace_memory=trace_memory
+    )
+    clustering, cluster_time, cluster_peak = benchmarks.measure(
+        lambda: DenGraphIO(graph, cluster_distance, core_neighbours), trace_memory=trace_memory,
+    )
+    return {
+        'build_time': build_time, 'build_peak': build_peak,
+        'cluster_time': cluster_time, 'cluster_peak': cluster_peak,
+        'clusters': len(clustering.clusters), 'noise': len(clustering.noise),
+    }
+
+
+def count_queries(backend, points, cluster_distance, core_neighbours):
+    """
+    Count the neighbour queries and distance calls to cluster a graph of `points`
+
+    :returns: counts as a :py:class:`dict`
+    """
+    stats = ClusteringStats()
+    instrumented(DenGraphIO, backend.build(points, cluster_distance), cluster_distance, core_neighbours, stats=stats)
+    return {
+        'neighbour_queries': stats.counters['neighbour_queries'],
+        'distance_calls': stats.counters['distance_calls'],
+    }
+
+
+def run(writer, distributions, backends, sizes, core_neighbours=8, max_pairs=10 ** 8, seed=42, trace_memory=True):
+    """Run the benchmark for all combinations of `distributions`, `backends` and `sizes`"""
+    for size in sizes:
+        cluster_distance, core_neighbours = benchmarks.clustering_parameters(size, core_neighbours)
+        for distribution in distributions:
+            points = benchmarks.make_points(distribution, size, seed)
+            for backend_name in backends:
+                backend = benchmarks.BACKENDS[backend_name]
+                if backend.pairs(len(points)) > max_pairs:
+                    print('skipping %s for %s with %d points' % (backend_name, distribution, size), file=sys.stderr)
+                    continue
+                result = run_once(backend, points, cluster_distance, core_neighbours)
+                result.update(count_queries(backend, points, cluster_distance, core_neighbours))
+                if trace_memory:
+                    traced = run_once(backend, points, cluster_distance, core_neighbours, trace_memory=True)
+                    result['build_peak'], result['cluster_peak'] = traced['build_peak'], traced['cluster_peak']
+                writer.write(
+                    distribution=distribution, backend=backend_name, size=size, nodes=len(points), seed=seed,
+                    cluster_distance=cluster_distance, core_neighbours=core_neighbours, max_rss=benchmarks.max_rss(),
+                    **result
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=benchmarks.int_list, default=[1000, 10000, 100000, 1000000],
+        help='comma separated numbers of points [%(default)s]',
+    )
+    parser.add_argument(
+        '--distributions', type=benchmarks.name_list(benchmarks.DISTRIBUTIONS), default=list(benchmarks.DISTRIBUTIONS),
+        help='comma separated distributions [%(default)s]',
+    )
+    parser.add_argument(
+        '--backends', type=benchmarks.name_list(benchmarks.BACKENDS), default=list(benchmarks.BACKENDS),
+        help='comma separated graph backends [%(default)s]',
+    )
+    parser.add_argument('--core-neighbours', type=int, default=8, help='core neighbours (η) [%(default)s]')
+    parser.add_argument(
+        '--max-pairs', type=float, default=1e8, help='skip backends estimated to evaluate more pairs [%(default)s]'
+    )
+    parser.add_argument('--seed', type=int, default=42, help='seed for generating points [%(default)s]')
+    parser.add_argument('--no-memory', action='store_true', help='do not trace peak memory in a second run')
+    parser.add_argument('--output', type=argparse.FileType('a'), default=sys.stdout, help='file to append results to')
+    options = parser.parse_args()
+    run(
+        benchmarks.ResultWriter(options.output, 'scaling'),
+        distributions=options.distributions, backends=options.backends, sizes=options.sizes,
+        core_neighbours=options.core_neighbours, max_pairs=options.max_pairs, seed=options.seed,
+        trace_memory=not options.no_memory,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,7 @@ import matplotlib
 
 from dengraph_examples.distributions import Circle2D, Checkers, Moon, Gaussian
 from dengraph.utilities.pretty import str_time
-from dengraph.graphs import adjacency_graph, distance_graph
+from dengraph.graphs import grid_graph
 from dengraph.dengraph import DenGraphIO
 
 
@@ -73,21 +73,15 @@ if __name__ == "__main__":
             points = distribution(density)
             done_time = time.time()
             print('Generated %6d  points in %s' % (len(points), str_time(done_time - start_time)))
+            # guess clustering settings
+            # one percent of points make a cluster
+            distance = 0.05
             # create graph
             start_time = time.time()
-            graph = adjacency_graph.AdjacencyGraph(
-                distance_graph.DistanceGraph(
-                    nodes=points,
-                    distance=lambda point_a, point_b:
-                        math.sqrt((point_a[0] - point_b[0]) ** 2 + (point_a[1] - point_b[1]) ** 2)
-                )
-            )
+            graph = grid_graph.GridGraph(nodes=points, max_distance=distance)
             done_time = time.time()
             graph_time = done_time - start_time
-            print('Generated %6d^2 edges in %s' % (len(points), str_time(graph_time)))
-            # guess clustering settings
-            # one percent of points make a cluster
-            distance = 0.05
+            print('Generated %6d nodes grid in %s' % (len(points), str_time(graph_time)))
             neighbours = 0.666 * max(int(math.pi * density * (distance ** 2)), 1)
             # print('Clustering with %d neighbours, %.3f distance' % (neighbours, distance))
             # cluster graph
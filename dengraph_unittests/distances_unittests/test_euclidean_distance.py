@@ -0,0 +1,29 @@
+import unittest
+
+from dengraph.distances.euclidean_distance import EuclideanDistance
+
+
+class TestEuclideanDistance(unittest.TestCase):
+    def test_distance(self):
+        distance = EuclideanDistance()
+        self.assertEqual(5, distance((0, 0), (3, 4)))
+        self.assertEqual(5, distance((3, 4), (0, 0)))
+        self.assertEqual(3, distance((1, 1, 1), (2, 3, 3)))
+        self.assertEqual(0, distance((1.5, 2), (1.5, 2)))
+
+    def test_mean(self):
+        distance = EuclideanDistance()
+        self.assertEqual((1.5, 2.0), distance.mean([(0, 0), (3, 4)]))
+        self.assertEqual((1.5, 2.0), distance.mean((0, 0), (3, 4)))
+        self.assertEqual((1.0, 1.0), distance.mean(iter([(0, 0), (2, 2)])))
+        with self.assertRaises(ValueError):
+            distance.mean()
+        self.assertIsNone(distance.mean(default=None))
+
+    def test_median(self):
+        distance = EuclideanDistance()
+        self.assertEqual((1, 8), distance.median((0, 9), (1, 8), (5, 0)))
+        self.assertEqual((1, 8), distance.median([(0, 9), (1, 8), (5, 0)]))
+        with self.assertRaises(ValueError):
+            distance.median([])
+        self.assertIsNone(distance.median(default=None))
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+from dengraph_unittests.utility import unittest
+
+import dengraph_examples.benchmarks
+import dengraph_examples.benchmarks.latency
+import dengraph_examples.benchmarks.scaling
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestBenchmarks(unittest.TestCase):
+    def run_benchmark(self, benchmark, *arguments):
+        """Run the command line of `benchmark` with default arguments unless given, returning its records"""
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'dengraph_examples.benchmarks.' + benchmark] + list(arguments),
+            cwd=REPO_ROOT,
+        )
+        return [json.loads(line) for line in output.decode().splitlines()]
+
+    def test_scaling(self):
+        records = self.run_benchmark('scaling', '--sizes', '60')
+        self.assertEqual(
+            {(backend, distribution) for backend in dengraph_examples.benchmarks.BACKENDS
+             for distribution in dengraph_examples.benchmarks.DISTRIBUTIONS},
+            {(record['backend'], record['distribution']) for record in records},
+        )
+        # queries are counted in a separate run, since the timed run is not instrumented
+        self.assertTrue(all(record['neighbour_queries'] >= record['nodes'] for record in records))
+        self.assertEqual({'neighbour_queries', 'distance_calls'}, set(
+            dengraph_examples.benchmarks.scaling.count_queries(
+                dengraph_examples.benchmarks.BACKENDS['grid'], [(0, 0), (0, 0.1), (1, 1)], 0.5, 1
+            )
+        ))
+
+    def test_latency(self):
+        records = self.run_benchmark('latency', '--sizes', '60', '--updates', '20')
+        self.assertEqual(
+            set(dengraph_examples.benchmarks.MUTABLE_BACKENDS),
+            {record['backend'] for record in records},
+        )
+
+    def test_latency_unsupported(self):
+        # csr graphs can neither be modified by nodes nor by edges
+        self.assertEqual([], self.run_benchmark('latency', '--sizes', '60', '--updates', '20', '--backends', 'csr'))
+        with self.assertRaises(ValueError):
+            dengraph_examples.benchmarks.latency.run_once('csr', 60, 1, 8, 20, ['insert', 'delete', 'edge'], 42)
+        self.assertEqual(
+            ['insert', 'delete'],
+            dengraph_examples.benchmarks.latency.supported_operations('grid', ['insert', 'delete', 'edge'])
+        )
+
+    def test_count_edges(self):
+        points = [(0, 0), (0, 1), (0, 3), (5, 5)]
+        backends = dengraph_examples.benchmarks.BACKENDS
+        # graphs of all pairs connect every node, others only nearby nodes
+        for backend_name, edges in (
+                ('distance', 6), ('cached_distance', 6), ('kdtree', 6), ('adjacency', 2), ('csr', 2), ('grid', 2),
+        ):
+            with self.subTest(backend=backend_name):
+                graph = backends[backend_name].build(points, 2.5)
+                self.assertEqual(edges, dengraph_examples.benchmarks.count_edges(graph))
+
+    def test_memory(self):
+        records = self.run_benchmark('memory', '--sizes', '60')
+        self.assertEqual(
+            {(backend, distribution) for backend in dengraph_examples.benchmarks.BACKENDS
+             for distribution in dengraph_examples.benchmarks.DISTRIBUTIONS},
+            {(record['backend'], record['distribution']) for record in records},
+        )
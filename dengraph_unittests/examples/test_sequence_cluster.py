@@ -33,19 +33,18 @@ def format_sequence(seq):
 
 def format_clustering(seq, dgraph):
     """Format by cluster key, e.g. '   aAAAa bBBB-CCCd'"""
-    keys = {cluster: chr(ord('a') + idx) for idx, cluster in enumerate(sorted(dgraph.clusters, key=lambda clst: len(clst)))}
+    labels, core_mask, overlaps = dgraph.cluster_labels(seq)
+    indices = {elem: idx for idx, elem in enumerate(seq)}
     fmt = ''
     for elem in range(min(seq), max(seq) + 1):
-        elem_key = None
-        for cluster in dgraph.clusters:
-            if elem in cluster:
-                if elem_key is None:
-                    elem_key = keys[cluster] if elem in cluster.border_nodes else keys[cluster].upper()
-                else:
-                    fmt += '+'
-                    break
+        idx = indices.get(elem)
+        if idx is None or labels[idx] == -1:
+            fmt += ' '
+        elif idx in overlaps:
+            fmt += '+'
         else:
-            fmt += ' ' if elem_key is None else elem_key
+            elem_key = chr(ord('a') + labels[idx])
+            fmt += elem_key.upper() if core_mask[idx] else elem_key
     return fmt
 
 if __name__ == "__main__":
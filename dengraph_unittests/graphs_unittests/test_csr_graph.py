@@ -0,0 +1,69 @@
+import random
+
+import dengraph.graph
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.graphs.csr_graph import CSRGraph
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.dengraph import StaticDenGraph
+
+from dengraph_unittests.utility import unittest, GraphTestMixin
+
+
+class TestCSRGraph(GraphTestMixin, unittest.TestCase):
+    missing_node = 5
+
+    @staticmethod
+    def make_adjacency(rng, node_count, edge_count):
+        adjacency = {node: {} for node in range(node_count)}
+        for _ in range(edge_count):
+            node_a, node_b = rng.sample(range(node_count), 2)
+            adjacency[node_a][node_b] = adjacency[node_b][node_a] = rng.randint(1, 10)
+        return adjacency
+
+    def make_graph(self):
+        adjacency = {1: {2: 1, 3: 2}, 2: {1: 1}, 3: {1: 2}, 4: {}}
+        return CSRGraph(adjacency, symmetric=True), adjacency
+
+    def test_init(self):
+        super(TestCSRGraph, self).test_init()
+        adjacency = {1: {2: 1, 3: 2}, 2: {1: 1}, 3: {1: 2}, 4: {}}
+        graph = CSRGraph(AdjacencyGraph(adjacency, symmetric=True), symmetric=True)
+        self.assertEqual(adjacency, {node: graph[node] for node in graph})
+        bounded = CSRGraph(adjacency, max_distance=1)
+        self.assertEqual({2: 1}, bounded[1])
+        self.assertEqual(0, bounded.neighbour_count(3))
+        # nodes only used as neighbours are part of the graph
+        self.assertEqual({}, CSRGraph({1: {2: 1}})[2])
+        with self.assertRaises(TypeError):
+            CSRGraph([1, 2, 3])
+
+    def test_modify(self):
+        super(TestCSRGraph, self).test_modify()
+        graph, _ = self.make_graph()
+        with self.assertRaises(TypeError):
+            graph[5] = None
+        with self.assertRaises(TypeError):
+            del graph[1]
+
+    def test_neighbours(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                adjacency = self.make_adjacency(random.Random(seed), 50, 200)
+                reference = AdjacencyGraph(adjacency, symmetric=True)
+                graph = CSRGraph(adjacency, symmetric=True)
+                for distance in (dengraph.graph.ANY_DISTANCE, 0, 1, 5, 10):
+                    counts = graph.neighbour_counts(distance)
+                    for index, node in enumerate(graph):
+                        neighbours = set(reference.get_neighbours(node, distance))
+                        self.assertEqual(neighbours, set(graph.get_neighbours(node, distance)))
+                        self.assertEqual(len(neighbours), graph.neighbour_count(node, distance))
+                        self.assertEqual(len(neighbours), counts[index])
+
+    def test_clustering(self):
+        nodes = [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 40]
+        source = DistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True)
+        self.assertEqual(
+            StaticDenGraph(source, cluster_distance=5, core_neighbours=5),
+            StaticDenGraph(CSRGraph(source, max_distance=5, symmetric=True), cluster_distance=5, core_neighbours=5),
+        )
@@ -0,0 +1,54 @@
+import random
+
+import dengraph.graph
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.graphs.grid_graph import GridGraph
+from dengraph.distances.euclidean_distance import EuclideanDistance
+
+from dengraph_unittests.utility import unittest, make_points, PointGraphTestMixin
+
+
+class TestGridGraph(PointGraphTestMixin, unittest.TestCase):
+    def make_point_graph(self, points, max_distance=1):
+        return GridGraph(points, max_distance=max_distance)
+
+    def test_init(self):
+        super(TestGridGraph, self).test_init()
+        with self.assertRaises(ValueError):
+            GridGraph([], max_distance=0)
+
+    def test_access(self):
+        super(TestGridGraph, self).test_access()
+        graph = GridGraph([(0, 0), (0.5, 0), (0, 0.9), (2, 2)], max_distance=1)
+        # nodes further apart than the maximum distance are not connected, even for larger queries
+        self.assertEqual({(0.5, 0), (0, 0.9)}, set(graph.get_neighbours((0, 0), 5)))
+
+    def test_neighbours(self):
+        """Neighbours of the grid are the same as for all pairs of nodes"""
+        distance = EuclideanDistance()
+        for dimensions in (1, 2, 3):
+            for max_distance in (0.1, 0.3, 1.5):
+                with self.subTest(dimensions=dimensions, max_distance=max_distance):
+                    rng = random.Random(dimensions)
+                    points = make_points(rng, 200, dimensions)
+                    graph = GridGraph(points[:150], max_distance=max_distance)
+                    for point in points[150:]:
+                        graph[point] = None
+                    for point in points[:50]:
+                        del graph[point]
+                    expected = DistanceGraph(points[50:], distance)
+                    self.assertEqual(set(expected), set(graph))
+                    for point in points[50:]:
+                        for query_distance in (max_distance / 2, max_distance, dengraph.graph.ANY_DISTANCE):
+                            limit = max_distance if query_distance is dengraph.graph.ANY_DISTANCE else query_distance
+                            self.assertEqual(
+                                set(expected.get_neighbours(point, limit)),
+                                set(graph.get_neighbours(point, query_distance)),
+                            )
+
+    def test_memory_usage(self):
+        graph = GridGraph([(0, 0), (0.5, 0), (2, 2)], max_distance=1)
+        usage = graph.memory_usage()
+        self.assertEqual({'node_table', 'grid_cells'}, set(usage))
+        self.assertGreater(usage['grid_cells'], 0)
+        self.assertIn('GridGraph', repr(graph))
@@ -0,0 +1,97 @@
+import math
+import random
+
+import dengraph.graph
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.graphs.kdtree_graph import KDTreeGraph
+from dengraph.distances.euclidean_distance import EuclideanDistance
+
+from dengraph_unittests.utility import unittest, make_points, PointGraphTestMixin
+
+
+class TestKDTreeGraph(PointGraphTestMixin, unittest.TestCase):
+    connects_all = True
+
+    def make_point_graph(self, points, max_distance=1):
+        return KDTreeGraph(points, leaf_size=1)
+
+    def test_init(self):
+        super(TestKDTreeGraph, self).test_init()
+        with self.assertRaises(ValueError):
+            KDTreeGraph([], leaf_size=0)
+        self.assertEqual({}, KDTreeGraph([]).get_neighbours_many([], 1))
+
+    def test_access(self):
+        super(TestKDTreeGraph, self).test_access()
+        graph = KDTreeGraph([(0, 0), (0.5, 0), (0, 0.9), (2, 2)], leaf_size=1)
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            graph.get_neighbours_many([(0, 0), (1, 1)], 1)
+
+    def test_modify(self):
+        super(TestKDTreeGraph, self).test_modify()
+        graph = KDTreeGraph([(0, 0), (2, 2)])
+        del graph[(2, 2)]
+        self.assertEqual(set(), set(graph.get_neighbours((0, 0), 5)))
+        graph[(2, 2)] = None
+        self.assertEqual({(2, 2)}, set(graph.get_neighbours((0, 0), 5)))
+
+    def test_neighbours(self):
+        """Neighbours of the tree are the same as for all pairs of nodes"""
+        distance = EuclideanDistance()
+        for dimensions in (1, 2, 5):
+            for leaf_size in (1, 16):
+                with self.subTest(dimensions=dimensions, leaf_size=leaf_size):
+                    rng = random.Random(dimensions)
+                    points = make_points(rng, 200, dimensions)
+                    graph = KDTreeGraph(points[:150], leaf_size=leaf_size)
+                    # interleave modifications and queries to rebuild the tree lazily
+                    for index, point in enumerate(points[150:]):
+                        graph[point] = None
+                        del graph[points[index]]
+                        if index % 10 == 0:
+                            self.assertEqual(
+                                {other for other in graph if other != point and distance(point, other) <= 0.5},
+                                set(graph.get_neighbours(point, 0.5)),
+                            )
+                    expected = DistanceGraph(points[50:], distance)
+                    self.assertEqual(set(expected), set(graph))
+                    for query_distance in (0, 0.2, 1.5, dengraph.graph.ANY_DISTANCE):
+                        many = graph.get_neighbours_many(points[50:], query_distance)
+                        self.assertEqual(set(points[50:]), set(many))
+                        for point in points[50:]:
+                            neighbours = set(expected.get_neighbours(point, query_distance))
+                            self.assertEqual(neighbours, set(graph.get_neighbours(point, query_distance)))
+                            self.assertEqual(neighbours, set(many[point]))
+                            self.assertEqual(len(neighbours), len(many[point]))
+
+    def test_incremental(self):
+        """Nodes added and removed one by one are indexed by few trees"""
+        distance = EuclideanDistance()
+        rng = random.Random(42)
+        points = make_points(rng, 600, 2)
+        graph = KDTreeGraph(points[:100], leaf_size=4)
+        for index, point in enumerate(points[100:]):
+            graph[point] = None
+            if index % 3 == 0:
+                del graph[points[index]]
+            self.assertEqual(
+                {other for other in graph if other != point and distance(point, other) <= 0.2},
+                set(graph.get_neighbours(point, 0.2)),
+            )
+            # trees at least double in size, and the pending nodes fit into a leaf
+            sizes = [len(ordered) for ordered, _ in graph._trees]
+            self.assertLessEqual(len(sizes), math.log(len(graph) + len(graph._removed), 2) + 1)
+            self.assertLessEqual(len(graph._pending), graph.leaf_size)
+            self.assertLessEqual(len(graph._removed), max(graph.leaf_size, graph.rebuild_fraction * len(graph)))
+        remaining = list(graph)
+        for point in remaining[:400]:
+            del graph[point]
+            self.assertEqual(set(), set(graph.get_neighbours(remaining[-1], 0)))
+            self.assertLessEqual(len(graph._removed), max(graph.leaf_size, graph.rebuild_fraction * len(graph)))
+
+    def test_memory_usage(self):
+        graph = KDTreeGraph([(0, 0), (0.5, 0), (2, 2)])
+        usage = graph.memory_usage()
+        self.assertEqual({'node_table', 'tree', 'tree_changes'}, set(usage))
+        self.assertGreater(usage['tree'], 0)
+        self.assertIn('KDTreeGraph', repr(graph))
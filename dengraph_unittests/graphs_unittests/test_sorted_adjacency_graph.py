@@ -0,0 +1,118 @@
+import random
+
+import dengraph.graph
+from dengraph.graphs.adjacency_graph import BoundedAdjacencyGraph, SortedAdjacencyGraph
+from dengraph.dengraph import DenGraphIO
+
+from dengraph_unittests.utility import unittest
+
+
+class TestSortedAdjacencyGraph(unittest.TestCase):
+    def assertSameNeighbours(self, expected, graph, distances=(0, 1, 2.5, 5, 10, dengraph.graph.ANY_DISTANCE)):
+        self.assertEqual(set(expected), set(graph))
+        for node in expected:
+            self.assertEqual(expected[node], graph[node])
+            for distance in distances:
+                neighbours = list(graph.get_neighbours(node, distance))
+                self.assertEqual(set(expected.get_neighbours(node, distance)), set(neighbours))
+                self.assertEqual(len(neighbours), graph.neighbour_count(node, distance))
+                # neighbours are ordered by distance
+                node_distances = [graph[node:neighbour] for neighbour in neighbours]
+                self.assertEqual(sorted(node_distances), node_distances)
+
+    def test_init(self):
+        adjacency = {1: {2: 3, 3: 1, 4: 2}, 2: {1: 3}, 3: {1: 1}, 4: {1: 2}}
+        graph = SortedAdjacencyGraph(adjacency, symmetric=True)
+        self.assertEqual([3, 4, 2], list(graph.get_neighbours(1)))
+        self.assertEqual([3, 4], list(graph.get_neighbours(1, 2)))
+        self.assertEqual(2, graph.neighbour_count(1, 2))
+        self.assertEqual(3, graph.neighbour_count(1))
+        self.assertEqual(0, graph.neighbour_count(2, 2))
+        bounded = SortedAdjacencyGraph(adjacency, max_distance=2, symmetric=True)
+        self.assertEqual([3, 4], list(bounded.get_neighbours(1)))
+        self.assertEqual(0, bounded.neighbour_count(2))
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            graph.get_neighbours(5)
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            graph.neighbour_count(5)
+        self.assertIn('ordered_adjacency', graph.memory_usage())
+
+    def test_modify(self):
+        graph = SortedAdjacencyGraph({1: {2: 3, 3: 1}, 2: {1: 3}, 3: {1: 1}}, max_distance=5, symmetric=True)
+        graph[1:2] = 0.5
+        self.assertEqual([2, 3], list(graph.get_neighbours(1)))
+        # edges beyond the maximum distance are ignored
+        graph[1:3] = 10
+        self.assertEqual([2, 3], list(graph.get_neighbours(1)))
+        self.assertEqual(1, graph[3:1])
+        graph[4] = {1: 2, 2: 4}
+        self.assertEqual([2, 3, 4], list(graph.get_neighbours(1)))
+        self.assertEqual([1, 4], list(graph.get_neighbours(2)))
+        del graph[1:4]
+        self.assertEqual([2, 3], list(graph.get_neighbours(1)))
+        self.assertEqual([2], list(graph.get_neighbours(4)))
+        del graph[2]
+        self.assertEqual([3], list(graph.get_neighbours(1)))
+        self.assertEqual([], list(graph.get_neighbours(4)))
+        graph[5] = None
+        self.assertEqual(0, graph.neighbour_count(5))
+        with self.assertRaises(dengraph.graph.NoSuchEdge):
+            del graph[1:5]
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            del graph[6]
+        self.assertEqual([3], list(graph.get_neighbours(1)))
+
+    def test_random_modifications(self):
+        """Random modifications keep the same neighbours as an unordered graph"""
+        for symmetric in (True, False):
+            for seed in range(5):
+                with self.subTest(symmetric=symmetric, seed=seed):
+                    rng = random.Random(seed)
+                    expected = BoundedAdjacencyGraph(max_distance=8, symmetric=symmetric)
+                    graph = SortedAdjacencyGraph(max_distance=8, symmetric=symmetric)
+                    for _ in range(300):
+                        nodes = list(expected)
+                        operation = rng.choice(('node', 'node', 'edge', 'edge', 'edge', 'del_node', 'del_edge'))
+                        if operation == 'node' or len(nodes) < 2:
+                            node = rng.randint(0, 30)
+                            if node in expected:
+                                continue
+                            value = {
+                                other: rng.randint(0, 10) for other in rng.sample(nodes, min(len(nodes), 4))
+                            }
+                            expected[node] = value
+                            graph[node] = value
+                        elif operation == 'edge':
+                            node_a, node_b = rng.sample(nodes, 2)
+                            distance = rng.randint(0, 10)
+                            expected[node_a:node_b] = distance
+                            graph[node_a:node_b] = distance
+                        elif operation == 'del_node':
+                            node = rng.choice(nodes)
+                            del expected[node]
+                            del graph[node]
+                        elif operation == 'del_edge':
+                            node = rng.choice(nodes)
+                            if not expected[node]:
+                                continue
+                            neighbour = rng.choice(list(expected[node]))
+                            del expected[node:neighbour]
+                            del graph[node:neighbour]
+                    self.assertSameNeighbours(expected, graph)
+                    self.assertSameNeighbours(
+                        expected, SortedAdjacencyGraph(expected, max_distance=8, symmetric=symmetric)
+                    )
+
+    def test_clustering(self):
+        rng = random.Random(42)
+        adjacency = {node: {} for node in range(60)}
+        for _ in range(200):
+            node_a, node_b = rng.sample(range(60), 2)
+            adjacency[node_a][node_b] = adjacency[node_b][node_a] = rng.randint(1, 10)
+        expected = DenGraphIO(BoundedAdjacencyGraph(adjacency, symmetric=True), 4, 3)
+        clustering = DenGraphIO(SortedAdjacencyGraph(adjacency, symmetric=True), 4, 3)
+        self.assertEqual(
+            sorted(sorted(cluster) for cluster in expected.clusters),
+            sorted(sorted(cluster) for cluster in clustering.clusters),
+        )
+        self.assertEqual(expected.noise, clustering.noise)
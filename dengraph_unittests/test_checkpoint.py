@@ -0,0 +1,85 @@
+import io
+
+import dengraph.graph
+import dengraph.dengraph
+import dengraph.graphs.adjacency_graph
+
+from dengraph_unittests.utility import unittest, random_nodes
+
+from dengraph.dengraph import DenGraphIO, NonOverlappingDenGraph
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.graphs.distance_graph import CachedDistanceGraph
+from dengraph.checkpoint import write_checkpoint, read_checkpoint, CheckpointError
+
+
+class NoQueryGraph(CachedDistanceGraph):
+    """Graph which must not be queried for neighbours"""
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        raise AssertionError('neighbours of %r queried' % node)
+
+
+class TestCheckpoint(unittest.TestCase):
+    @staticmethod
+    def roundtrip(clustering, base_graph):
+        stream = io.BytesIO()
+        write_checkpoint(clustering, stream)
+        stream.seek(0)
+        return read_checkpoint(stream, base_graph)
+
+    def test_roundtrip(self):
+        for nodes in (
+                [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 40],
+                [],
+                random_nodes(100, 10) + random_nodes(100, 40),
+        ):
+            with self.subTest(nodes=nodes):
+                clustering = DenGraphIO(
+                    CachedDistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True),
+                    cluster_distance=5, core_neighbours=5
+                )
+                restored = self.roundtrip(
+                    clustering, NoQueryGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True)
+                )
+                self.assertEqual(clustering, restored)
+                self.assertEqual(
+                    sorted(cluster.cluster_id for cluster in clustering.clusters),
+                    sorted(cluster.cluster_id for cluster in restored.clusters)
+                )
+                self.assertEqual(clustering._neighbour_counts, restored._neighbour_counts)
+                for node in nodes:
+                    self.assertEqual(
+                        sorted(cluster.cluster_id for cluster in clustering.clusters_for_node(node)),
+                        sorted(cluster.cluster_id for cluster in restored.clusters_for_node(node))
+                    )
+
+    def test_updates(self):
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {node: {} for node in range(1, 9)}, symmetric=True
+        )
+        for node_a, node_b in ((1, 2), (1, 3), (2, 3), (5, 6), (5, 7), (5, 8), (6, 7), (6, 8), (7, 8)):
+            graph[node_a:node_b] = 1
+        clustering = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=2)
+        clustering[4] = {3: 1, 5: 1}
+        restored = self.roundtrip(clustering, graph)
+        self.assertEqual(clustering.cluster_lineage, restored.cluster_lineage)
+        # updates continue from the restored state without reusing ids
+        del restored[4]
+        self.assertEqual(DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=2), restored)
+        self.assertEqual({1, 2}, {cluster.cluster_id for cluster in restored.clusters})
+        self.assertEqual(dengraph.dengraph.SPLIT_FROM, restored.cluster_lineage[2].relation)
+
+    def test_mismatch(self):
+        clustering = DenGraphIO(
+            CachedDistanceGraph(nodes=[1, 2, 3], distance=DeltaDistance(), symmetric=True),
+            cluster_distance=5, core_neighbours=2
+        )
+        with self.assertRaises(CheckpointError):
+            self.roundtrip(clustering, CachedDistanceGraph(nodes=[1, 2], distance=DeltaDistance(), symmetric=True))
+        with self.assertRaises(CheckpointError):
+            self.roundtrip(clustering, CachedDistanceGraph(nodes=[1, 2, 4], distance=DeltaDistance(), symmetric=True))
+        with self.assertRaises(CheckpointError):
+            read_checkpoint(io.BytesIO(b'DGCP'), clustering.graph)
+        with self.assertRaises(CheckpointError):
+            read_checkpoint(io.BytesIO(b'not a checkpoint'), clustering.graph)
+        with self.assertRaises(ValueError):
+            write_checkpoint(NonOverlappingDenGraph(clustering.graph, cluster_distance=5, core_neighbours=2), io.BytesIO())
@@ -2,7 +2,7 @@ import unittest
 
 import dengraph.graph
 
-from dengraph.cluster import DenGraphCluster, FrozenDenGraphCluster, GraphError
+from dengraph.cluster import DenGraphCluster, FrozenDenGraphCluster, ClusterRegistry, GraphError
 from dengraph.graphs.distance_graph import DistanceGraph
 from dengraph.distances.delta_distance import DeltaDistance
 
@@ -124,6 +124,11 @@ class TestDenGraphCluster(unittest.TestCase):
         cluster_a += cluster_b
         self.assertEqual(set([1, 2]), cluster_a.core_nodes)
         self.assertEqual(set([3, 4]), cluster_a.border_nodes)
+        # border nodes of the added cluster may be core already
+        cluster_c = DenGraphCluster(graph, core_nodes=[4], border_nodes=[1, 3])
+        cluster_a += cluster_c
+        self.assertEqual(set([1, 2, 4]), cluster_a.core_nodes)
+        self.assertEqual(set([3]), cluster_a.border_nodes)
 
     def test_sub_differing_graphs(self):
         cluster_a = DenGraphCluster(graph=DistanceGraph(
@@ -202,3 +207,60 @@ class TestDenGraphCluster(unittest.TestCase):
         with self.assertRaises(TypeError):
             frozen -= cluster
         self.assertIsNotNone({frozen: True})
+
+
+class TestClusterRegistry(unittest.TestCase):
+    @staticmethod
+    def make_cluster(*core_nodes):
+        graph = DistanceGraph(nodes=range(10), distance=DeltaDistance(), symmetric=True)
+        return DenGraphCluster(graph, core_nodes=core_nodes)
+
+    def test_order(self):
+        small, medium, large = self.make_cluster(1), self.make_cluster(2, 3), self.make_cluster(4, 5, 6)
+        registry = ClusterRegistry([large, small, medium])
+        self.assertEqual(3, len(registry))
+        self.assertEqual([small, medium, large], list(registry))
+        self.assertIs(small, registry[0])
+        self.assertEqual([medium, large], registry[1:])
+        small.categorize_node(7, small.CORE_NODE)
+        small.categorize_node(8, small.CORE_NODE)
+        small.categorize_node(9, small.CORE_NODE)
+        registry.sort(key=len)
+        self.assertEqual([medium, large, small], registry)
+        registry.sort(key=len, reverse=True)
+        self.assertIs(small, registry[0])
+
+    def test_membership(self):
+        cluster, other = self.make_cluster(1), self.make_cluster(2)
+        registry = ClusterRegistry()
+        self.assertEqual([], registry)
+        registry.append(cluster)
+        registry.append(cluster)
+        self.assertEqual(1, len(registry))
+        self.assertIn(cluster, registry)
+        self.assertIn(self.make_cluster(1), registry)
+        self.assertNotIn(other, registry)
+        with self.assertRaises(ValueError):
+            registry.remove(other)
+        registry.discard(other)
+        registry.append(other)
+        # equal clusters are removed like in a list
+        registry.remove(self.make_cluster(1))
+        self.assertEqual([other], registry)
+        registry.remove(other)
+        registry.append(other)
+        self.assertEqual([other], registry)
+        registry.clear()
+        self.assertEqual(0, len(registry))
+        self.assertEqual([], list(registry))
+
+    def test_cluster_ids(self):
+        clusters = [self.make_cluster(1), self.make_cluster(2), self.make_cluster(3)]
+        registry = ClusterRegistry(clusters[:2])
+        self.assertEqual([0, 1], [cluster.cluster_id for cluster in clusters[:2]])
+        registry.remove(clusters[0])
+        registry.append(clusters[2])
+        registry.append(clusters[0])
+        # ids are neither reused nor reassigned
+        self.assertEqual([0, 1, 2], [cluster.cluster_id for cluster in clusters])
+        self.assertEqual(1, FrozenDenGraphCluster(clusters[1]).cluster_id)
@@ -1,4 +1,5 @@
 import textwrap
+import collections
 import unittest
 import random
 import csv
@@ -8,12 +9,17 @@ import sys
 import io
 
 import dengraph.graph
+import dengraph.dengraph
+import dengraph.events
+import dengraph.instrumentation
 import dengraph.graphs.graph_io
+import dengraph.graphs.adjacency_graph
 
-from dengraph.dengraph import DenGraphIO
+from dengraph.dengraph import DenGraphIO, StaticDenGraph, NonOverlappingDenGraph, DenGraphO
 from dengraph.graphs.distance_graph import CachedDistanceGraph
 
 import dengraph_unittests
+from dengraph_unittests.utility import random_nodes, two_cluster_graph, ClusteringTestCase
 
 
 class DeltaDistance(object):
@@ -23,14 +29,21 @@ class DeltaDistance(object):
         return abs(a - b)
 
 
+class QueryCountingGraph(CachedDistanceGraph):
+    """Graph counting the neighbour queries for each node"""
+    def __init__(self, *args, **kwargs):
+        super(QueryCountingGraph, self).__init__(*args, **kwargs)
+        self.queries = {}
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        self.queries[node] = self.queries.get(node, 0) + 1
+        return super(QueryCountingGraph, self).get_neighbours(node, distance)
+
+
 class TestDenGraphIO(unittest.TestCase):
     #: the distance function/class with which to test
     distance_cls = DeltaDistance
 
-    @staticmethod
-    def random_nodes(length, base):
-        return [random.randint(base, 2*base) for _ in range(length)]
-
     def test_containment(self):
         io_graph = DenGraphIO(
             base_graph=CachedDistanceGraph(
@@ -150,7 +163,7 @@ class TestDenGraphIO(unittest.TestCase):
 
     def test_simple_graph(self):
         graph = CachedDistanceGraph(
-            nodes=self.random_nodes(100, 10) + self.random_nodes(100, 40),
+            nodes=random_nodes(100, 10) + random_nodes(100, 40),
             distance=self.distance_cls(),
             symmetric=True
         )
@@ -161,6 +174,24 @@ class TestDenGraphIO(unittest.TestCase):
         )
         self.assertEqual(2, len(io_graph.clusters))
 
+    def test_init_queries(self):
+        # overlapping border nodes, noise and border nodes visited before their cluster
+        for nodes in (
+                [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20],
+                [1, 2, 3, 4, 5, 6, 20, 30, 31],
+                random_nodes(100, 10) + random_nodes(100, 40),
+        ):
+            with self.subTest(nodes=nodes):
+                graph = CachedDistanceGraph(nodes=nodes, distance=self.distance_cls(), symmetric=True)
+                io_graph = dengraph.instrumentation.instrumented(
+                    DenGraphIO, base_graph=graph, cluster_distance=5, core_neighbours=5
+                )
+                # every node must be queried to be clustered, so this many queries means one per node
+                self.assertEqual(len(graph), io_graph.stats.counters['neighbour_queries'])
+                self.assertEqual(io_graph, self._validation_graph_for_nodes(
+                    nodes=nodes, distance=self.distance_cls, cluster_distance=5, core_neighbours=5
+                ))
+
     def test_core_count(self):
         nodes = [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20]
         graph = self._validation_graph_for_nodes(
@@ -236,6 +267,371 @@ class TestDenGraphIO(unittest.TestCase):
             io_graph[node] = {}
         self.assertEqual(validation_io_graph, io_graph)
 
+    def test_bulk_insert(self):
+        for base_nodes, new_nodes in (
+                ([], [1, 2, 3, 4, 5, 6]),
+                ([1, 2, 3, 4, 5, 6], [30, 31]),
+                ([1, 2, 3, 4, 5, 6, 14, 15, 16, 17, 18, 19], [9, 10]),
+                ([1, 2, 3, 20, 21, 22, 40], [4, 5, 6, 7, 23, 24, 25, 30, 41]),
+                (random_nodes(50, 10), random_nodes(50, 10) + random_nodes(50, 40)),
+        ):
+            with self.subTest(base_nodes=base_nodes, new_nodes=new_nodes):
+                graph = QueryCountingGraph(nodes=base_nodes, distance=self.distance_cls(), symmetric=True)
+                io_graph = DenGraphIO(base_graph=graph, cluster_distance=5, core_neighbours=5)
+                graph.queries.clear()
+                io_graph.update_many(new_nodes)
+                self.assertEqual(self._validation_graph_for_nodes(
+                    nodes=base_nodes + new_nodes, distance=self.distance_cls, cluster_distance=5, core_neighbours=5
+                ), io_graph)
+                self.assertLessEqual(max(graph.queries.values() or [0]), 1)
+                self.assertClusterIndex(io_graph)
+
+    def test_bulk_insert_mapping(self):
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {node: {} for node in range(1, 7)}, symmetric=True
+        )
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=3)
+        self.assertEqual(set(range(1, 7)), io_graph.noise)
+        io_graph.update_many({7: {1: 1, 2: 1, 3: 1}, 8: {4: 1, 5: 2, 7: 1}})
+        self.assertEqual(1, len(io_graph.clusters))
+        self.assertEqual({7}, io_graph.clusters[0].core_nodes)
+        self.assertEqual({1, 2, 3, 8}, io_graph.clusters[0].border_nodes)
+        self.assertEqual({4, 5, 6}, io_graph.noise)
+
+    def test_set_existing_node(self):
+        """Setting a node to itself, `None` or its current adjacency keeps its edges"""
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {1: {2: 1, 3: 1}, 2: {1: 1, 3: 1}, 3: {1: 1, 2: 1}, 4: {}}, symmetric=True
+        )
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=2)
+        for value in (1, None, graph[1]):
+            with self.subTest(value=value):
+                io_graph[1] = value
+                self.assertEqual({2: 1, 3: 1}, graph[1])
+                self.assertEqual(1, len(io_graph.clusters))
+                self.assertEqual({1, 2, 3}, io_graph.clusters[0].core_nodes)
+                self.assertEqual({4}, io_graph.noise)
+                self.assertClusterIndex(io_graph)
+
+    def test_bulk_replace(self):
+        """Nodes added and replaced in one batch may refer to each other"""
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {1: {2: 1}, 2: {1: 1, 3: 1}, 3: {2: 1}, 4: {}}, symmetric=True
+        )
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=2)
+        io_graph.update_many(collections.OrderedDict(((6, {4: 1}), (5, {2: 1, 6: 1}), (2, {3: 1, 4: 1}))))
+        self.assertEqual(
+            {1: {}, 2: {3: 1, 4: 1}, 3: {2: 1}, 4: {2: 1, 6: 1}, 5: {6: 1}, 6: {4: 1, 5: 1}},
+            {node: graph[node] for node in graph}
+        )
+        self.assertEqual(DenGraphIO(
+            base_graph=dengraph.graphs.adjacency_graph.AdjacencyGraph(graph, symmetric=True),
+            cluster_distance=1, core_neighbours=2,
+        ), io_graph)
+        self.assertEqual(len(graph), sum(map(len, io_graph.clusters)) + len(io_graph.noise))
+        self.assertClusterIndex(io_graph)
+        # nothing is modified if any node is unknown
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            io_graph.update_many({7: {1: 1}, 2: {8: 1}})
+        self.assertNotIn(7, graph)
+        self.assertEqual({3: 1, 4: 1}, graph[2])
+
+    def test_bulk_same_as_sequential(self):
+        """Adding and replacing nodes in bulk is the same as setting them one by one"""
+        rng = random.Random(42)
+        for _ in range(20):
+            adjacency = {node: {} for node in range(30)}
+            for _ in range(60):
+                node_a, node_b = rng.sample(range(30), 2)
+                adjacency[node_a][node_b] = adjacency[node_b][node_a] = rng.choice((1, 2))
+            # new and replaced nodes only refer to nodes set before them
+            batch, known = collections.OrderedDict(), list(range(30))
+            for node in rng.sample(range(30), 8) + list(range(30, 38)):
+                batch[node] = {neighbour: rng.choice((1, 2)) for neighbour in rng.sample(known, 4) if neighbour != node}
+                known.append(node)
+            with self.subTest(adjacency=adjacency, batch=batch):
+                sequential = DenGraphIO(
+                    dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True), 1, 3
+                )
+                bulk = DenGraphIO(dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True), 1, 3)
+                for node, value in batch.items():
+                    sequential[node] = value
+                bulk.update_many(batch)
+                self.assertEqual(
+                    {node: sequential.graph[node] for node in sequential.graph},
+                    {node: bulk.graph[node] for node in bulk.graph},
+                )
+                self.assertEqual(sequential, bulk)
+                self.assertEqual(sequential._neighbour_counts, bulk._neighbour_counts)
+                self.assertClusterIndex(bulk)
+
+    def test_add_edge(self):
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {1: {2: 1, 3: 1, 4: 1}, 2: {1: 1}, 3: {1: 1}, 4: {1: 1}, 5: {}, 6: {}}, symmetric=True
+        )
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=3)
+        io_graph[1:5] = 1
+        self.assertEqual({1}, io_graph.clusters[0].core_nodes)
+        self.assertEqual({2, 3, 4, 5}, io_graph.clusters[0].border_nodes)
+        self.assertEqual({6}, io_graph.noise)
+        io_graph[5:6] = 1
+        io_graph[5:2] = 1
+        self.assertEqual({1, 5}, io_graph.clusters[0].core_nodes)
+        self.assertEqual({2, 3, 4, 6}, io_graph.clusters[0].border_nodes)
+        self.assertEqual(set(), io_graph.noise)
+        self.assertClusterIndex(io_graph)
+
+    def test_neighbour_counts(self):
+        graph = QueryCountingGraph(nodes=[1, 2, 3, 20, 21, 40], distance=self.distance_cls(), symmetric=True)
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=5, core_neighbours=3)
+        self.assertEqual({1: 2, 2: 2, 3: 2, 20: 1, 21: 1, 40: 0}, io_graph._neighbour_counts)
+        graph.queries.clear()
+        # neighbours which are not promoted are not queried
+        io_graph[22] = None
+        self.assertEqual({22: 1}, graph.queries)
+        self.assertEqual(2, io_graph._neighbour_counts[21])
+        graph.queries.clear()
+        # only promoted neighbours are queried
+        io_graph[4] = None
+        self.assertEqual({1: 1, 2: 1, 3: 1, 4: 1}, graph.queries)
+        self.assertEqual({1, 2, 3, 4}, io_graph.clusters[0].core_nodes)
+        graph.queries.clear()
+        del io_graph[40]
+        self.assertEqual({40: 1}, graph.queries)
+        self.assertEqual(self._validation_graph_for_nodes(
+            nodes=[1, 2, 3, 4, 20, 21, 22], distance=self.distance_cls, cluster_distance=5, core_neighbours=3
+        ), io_graph)
+
+    def test_reweight_edge(self):
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {1: {2: 1, 3: 1, 4: 2}, 2: {1: 1}, 3: {1: 1}, 4: {1: 2}}, symmetric=True
+        )
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=3)
+        self.assertEqual(set(range(1, 5)), io_graph.noise)
+        io_graph[1:4] = 1
+        self.assertEqual({1}, io_graph.clusters[0].core_nodes)
+        self.assertEqual({2, 3, 4}, io_graph.clusters[0].border_nodes)
+        io_graph[1:2] = 2
+        self.assertEqual([], io_graph.clusters)
+        self.assertEqual(set(range(1, 5)), io_graph.noise)
+        self.assertEqual({1: 2, 2: 0, 3: 1, 4: 1}, io_graph._neighbour_counts)
+        self.assertClusterIndex(io_graph)
+
+    def test_merge_by_size(self):
+        io_graph = DenGraphIO(base_graph=two_cluster_graph(), cluster_distance=1, core_neighbours=2)
+        small, large = io_graph.clusters
+        self.assertEqual(({1, 2, 3}, {5, 6, 7, 8}), (small.core_nodes, large.core_nodes))
+        # the bridge node joins both clusters, keeping the larger one
+        io_graph[4] = {3: 1, 5: 1}
+        self.assertEqual([large], list(io_graph.clusters))
+        self.assertEqual(set(range(1, 9)), large.core_nodes)
+        self.assertClusterIndex(io_graph)
+
+    def test_cluster_labels(self):
+        nodes = [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 40]
+        io_graph = self._validation_graph_for_nodes(
+            nodes=nodes, distance=self.distance_cls, cluster_distance=5, core_neighbours=5
+        )
+        labels, core_mask, overlaps = io_graph.cluster_labels(nodes)
+        self.assertEqual(len(nodes), len(labels))
+        self.assertEqual(len(nodes), len(core_mask))
+        self.assertEqual({nodes.index(9): (1,)}, overlaps)
+        for index, node in enumerate(nodes):
+            node_labels = [label for label, cluster in enumerate(io_graph.clusters) if node in cluster]
+            self.assertEqual(node_labels[:1] or [-1], [labels[index]])
+            self.assertEqual(tuple(node_labels[1:]), overlaps.get(index, ()))
+            self.assertEqual(any(node in cluster.core_nodes for cluster in io_graph.clusters), core_mask[index])
+        self.assertEqual(
+            list(io_graph.cluster_labels(list(io_graph.graph)).labels), list(io_graph.cluster_labels().labels)
+        )
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            io_graph.cluster_labels([1, 41])
+
+    def test_events(self):
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(
+            {node: {} for node in range(1, 8)}, symmetric=True
+        )
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=1, core_neighbours=2)
+        queue = dengraph.events.EventQueue()
+        io_graph.event_listeners.append(queue)
+        io_graph.update_many({8: {1: 1, 2: 1}, 9: {4: 1, 5: 1}})
+        events = list(queue.drain())
+        created = [event.cluster for event in events if isinstance(event, dengraph.events.ClusterCreated)]
+        self.assertEqual(2, len(created))
+        self.assertEqual(
+            {
+                (8, None, dengraph.events.CORE_NODE), (9, None, dengraph.events.CORE_NODE),
+                (1, dengraph.events.NOISE_NODE, dengraph.events.BORDER_NODE),
+                (2, dengraph.events.NOISE_NODE, dengraph.events.BORDER_NODE),
+                (4, dengraph.events.NOISE_NODE, dengraph.events.BORDER_NODE),
+                (5, dengraph.events.NOISE_NODE, dengraph.events.BORDER_NODE),
+            },
+            {tuple(event) for event in events if isinstance(event, dengraph.events.NodeChanged)}
+        )
+        # bridge between both clusters
+        io_graph[3] = {2: 1, 4: 1}
+        events = list(queue.drain())
+        merged = [event for event in events if isinstance(event, dengraph.events.ClustersMerged)]
+        self.assertEqual(1, len(merged))
+        self.assertEqual({merged[0].cluster, merged[0].absorbed}, set(created))
+        self.assertEqual([merged[0].cluster], list(io_graph.clusters))
+        del io_graph[3]
+        events = list(queue.drain())
+        split = [event for event in events if isinstance(event, dengraph.events.ClusterSplit)]
+        self.assertEqual(1, len(split))
+        self.assertIs(merged[0].cluster, split[0].cluster)
+        self.assertIn(dengraph.events.NodeChanged(3, dengraph.events.CORE_NODE, None), events)
+        del io_graph[8]
+        events = list(queue.drain())
+        self.assertEqual(
+            1, len([event for event in events if isinstance(event, dengraph.events.ClusterRemoved)])
+        )
+        self.assertIn(dengraph.events.NodeChanged(1, dengraph.events.BORDER_NODE, dengraph.events.NOISE_NODE), events)
+        io_graph.event_listeners.remove(queue)
+        io_graph[10] = {6: 1, 7: 1}
+        self.assertEqual(0, len(queue))
+
+    def test_cluster_ids(self):
+        io_graph = DenGraphIO(base_graph=two_cluster_graph(), cluster_distance=1, core_neighbours=2)
+        small, large = io_graph.clusters
+        self.assertEqual(2, len({small.cluster_id, large.cluster_id}))
+        small_id, large_id = small.cluster_id, large.cluster_id
+        # the larger cluster keeps its id when merging
+        io_graph[4] = {3: 1, 5: 1}
+        self.assertEqual([large_id], [cluster.cluster_id for cluster in io_graph.clusters])
+        self.assertEqual(
+            dengraph.dengraph.ClusterLineage(dengraph.dengraph.MERGED_INTO, large_id),
+            io_graph.cluster_lineage[small_id]
+        )
+        self.assertEqual(large_id, io_graph.current_cluster_id(small_id))
+        # the larger part keeps its id when splitting
+        del io_graph[4]
+        parts = {len(cluster.core_nodes): cluster.cluster_id for cluster in io_graph.clusters}
+        self.assertEqual(large_id, parts[4])
+        self.assertNotIn(parts[3], (small_id, large_id))
+        self.assertEqual(
+            dengraph.dengraph.ClusterLineage(dengraph.dengraph.SPLIT_FROM, large_id),
+            io_graph.cluster_lineage[parts[3]]
+        )
+        self.assertEqual(parts[3], io_graph.current_cluster_id(parts[3]))
+
+    def test_bulk_remove(self):
+        for base_nodes, remove_nodes in (
+                ([1, 2, 3, 4, 5, 6, 7, 8], [30, 31]),
+                ([1, 2, 3, 4, 5, 6, 14, 15, 16, 17, 18, 19], [9, 10]),
+                ([1, 3, 4, 5, 6, 7, 13, 14, 15, 16, 17, 18], [2, 8, 9, 10, 11, 12]),
+                ([1, 2, 3, 4, 5, 6, 8], [7, 9, 10, 11, 12, 13, 14, 15, 16, 17]),
+                (list(range(10, 20)), list(range(20, 40))),
+                (random_nodes(50, 10), list(set(random_nodes(50, 10) + random_nodes(50, 40)))),
+        ):
+            with self.subTest(base_nodes=base_nodes, remove_nodes=remove_nodes):
+                graph = QueryCountingGraph(
+                    nodes=base_nodes + remove_nodes, distance=self.distance_cls(), symmetric=True
+                )
+                io_graph = DenGraphIO(base_graph=graph, cluster_distance=5, core_neighbours=5)
+                graph.queries.clear()
+                io_graph.remove_many(node for node in remove_nodes if node not in base_nodes)
+                self.assertEqual(self._validation_graph_for_nodes(
+                    nodes=base_nodes, distance=self.distance_cls, cluster_distance=5, core_neighbours=5
+                ), io_graph)
+                self.assertLessEqual(max(graph.queries.values() or [0]), 1)
+                self.assertClusterIndex(io_graph)
+
+    def test_bulk_remove_edges(self):
+        literal = textwrap.dedent("""
+        1,2,3,4,5,6,7,8,9
+        0,1,0,0,0,0,1,0,0
+        1,0,1,1,1,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,1,1,0,0
+        0,0,0,0,1,0,0,0,0
+        1,0,0,0,1,0,0,1,1
+        0,0,0,0,0,0,1,0,0
+        0,0,0,0,0,0,1,0,0
+        """.strip())
+        validation_literal = textwrap.dedent("""
+        1,2,3,4,5,6,7,8,9
+        0,1,0,0,0,0,1,0,0
+        1,0,1,1,0,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,0,0,0,0,1,0,0,0
+        0,0,0,0,1,0,0,0,0
+        1,0,0,0,0,0,0,1,0
+        0,0,0,0,0,0,1,0,0
+        0,0,0,0,0,0,0,0,0
+        """.strip())
+        io_graph = DenGraphIO(
+            base_graph=dengraph.graphs.graph_io.csv_graph_reader(literal.splitlines(), symmetric=True),
+            cluster_distance=1,
+            core_neighbours=2
+        )
+        io_graph.remove_many([slice("2", "5"), slice("5", "7"), slice("9", "7")])
+        validation_io_graph = DenGraphIO(
+            base_graph=dengraph.graphs.graph_io.csv_graph_reader(validation_literal.splitlines(), symmetric=True),
+            cluster_distance=1,
+            core_neighbours=2
+        )
+        self.assertEqual(validation_io_graph, io_graph)
+        self.assertClusterIndex(io_graph)
+
+    def test_local_split_check(self):
+        graph = QueryCountingGraph(nodes=range(1000), distance=self.distance_cls(), symmetric=True)
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=5, core_neighbours=5)
+        self.assertEqual(1, len(io_graph.clusters))
+        graph.queries.clear()
+        io_graph.remove_many([500, 502])
+        self.assertEqual(1, len(io_graph.clusters))
+        self.assertLess(len(graph.queries), 50)
+        graph.queries.clear()
+        io_graph.remove_many(range(100, 105))
+        self.assertEqual(2, len(io_graph.clusters))
+        self.assertEqual(100, len(io_graph.clusters[0]))
+        self.assertLess(len(graph.queries), 300)
+        self.assertClusterIndex(io_graph)
+
+    def test_random_updates(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            nodes = list(range(40))
+            adjacency = {node: {} for node in nodes}
+            for _ in range(80):
+                node_a, node_b = rng.sample(nodes, 2)
+                adjacency[node_a][node_b] = adjacency[node_b][node_a] = rng.choice((1, 2))
+            io_graph = DenGraphIO(
+                base_graph=dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True),
+                cluster_distance=1,
+                core_neighbours=3
+            )
+            for _ in range(30):
+                graph = io_graph.graph
+                # removals must leave enough nodes to sample from
+                action = rng.choice(
+                    ('add_node', 'del_node', 'add_edge', 'del_edge', 'bulk') if len(graph) > 10 else ('add_node',)
+                )
+                if action == 'add_node':
+                    node = max(graph) + 1
+                    io_graph[node] = {neighbour: 1 for neighbour in rng.sample(list(graph), 4)}
+                elif action == 'del_node':
+                    del io_graph[rng.choice(list(graph))]
+                elif action == 'add_edge':
+                    node_a, node_b = rng.sample(list(graph), 2)
+                    io_graph[node_a:node_b] = 1
+                elif action == 'del_edge':
+                    node_a = rng.choice(list(graph))
+                    if graph[node_a]:
+                        del io_graph[node_a:rng.choice(list(graph[node_a]))]
+                else:
+                    io_graph.remove_many(rng.sample(list(graph), 3))
+                with self.subTest(action=action):
+                    self.assertEqual(DenGraphIO(
+                        base_graph=dengraph.graphs.adjacency_graph.AdjacencyGraph(graph, symmetric=True),
+                        cluster_distance=1,
+                        core_neighbours=3
+                    ), io_graph)
+                    self.assertClusterIndex(io_graph)
+
     def test_simple_noise(self):
         io_graph = DenGraphIO(
             base_graph=CachedDistanceGraph(
@@ -249,10 +645,55 @@ class TestDenGraphIO(unittest.TestCase):
         self.assertEqual(1, len(io_graph.clusters))
         self.assertEqual(set(), io_graph.noise)
 
-        io_graph._recluster(io_graph.clusters[0])
-        self.assertEqual(1, len(io_graph.clusters))
+        cluster = io_graph.clusters[0]
+        # a search from every core node finds a single connected part
+        self.assertEqual(set(), io_graph._split_cluster(cluster, set(cluster.core_nodes), {}))
+        self.assertEqual([cluster], list(io_graph.clusters))
         self.assertEqual(set(), io_graph.noise)
 
+    def test_split(self):
+        literal = textwrap.dedent("""
+        1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17
+        0,1,0,0,0,1,0,0,0, 1, 1, 0, 0, 0, 0, 0, 0
+        1,0,1,1,1,0,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        0,1,0,0,0,0,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        0,1,0,0,0,0,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        0,1,0,0,0,0,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        1,0,0,0,0,0,1,1,1, 0, 0, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,1,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,1,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,1,0,0,0, 0, 0, 0, 0, 0, 0, 0, 0
+        1,0,0,0,0,0,0,0,0, 0, 0, 1, 1, 1, 0, 0, 1
+        1,0,0,0,0,0,0,0,0, 0, 0, 1, 0, 0, 1, 1, 1
+        0,0,0,0,0,0,0,0,0, 1, 1, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,0,0,0,0, 1, 0, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,0,0,0,0, 1, 0, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,0,0,0,0, 0, 1, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,0,0,0,0, 0, 1, 0, 0, 0, 0, 0, 0
+        0,0,0,0,0,0,0,0,0, 1, 1, 0, 0, 0, 0, 0, 0
+        """.strip())
+        io_graph = DenGraphIO(
+            base_graph=dengraph.graphs.graph_io.csv_graph_reader(literal.splitlines(), symmetric=True),
+            cluster_distance=1,
+            core_neighbours=3
+        )
+        self.assertEqual(1, len(io_graph.clusters))
+        cluster = io_graph.clusters[0]
+        # removing the edges of the central node splits the cluster
+        io_graph.remove_many([slice("1", node) for node in ("2", "6", "10", "11")])
+        self.assertIn(cluster, io_graph.clusters)
+        self.assertEqual(4, len(io_graph.clusters))
+        self.assertEqual({"1"}, io_graph.noise)
+        self.assertEqual(
+            DenGraphIO(
+                base_graph=dengraph.graphs.adjacency_graph.AdjacencyGraph(io_graph.graph, symmetric=True),
+                cluster_distance=1,
+                core_neighbours=3
+            ),
+            io_graph
+        )
+        self.assertClusterIndex(io_graph)
+
     def test_noise_removal(self):
         base_nodes = [1, 2, 3, 4, 5, 6, 7, 8]
         remove_nodes = [30, 31]
@@ -626,6 +1067,40 @@ class TestDenGraphIO(unittest.TestCase):
         del io_graph["1"]
         self.assertEqual(validation_io_graph, io_graph)
 
+    def test_cluster_index(self):
+        nodes = [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 30]
+        io_graph = DenGraphIO(
+            base_graph=CachedDistanceGraph(
+                nodes=nodes[:8],
+                distance=self.distance_cls(),
+                symmetric=True
+            ),
+            cluster_distance=5,
+            core_neighbours=5
+        )
+        for node in nodes[8:]:
+            io_graph[node] = {}
+            self.assertClusterIndex(io_graph)
+        for node in (9, 2, 30, 16):
+            del io_graph[node]
+            self.assertClusterIndex(io_graph)
+
+    def assertClusterIndex(self, io_graph):
+        for node in io_graph.graph:
+            with self.subTest(node=node):
+                clusters = [cluster for cluster in io_graph.clusters if node in cluster]
+                self.assertEqual(
+                    sorted(map(id, clusters)),
+                    sorted(map(id, io_graph.clusters_for_node(node)))
+                )
+                self.assertEqual(bool(clusters), node in io_graph)
+                core_clusters = [cluster for cluster in io_graph.clusters if node in cluster.core_nodes]
+                if core_clusters:
+                    self.assertIs(core_clusters[0], io_graph.core_cluster_for_node(node))
+                else:
+                    with self.assertRaises(dengraph.dengraph.NoSuchCluster):
+                        io_graph.core_cluster_for_node(node)
+
     def _validation_graph_for_nodes(self, distance, nodes, cluster_distance, core_neighbours, graph_type=CachedDistanceGraph):
         graph = graph_type(
             nodes=nodes,
@@ -637,3 +1112,170 @@ class TestDenGraphIO(unittest.TestCase):
             cluster_distance=cluster_distance,
             core_neighbours=core_neighbours
         )
+
+
+class TestStaticDenGraph(ClusteringTestCase):
+    def assertSameAsIO(self, base_graph, cluster_distance, core_neighbours):
+        self.assertSameClustering(
+            DenGraphIO(base_graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours),
+            StaticDenGraph(base_graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours),
+        )
+
+    def test_distance_graph(self):
+        for nodes in (
+                [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20],
+                [1, 2, 3, 4, 5, 6, 20, 30, 31],
+                [],
+                random_nodes(100, 10) + random_nodes(100, 40),
+                random_nodes(200, 10),
+        ):
+            for core_neighbours in (1, 3, 5):
+                with self.subTest(nodes=nodes, core_neighbours=core_neighbours):
+                    self.assertSameAsIO(
+                        CachedDistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True),
+                        cluster_distance=5, core_neighbours=core_neighbours
+                    )
+
+    def test_border_overlap(self):
+        literal = textwrap.dedent("""
+        1,2,3,4,5,6,7,8,9
+        0,1,0,0,0,0,1,0,0
+        1,0,1,1,1,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,1,1,0,0
+        0,0,0,0,1,0,0,0,0
+        1,0,0,0,1,0,0,1,1
+        0,0,0,0,0,0,1,0,0
+        0,0,0,0,0,0,1,0,0
+        """.strip())
+        graph = dengraph.graphs.graph_io.csv_graph_reader(literal.splitlines(), symmetric=True)
+        for core_neighbours in range(1, 5):
+            with self.subTest(core_neighbours=core_neighbours):
+                self.assertSameAsIO(graph, cluster_distance=1, core_neighbours=core_neighbours)
+
+    def test_static(self):
+        static_graph = StaticDenGraph(
+            CachedDistanceGraph(nodes=[1, 2, 3, 4, 5, 6], distance=DeltaDistance(), symmetric=True),
+            cluster_distance=5,
+            core_neighbours=5
+        )
+        with self.assertRaises(TypeError):
+            static_graph[7] = {}
+        with self.assertRaises(TypeError):
+            del static_graph[6]
+        self.assertEqual(1, len(static_graph.clusters))
+
+
+class TestNonOverlappingDenGraph(unittest.TestCase):
+    def assertNoOverlap(self, base_graph, cluster_distance, core_neighbours):
+        static_graph = StaticDenGraph(base_graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours)
+        o_graph = NonOverlappingDenGraph(base_graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in static_graph.clusters),
+            sorted(sorted(cluster.core_nodes) for cluster in o_graph.clusters),
+        )
+        self.assertEqual(static_graph.noise, o_graph.noise)
+        for node in base_graph:
+            clusters = list(o_graph.clusters_for_node(node))
+            self.assertEqual(node in static_graph, node in o_graph)
+            self.assertEqual(len(clusters), 1 if node in static_graph else 0)
+            self.assertEqual(clusters, [cluster for cluster in o_graph.clusters if node in cluster])
+            if node not in o_graph or node in clusters[0].core_nodes:
+                continue
+            nearest = min(
+                base_graph[node:neighbour] for neighbour in base_graph.get_neighbours(node, cluster_distance)
+                if neighbour in clusters[0].core_nodes
+            )
+            for neighbour in base_graph.get_neighbours(node, cluster_distance):
+                if neighbour not in clusters[0] and neighbour in o_graph:
+                    self.assertLessEqual(nearest, base_graph[node:neighbour])
+
+    def test_distance_graph(self):
+        for nodes in (
+                [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20],
+                [1, 2, 3, 4, 5, 6, 20, 30, 31],
+                [],
+                random_nodes(100, 10) + random_nodes(100, 40),
+        ):
+            for core_neighbours in (1, 3, 5):
+                with self.subTest(nodes=nodes, core_neighbours=core_neighbours):
+                    self.assertNoOverlap(
+                        CachedDistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True),
+                        cluster_distance=5, core_neighbours=core_neighbours
+                    )
+
+    def test_nearest_core(self):
+        o_graph = NonOverlappingDenGraph(
+            CachedDistanceGraph(
+                nodes=[1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20], distance=DeltaDistance(), symmetric=True
+            ),
+            cluster_distance=5,
+            core_neighbours=5
+        )
+        self.assertEqual(2, len(o_graph.clusters))
+        cluster = o_graph.core_cluster_for_node(6)
+        self.assertIn(9, cluster.border_nodes)
+        self.assertEqual([cluster], list(o_graph.clusters_for_node(9)))
+        with self.assertRaises(dengraph.dengraph.NoSuchCluster):
+            o_graph.core_cluster_for_node(9)
+        with self.assertRaises(TypeError):
+            o_graph[7] = {}
+        with self.assertRaises(TypeError):
+            del o_graph[9]
+
+    def test_node_state(self):
+        o_graph = NonOverlappingDenGraph(
+            CachedDistanceGraph(nodes=[1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 40], distance=DeltaDistance()),
+            cluster_distance=5,
+            core_neighbours=5
+        )
+        self.assertEqual(dengraph.events.CORE_NODE, o_graph._node_state(6))
+        self.assertEqual(dengraph.events.BORDER_NODE, o_graph._node_state(9))
+        self.assertEqual(dengraph.events.NOISE_NODE, o_graph._node_state(40))
+        self.assertEqual({9: o_graph.core_cluster_for_node(6)}, o_graph._border_cluster)
+        self.assertFalse(hasattr(o_graph, '_border_clusters'))
+
+    def test_tie_break(self):
+        """Of equally near core neighbours, the one reported first by the graph wins"""
+        for first, second in ((3, 5), (5, 3)):
+            with self.subTest(first=first, second=second):
+                adjacency = {1: {2: 1, 3: 1}, 2: {1: 1, 3: 1}, 3: {1: 1, 2: 1}}
+                adjacency.update({5: {6: 1, 7: 1}, 6: {5: 1, 7: 1}, 7: {5: 1, 6: 1}})
+                adjacency[4] = collections.OrderedDict(((first, 1), (second, 1)))
+                adjacency[3][4] = adjacency[5][4] = 1
+                graph = dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True)
+                self.assertEqual([first, second], list(graph.get_neighbours(4, 1)))
+                o_graph = NonOverlappingDenGraph(graph, cluster_distance=1, core_neighbours=2)
+                self.assertEqual(list(o_graph.clusters_for_node(4)), [o_graph.core_cluster_for_node(first)])
+                # a nearer core neighbour wins regardless of order
+                graph[4:first] = 0.5
+                o_graph = NonOverlappingDenGraph(graph, cluster_distance=1, core_neighbours=2)
+                self.assertEqual(list(o_graph.clusters_for_node(4)), [o_graph.core_cluster_for_node(first)])
+                graph[4:first] = 1
+                graph[4:second] = 0.5
+                o_graph = NonOverlappingDenGraph(graph, cluster_distance=1, core_neighbours=2)
+                self.assertEqual(list(o_graph.clusters_for_node(4)), [o_graph.core_cluster_for_node(second)])
+
+    def test_memory(self):
+        """A single cluster per border node is cheaper to index than a set of clusters"""
+        # clusters of core nodes 1, 2, 3 and border nodes 0, 5, every 10 nodes
+        nodes = [base + offset for base in range(0, 200, 10) for offset in (0, 1, 2, 3, 5)]
+        graph = CachedDistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True)
+        o_graph = NonOverlappingDenGraph(graph, cluster_distance=2, core_neighbours=3)
+        self.assertEqual(40, len(o_graph._border_cluster))
+        o_usage = o_graph.memory_usage()
+        io_usage = StaticDenGraph(graph, cluster_distance=2, core_neighbours=3).memory_usage()
+        self.assertLess(o_usage['border_index'], io_usage['border_index'])
+
+
+class TestDenGraphO(unittest.TestCase):
+    def test_alias(self):
+        """DenGraphO remains the incremental clustering it always was"""
+        self.assertIs(DenGraphIO, DenGraphO)
+        o_graph = DenGraphO(
+            CachedDistanceGraph(nodes=[1, 2, 3, 4], distance=DeltaDistance(), symmetric=True),
+            cluster_distance=1, core_neighbours=2
+        )
+        o_graph[5] = None
+        self.assertEqual({2, 3, 4}, o_graph.clusters[0].core_nodes)
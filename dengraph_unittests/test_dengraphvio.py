@@ -96,3 +96,27 @@ class TestDenGraphVIO(unittest.TestCase):
             _, new_distance = next(io_graph.update_probe(base_object, [1]))
             base_object[0] += 1
             self.assertEqual(current_distance, new_distance)
+
+    def test_mean_after_merge_and_split(self):
+        distance = DeltaDistance()
+        io_graph = DenGraphVIO(
+            base_graph=DistanceGraph(nodes=[1, 2, 3, 10, 11, 12], distance=distance, symmetric=True),
+            cluster_distance=3,
+            core_neighbours=2
+        )
+        self.assertEqual(2, len(io_graph.clusters))
+        virtual_node = 0
+        list(io_graph.probe(virtual_node))
+        means = io_graph.virtual_nodes[id(virtual_node)]["clusters"]
+        # nodes between both clusters merge them
+        io_graph.update_many([5, 7])
+        self.assertEqual(1, len(io_graph.clusters))
+        list(io_graph.probe(virtual_node))
+        for cluster in io_graph.clusters:
+            self.assertEqual(distance.mean(cluster), means[cluster.cluster_id])
+        # removing the nodes between them splits the cluster again
+        io_graph.remove_many([5, 7])
+        self.assertEqual(2, len(io_graph.clusters))
+        list(io_graph.probe(virtual_node))
+        for cluster in io_graph.clusters:
+            self.assertEqual(distance.mean(cluster), means[cluster.cluster_id])
@@ -0,0 +1,104 @@
+from dengraph_unittests.utility import unittest, two_cluster_graph
+
+from dengraph.dengraph import DenGraphIO, StaticDenGraph
+from dengraph.dengraphvio import DenGraphVIO
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.graphs.distance_graph import CachedDistanceGraph, DistanceGraph
+from dengraph.graphs.kdtree_graph import KDTreeGraph
+from dengraph.instrumentation import ClusteringStats, instrumented, instrument_graph, uninstrument_graph
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_same_clustering(self):
+        for clustering_class in (DenGraphIO, StaticDenGraph):
+            with self.subTest(clustering_class=clustering_class):
+                clustering = instrumented(clustering_class, two_cluster_graph(), 1, 2)
+                self.assertEqual(clustering_class(two_cluster_graph(), 1, 2), clustering)
+                self.assertEqual(8, clustering.stats.counters['neighbour_queries'])
+                self.assertEqual(1, clustering.stats.phase_calls['init'])
+                self.assertEqual(0, clustering.stats.phase_calls['split_search'])
+
+    def test_init_expansion(self):
+        clustering = instrumented(DenGraphIO, two_cluster_graph(), 1, 2)
+        stats = clustering.stats
+        # each cluster is expanded once, reaching all its nodes but the first
+        self.assertEqual(2, stats.phase_calls['expansion'])
+        self.assertEqual(2 + 3, stats.counters['node_visits'])
+        self.assertLessEqual(stats.phase_times['expansion'], stats.phase_times['init'])
+        # clusters created initially are not split off from others
+        self.assertEqual(0, stats.counters['cluster_splits'])
+        self.assertEqual(0, instrumented(StaticDenGraph, two_cluster_graph(), 1, 2).stats.phase_calls['expansion'])
+
+    def test_updates(self):
+        stats = ClusteringStats()
+        clustering = instrumented(DenGraphIO, two_cluster_graph(), 1, 2, stats=stats)
+        self.assertIs(stats, clustering.stats)
+        stats.reset()
+        clustering[9] = {3: 1, 5: 1}
+        self.assertEqual(1, stats.counters['cluster_merges'])
+        self.assertEqual(0, stats.counters['cluster_splits'])
+        self.assertEqual(1, stats.phase_calls['incremental_add'])
+        self.assertEqual(0, stats.phase_calls['incremental_remove'])
+        del clustering[9]
+        self.assertEqual(1, stats.counters['cluster_splits'])
+        self.assertEqual(1, stats.phase_calls['incremental_remove'])
+        self.assertEqual(1, stats.phase_calls['split_search'])
+        self.assertEqual(0, stats.phase_calls['expansion'])
+        # the search from 3 exhausts the small part, while the search from 5 must not exhaust the large part
+        self.assertGreaterEqual(stats.counters['node_visits'], 3)
+        self.assertLess(stats.counters['node_visits'], 8)
+        # new clusters are not split off from others
+        clustering[10] = {}
+        clustering[11] = {10: 1}
+        clustering[12] = {10: 1, 11: 1}
+        self.assertEqual(3, len(clustering.clusters))
+        self.assertEqual(1, stats.counters['cluster_splits'])
+        self.assertLessEqual(stats.phase_times['split_search'], stats.phase_times['incremental_remove'])
+        self.assertEqual(stats.counters['cluster_merges'], stats.as_dict()['cluster_merges'])
+        # regular clusterings are not affected
+        self.assertNotIn('_merge_clusters', vars(DenGraphIO(two_cluster_graph(), 1, 2)))
+
+    def test_distance_calls(self):
+        nodes = [1, 2, 3, 4, 5, 10, 11, 12, 13]
+        distance_calls = {}
+        for graph_class in (DistanceGraph, CachedDistanceGraph):
+            with self.subTest(graph_class=graph_class):
+                clustering = instrumented(
+                    DenGraphVIO, graph_class(nodes=nodes, distance=DeltaDistance(), symmetric=True), 2, 2
+                )
+                self.assertEqual(DenGraphVIO(graph_class(nodes, DeltaDistance(), True), 2, 2), clustering)
+                distance_calls[graph_class] = clustering.stats.counters['distance_calls']
+                self.assertGreater(distance_calls[graph_class], 0)
+        # a cached graph evaluates each distance only once
+        self.assertLess(distance_calls[CachedDistanceGraph], distance_calls[DistanceGraph])
+
+    def test_instrument_graph(self):
+        graph = DistanceGraph(nodes=[1, 2, 3], distance=DeltaDistance(), symmetric=True)
+        distance = graph.distance
+        first, second = ClusteringStats(), ClusteringStats()
+        self.assertIs(graph, instrument_graph(graph, first))
+        list(graph.get_neighbours(1, 1))
+        self.assertEqual(1, first.counters['neighbour_queries'])
+        distance_calls = first.counters['distance_calls']
+        self.assertGreater(distance_calls, 0)
+        # instrumenting again replaces the stats instead of counting twice
+        instrument_graph(graph, second)
+        list(graph.get_neighbours(1, 1))
+        self.assertEqual(1, first.counters['neighbour_queries'])
+        self.assertEqual(1, second.counters['neighbour_queries'])
+        self.assertEqual(distance_calls, first.counters['distance_calls'])
+        self.assertEqual(distance_calls, second.counters['distance_calls'])
+        self.assertIs(graph, uninstrument_graph(graph))
+        list(graph.get_neighbours(1, 1))
+        self.assertEqual(1, second.counters['neighbour_queries'])
+        self.assertIs(distance, graph.distance)
+        self.assertNotIn('get_neighbours', vars(graph))
+        self.assertIs(graph, uninstrument_graph(graph))
+
+    def test_neighbours_many(self):
+        stats = ClusteringStats()
+        graph = instrument_graph(KDTreeGraph([(0, 0), (0, 1), (5, 5)]), stats)
+        self.assertEqual({(0, 0): [(0, 1)], (5, 5): []}, graph.get_neighbours_many([(0, 0), (5, 5)], 1))
+        self.assertEqual(2, stats.counters['neighbour_queries'])
+        list(graph.get_neighbours((0, 0), 1))
+        self.assertEqual(3, stats.counters['neighbour_queries'])
@@ -0,0 +1,110 @@
+import textwrap
+
+import dengraph.graphs.graph_io
+import dengraph.dengraph
+
+from dengraph_unittests.utility import random_nodes, ClusteringTestCase
+
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.graphs.distance_graph import CachedDistanceGraph
+from dengraph.dengraph import StaticDenGraph
+from dengraph.interned import StaticInternedDenGraph, NOISE_NODE, CORE_NODE, BORDER_NODE
+
+
+class TestStaticInternedDenGraph(ClusteringTestCase):
+    def assertSameAsStatic(self, base_graph, cluster_distance, core_neighbours):
+        static_graph = StaticDenGraph(base_graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours)
+        interned_graph = StaticInternedDenGraph(
+            base_graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours
+        )
+        self.assertSameClustering(static_graph, interned_graph)
+        self.assertEqual(static_graph.cluster_labels(), interned_graph.cluster_labels())
+        self.assertSameLabels(interned_graph)
+
+    def assertSameLabels(self, interned_graph):
+        """Assert that the labels of nodes and clusters match `cluster_labels`"""
+        node_table = interned_graph.node_table
+        cluster_labels = interned_graph.cluster_labels(node_table)
+        self.assertEqual(list(cluster_labels.labels), list(interned_graph.node_labels))
+        self.assertEqual(cluster_labels.overlaps, interned_graph.overlap_labels)
+        for label, cluster in enumerate(interned_graph.clusters):
+            self.assertEqual(label, cluster.label)
+            for node in cluster:
+                self.assertIn(label, interned_graph.labels_of(node_table.node_id(node)))
+
+    def test_distance_graph(self):
+        for nodes in (
+                [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20],
+                [1, 2, 3, 4, 5, 6, 20, 30, 31],
+                [],
+                random_nodes(100, 10) + random_nodes(100, 40),
+        ):
+            for core_neighbours in (1, 3, 5):
+                with self.subTest(nodes=nodes, core_neighbours=core_neighbours):
+                    self.assertSameAsStatic(
+                        CachedDistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True),
+                        cluster_distance=5, core_neighbours=core_neighbours
+                    )
+
+    def test_border_overlap(self):
+        literal = textwrap.dedent("""
+        1,2,3,4,5,6,7,8,9
+        0,1,0,0,0,0,1,0,0
+        1,0,1,1,1,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,0,0,0,0
+        0,1,0,0,0,1,1,0,0
+        0,0,0,0,1,0,0,0,0
+        1,0,0,0,1,0,0,1,1
+        0,0,0,0,0,0,1,0,0
+        0,0,0,0,0,0,1,0,0
+        """.strip())
+        graph = dengraph.graphs.graph_io.csv_graph_reader(literal.splitlines(), symmetric=True)
+        for core_neighbours in range(1, 5):
+            with self.subTest(core_neighbours=core_neighbours):
+                self.assertSameAsStatic(graph, cluster_distance=1, core_neighbours=core_neighbours)
+
+    def test_state(self):
+        interned_graph = StaticInternedDenGraph(
+            CachedDistanceGraph(
+                nodes=[1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 40], distance=DeltaDistance(), symmetric=True
+            ),
+            cluster_distance=5,
+            core_neighbours=5
+        )
+        node_ids = {node: interned_graph.node_table.node_id(node) for node in interned_graph.node_table}
+        self.assertEqual(NOISE_NODE, interned_graph.node_states[node_ids[40]])
+        self.assertEqual(CORE_NODE, interned_graph.node_states[node_ids[1]])
+        self.assertEqual(BORDER_NODE, interned_graph.node_states[node_ids[9]])
+        self.assertEqual((), interned_graph.labels_of(node_ids[40]))
+        self.assertEqual({0, 1}, set(interned_graph.labels_of(node_ids[9])))
+        self.assertEqual({40}, interned_graph.noise)
+        cluster = interned_graph.core_cluster_for_node(1)
+        self.assertIn(1, cluster)
+        self.assertIn(9, cluster)
+        self.assertNotIn(14, cluster)
+        with self.assertRaises(dengraph.dengraph.NoSuchCluster):
+            interned_graph.core_cluster_for_node(9)
+        with self.assertRaises(TypeError):
+            cluster.categorize_node(40, cluster.CORE_NODE)
+        with self.assertRaises(TypeError):
+            interned_graph[41] = {}
+
+    def test_static(self):
+        interned_graph = StaticInternedDenGraph(
+            CachedDistanceGraph(nodes=[1, 2, 3, 4, 5, 40], distance=DeltaDistance(), symmetric=True),
+            cluster_distance=5,
+            core_neighbours=3
+        )
+        clusters = list(interned_graph.clusters)
+        for name, modify in (
+                ('setitem', lambda: interned_graph.__setitem__(41, {})),
+                ('delitem', lambda: interned_graph.__delitem__(1)),
+                ('update_many', lambda: interned_graph.update_many([41])),
+                ('remove_many', lambda: interned_graph.remove_many([1])),
+        ):
+            with self.subTest(modify=name):
+                with self.assertRaises(TypeError):
+                    modify()
+                self.assertEqual(clusters, list(interned_graph.clusters))
+                self.assertEqual({40}, interned_graph.noise)
@@ -0,0 +1,128 @@
+import collections
+import io
+import random
+
+import dengraph.graphs.adjacency_graph
+
+from dengraph_unittests.utility import unittest
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.checkpoint import write_checkpoint, read_checkpoint
+from dengraph.update_log import UpdateLog, LoggedUpdates, read_log, replay_log, NODE_SET, EDGE_DELETE
+
+
+class TestUpdateLog(unittest.TestCase):
+    @staticmethod
+    def make_adjacency(rng, node_count, edge_count):
+        adjacency = {node: {} for node in range(node_count)}
+        for _ in range(edge_count):
+            node_a, node_b = rng.sample(range(node_count), 2)
+            adjacency[node_a][node_b] = adjacency[node_b][node_a] = rng.choice((1, 2))
+        return adjacency
+
+    @staticmethod
+    def random_update(rng, updates):
+        graph = updates.clustering.graph
+        nodes = list(graph)
+        action = rng.choice(('node', 'replace', 'edge', 'delete node', 'delete edge', 'many', 'remove many'))
+        if action == 'node':
+            updates[max(nodes) + 1] = {node: rng.choice((1, 2)) for node in rng.sample(nodes, 4)}
+        elif action == 'replace':
+            # a new node refers to a node which is replaced right after
+            replaced = rng.choice(nodes)
+            updates[max(nodes) + 1] = {replaced: 1}
+            updates[replaced] = {node: rng.choice((1, 2)) for node in rng.sample(nodes, 3) if node != replaced}
+        elif action == 'edge':
+            node_a, node_b = rng.sample(nodes, 2)
+            updates[node_a:node_b] = rng.choice((1, 2))
+        elif action == 'delete node':
+            del updates[rng.choice(nodes)]
+        elif action == 'delete edge':
+            node_a = rng.choice(nodes)
+            if graph[node_a]:
+                del updates[node_a:rng.choice(list(graph[node_a]))]
+        elif action == 'many':
+            replaced = rng.choice(nodes)
+            updates.update_many(collections.OrderedDict((
+                (max(nodes) + 1, {node: 1 for node in rng.sample(nodes, 3)}),
+                (rng.choice(nodes), None),
+                (replaced, {node: 1 for node in rng.sample(nodes, 2) if node != replaced}),
+            )))
+        else:
+            updates.remove_many(rng.sample(nodes, 2))
+
+    def test_recovery(self):
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                adjacency = self.make_adjacency(rng, 30, 60)
+                clustering = DenGraphIO(
+                    dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True),
+                    cluster_distance=1, core_neighbours=3
+                )
+                checkpoint, log_stream = io.BytesIO(), io.BytesIO()
+                write_checkpoint(clustering, checkpoint)
+                updates = LoggedUpdates(clustering, UpdateLog(log_stream, batch_size=4))
+                with updates.log:
+                    for _ in range(15):
+                        if len(clustering.graph) > 10:
+                            self.random_update(rng, updates)
+                checkpoint.seek(0)
+                log_stream.seek(0)
+                recovered = read_checkpoint(
+                    checkpoint, dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True)
+                )
+                replay_log(log_stream, recovered)
+                self.assertEqual(
+                    {node: dict(clustering.graph[node]) for node in clustering.graph},
+                    {node: dict(recovered.graph[node]) for node in recovered.graph}
+                )
+                self.assertEqual(clustering, recovered)
+                self.assertEqual(clustering._neighbour_counts, recovered._neighbour_counts)
+
+    def test_replay_replaced(self):
+        """Nodes replacing nodes they were referred to by are replayed in order"""
+        adjacency = {1: {2: 1}, 2: {1: 1}, 3: {}, 4: {}}
+        clustering = DenGraphIO(
+            dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True),
+            cluster_distance=1, core_neighbours=1
+        )
+        log_stream = io.BytesIO()
+        updates = LoggedUpdates(clustering, UpdateLog(log_stream))
+        with updates.log:
+            updates[5] = {2: 1}
+            updates[2] = {4: 1, 3: 1}
+        log_stream.seek(0)
+        recovered = DenGraphIO(
+            dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=True),
+            cluster_distance=1, core_neighbours=1
+        )
+        self.assertEqual(2, replay_log(log_stream, recovered))
+        self.assertEqual({4: 1, 3: 1}, recovered.graph[2])
+        self.assertEqual({}, recovered.graph[5])
+        self.assertEqual(clustering, recovered)
+        self.assertEqual(clustering._neighbour_counts, recovered._neighbour_counts)
+
+    def test_batches(self):
+        graph = dengraph.graphs.adjacency_graph.AdjacencyGraph({1: {}, 2: {}, 3: {}}, symmetric=True)
+        stream = io.BytesIO()
+        log = UpdateLog(stream, batch_size=2)
+        adjacency = {1: 1}
+        log.log_set(4, adjacency)
+        # values are stored as they were when logged
+        adjacency[2] = 1
+        self.assertEqual(0, len(stream.getvalue()))
+        log.log_delete(slice(1, 2))
+        self.assertEqual(0, len(log))
+        complete = stream.getvalue()
+        log.log_set(5, None)
+        log.flush()
+        self.assertEqual(
+            [(NODE_SET, 4, {1: 1}), (EDGE_DELETE, (1, 2), None), (NODE_SET, 5, None)],
+            list(read_log(io.BytesIO(stream.getvalue())))
+        )
+        # partially written batches are ignored
+        for size in range(len(complete), len(stream.getvalue())):
+            self.assertEqual(2, len(list(read_log(io.BytesIO(stream.getvalue()[:size])))))
+        log.truncate()
+        self.assertEqual(0, replay_log(io.BytesIO(stream.getvalue()), DenGraphIO(graph, 1, 2)))
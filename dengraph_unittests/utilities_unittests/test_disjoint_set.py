@@ -0,0 +1,53 @@
+import random
+
+from dengraph_unittests.utility import unittest
+
+from dengraph.utilities.disjoint_set import DisjointSet
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_add(self):
+        forest = DisjointSet([1, 2, 3])
+        self.assertEqual(3, len(forest))
+        forest.add(3)
+        forest.add('a')
+        self.assertEqual(4, len(forest))
+        self.assertIn('a', forest)
+        self.assertNotIn(4, forest)
+        for element in forest:
+            self.assertEqual(element, forest.find(element))
+        with self.assertRaises(KeyError):
+            forest.find(4)
+
+    def test_union(self):
+        forest = DisjointSet(range(6))
+        forest.union(0, 1)
+        forest.union(2, 3)
+        forest.union(1, 3)
+        forest.union(3, 0)
+        self.assertEqual(forest.find(0), forest.find(2))
+        self.assertNotEqual(forest.find(0), forest.find(4))
+        self.assertEqual(
+            sorted([[0, 1, 2, 3], [4], [5]]),
+            sorted(sorted(group) for group in forest.groups().values())
+        )
+
+    def test_random_groups(self):
+        for _ in range(5):
+            elements = list(range(200))
+            forest = DisjointSet(elements)
+            labels = {element: element for element in elements}
+            for _ in range(150):
+                element_a, element_b = random.choice(elements), random.choice(elements)
+                forest.union(element_a, element_b)
+                old_label, new_label = labels[element_a], labels[element_b]
+                for element in elements:
+                    if labels[element] == old_label:
+                        labels[element] = new_label
+            expected = {}
+            for element, label in labels.items():
+                expected.setdefault(label, set()).add(element)
+            self.assertEqual(
+                sorted(sorted(group) for group in expected.values()),
+                sorted(sorted(group) for group in forest.groups().values())
+            )
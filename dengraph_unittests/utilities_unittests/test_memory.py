@@ -0,0 +1,43 @@
+import sys
+
+from dengraph_unittests.utility import unittest
+
+from dengraph.utilities.memory import sizeof_containers, sizeof_objects
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.graphs.distance_graph import DistanceGraph, CachedDistanceGraph
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.dengraph import DenGraphIO, NonOverlappingDenGraph
+from dengraph.interned import StaticInternedDenGraph
+
+
+class TestMemory(unittest.TestCase):
+    def test_helpers(self):
+        containers = [{1, 2, 3}, {1: 2}, []]
+        self.assertEqual(sum(sys.getsizeof(container) for container in containers), sizeof_containers(containers))
+        value = 1.5
+        self.assertEqual(sys.getsizeof(value), sizeof_objects([value, value]))
+        self.assertEqual(0, sizeof_objects([]))
+
+    def test_graphs(self):
+        nodes = [float(node) for node in range(50)]
+        distance_graph = DistanceGraph(nodes, DeltaDistance(), symmetric=True)
+        cached_graph = CachedDistanceGraph(nodes, DeltaDistance(), symmetric=True)
+        self.assertEqual({'node_table'}, set(distance_graph.memory_usage()))
+        self.assertEqual(0, cached_graph.memory_usage()['distance_cache'] - sys.getsizeof({}))
+        list(cached_graph.get_neighbours(0.0, 5))
+        self.assertGreater(cached_graph.memory_usage()['distance_cache'], sys.getsizeof({}))
+        adjacency_graph = AdjacencyGraph(distance_graph, max_distance=2, symmetric=True)
+        usage = adjacency_graph.memory_usage()
+        self.assertEqual({'node_table', 'adjacency', 'edge_values'}, set(usage))
+        wide_usage = AdjacencyGraph(distance_graph, max_distance=10, symmetric=True).memory_usage()
+        self.assertEqual(usage['node_table'], wide_usage['node_table'])
+        self.assertGreater(wide_usage['edge_values'], usage['edge_values'])
+
+    def test_clusterings(self):
+        graph = CachedDistanceGraph([1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20, 40], DeltaDistance())
+        for clustering_class in (DenGraphIO, NonOverlappingDenGraph, StaticInternedDenGraph):
+            with self.subTest(clustering_class=clustering_class):
+                usage = clustering_class(graph, cluster_distance=5, core_neighbours=5).memory_usage()
+                self.assertIn('clusters', usage)
+                self.assertIn('noise', usage)
+                self.assertTrue(all(size > 0 for size in usage.values()))
@@ -0,0 +1,19 @@
+from dengraph_unittests.utility import unittest
+
+from dengraph.utilities.node_table import NodeTable
+
+
+class TestNodeTable(unittest.TestCase):
+    def test_ids(self):
+        table = NodeTable(['a', 'b', 'c'])
+        self.assertEqual(3, len(table))
+        self.assertEqual(['a', 'b', 'c'], list(table))
+        self.assertEqual(1, table.add('b'))
+        self.assertEqual(3, table.add('d'))
+        for node_id, node in enumerate(table):
+            self.assertEqual(node_id, table.node_id(node))
+            self.assertEqual(node, table[node_id])
+        self.assertIn('d', table)
+        self.assertNotIn('e', table)
+        with self.assertRaises(KeyError):
+            table.node_id('e')
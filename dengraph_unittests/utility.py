@@ -1,7 +1,202 @@
 """
 Utilities for testing
 """
+import random
+
+import dengraph.graph
+import dengraph.graphs.adjacency_graph
+import dengraph.graphs.distance_graph
+import dengraph.distances.euclidean_distance
+import dengraph.dengraph
+
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
+
+
+def random_nodes(length, base):
+    """Create `length` random integer nodes between `base` and `2*base`"""
+    return [random.randint(base, 2*base) for _ in range(length)]
+
+
+def make_points(rng, count, dimensions):
+    """Create up to `count` unique random points with `dimensions` coordinates between `-1` and `1`"""
+    return list({tuple(rng.uniform(-1, 1) for _ in range(dimensions)) for _ in range(count)})
+
+
+def two_cluster_graph():
+    """
+    Create a graph of two clusters, nodes `1` to `3` and `5` to `8`, plus the unconnected node `4`
+
+    All edges have the distance `1`. With a cluster distance of `1` and `2`
+    core neighbours, all connected nodes are core nodes.
+    """
+    graph = dengraph.graphs.adjacency_graph.AdjacencyGraph({node: {} for node in range(1, 9)}, symmetric=True)
+    for node_a, node_b in ((1, 2), (1, 3), (2, 3), (5, 6), (5, 7), (5, 8), (6, 7), (6, 8), (7, 8)):
+        graph[node_a:node_b] = 1
+    return graph
+
+
+class ClusteringTestCase(unittest.TestCase):
+    """Test case with assertions comparing clusterings"""
+    def assertSameClustering(self, expected, clustering):
+        """Assert that two clusterings of the same graph have the same clusters, noise and memberships"""
+        self.assertEqual(len(expected.clusters), len(clustering.clusters))
+        self.assertEqual(expected, clustering)
+        self.assertEqual(expected.noise, clustering.noise)
+        for node in expected.graph:
+            self.assertEqual(node in expected, node in clustering)
+            self.assertEqual(
+                sorted(map(len, expected.clusters_for_node(node))),
+                sorted(map(len, clustering.clusters_for_node(node)))
+            )
+
+
+class GraphTestMixin(object):
+    """
+    Tests shared by all graph backends, comparing a graph to its expected adjacency
+
+    Test cases must derive from :py:class:`unittest.TestCase` as well, and
+    implement :py:meth:`make_graph`. Backend specific assertions go into
+    the test case itself.
+    """
+    #: a node which is not part of the graph
+    missing_node = None
+
+    def make_graph(self):
+        """Create a symmetric graph and its expected adjacency as `graph, {node: {neighbour: distance, ...}, ...}`"""
+        raise NotImplementedError
+
+    def test_init(self):
+        graph, adjacency = self.make_graph()
+        self.assertEqual(len(adjacency), len(graph))
+        self.assertEqual(set(adjacency), set(graph))
+        self.assertTrue(graph.symmetric)
+        for node in adjacency:
+            self.assertIn(node, graph)
+        self.assertNotIn(self.missing_node, graph)
+        self.assertNotIn([], graph)
+
+    def test_access(self):
+        graph, adjacency = self.make_graph()
+        distances = sorted({distance for edges in adjacency.values() for distance in edges.values()})
+        for node, edges in adjacency.items():
+            self.assertEqual(edges, graph[node])
+            self.assertEqual(set(edges), set(graph.get_neighbours(node)))
+            for distance in distances:
+                self.assertEqual(
+                    {neighbour for neighbour, edge in edges.items() if edge <= distance},
+                    set(graph.get_neighbours(node, distance)),
+                )
+            for other in adjacency:
+                if other in edges:
+                    self.assertIn(slice(node, other), graph)
+                    self.assertEqual(edges[other], graph[node:other])
+                elif other != node:
+                    self.assertNotIn(slice(node, other), graph)
+                    with self.assertRaises(dengraph.graph.NoSuchEdge):
+                        graph[node:other]
+            self.assertNotIn(slice(node, self.missing_node), graph)
+            with self.assertRaises(dengraph.graph.NoSuchEdge):
+                graph[node:self.missing_node]
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            graph[self.missing_node]
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            list(graph.get_neighbours(self.missing_node))
+
+    def test_modify(self):
+        graph, adjacency = self.make_graph()
+        node_a, node_b = list(adjacency)[:2]
+        with self.assertRaises(TypeError):
+            graph[self.missing_node] = {node_a: 1}
+        with self.assertRaises(TypeError):
+            graph[node_a:node_b] = 1
+        with self.assertRaises(TypeError):
+            del graph[node_a:node_b]
+        self.assertEqual(adjacency, {node: graph[node] for node in graph})
+
+
+class PointGraphTestMixin(GraphTestMixin):
+    """
+    Tests shared by graph backends of points, comparing them to a :py:class:`~dengraph.graphs.distance_graph.DistanceGraph`
+
+    Test cases must implement :py:meth:`make_point_graph`.
+    """
+    #: points of the graph created by :py:meth:`make_graph`
+    points = [(0, 0), (0.5, 0), (0, 0.9), (2, 2)]
+    missing_node = (1, 1)
+    #: whether graphs connect all points, regardless of the maximum distance
+    connects_all = False
+
+    def make_point_graph(self, points, max_distance=1):
+        """Create a graph of `points`, connecting at least all points up to `max_distance`"""
+        raise NotImplementedError
+
+    def make_graph(self):
+        # duplicate points are added only once
+        graph = self.make_point_graph(self.points + self.points[:1])
+        distance = dengraph.distances.euclidean_distance.EuclideanDistance()
+        return graph, {
+            point: {
+                other: distance(point, other) for other in self.points
+                if other != point and (self.connects_all or distance(point, other) <= 1)
+            }
+            for point in self.points
+        }
+
+    def test_init(self):
+        super(PointGraphTestMixin, self).test_init()
+        self.assertEqual(0, len(self.make_point_graph([])))
+        with self.assertRaises(ValueError):
+            self.make_point_graph([(0, 0), (1, 1, 1)])
+
+    def test_modify(self):
+        super(PointGraphTestMixin, self).test_modify()
+        graph = self.make_point_graph([(0, 0), (2, 2)])
+        graph[(0.5, 0.5)] = None
+        self.assertEqual(3, len(graph))
+        self.assertEqual({(0.5, 0.5)}, set(graph.get_neighbours((0, 0), 1)))
+        del graph[(0.5, 0.5)]
+        self.assertEqual(2, len(graph))
+        self.assertEqual(set(), set(graph.get_neighbours((0, 0), 1)))
+        with self.assertRaises(dengraph.graph.NoSuchNode):
+            del graph[(0.5, 0.5)]
+        with self.assertRaises(ValueError):
+            graph[(1, 1, 1)] = None
+        del graph[(0, 0)]
+        del graph[(2, 2)]
+        self.assertEqual(0, len(graph))
+        self.assertEqual([], list(graph))
+
+    def test_clustering(self):
+        """Clusters are the same as for all pairs of points, also after incremental updates"""
+        rng = random.Random(42)
+        for dimensions, cluster_distance in ((2, 0.15), (3, 0.2), (3, 0.4)):
+            with self.subTest(dimensions=dimensions, cluster_distance=cluster_distance):
+                rng = random.Random(42)
+                points = make_points(rng, 300, dimensions)
+                expected = dengraph.dengraph.DenGraphIO(
+                    dengraph.graphs.distance_graph.DistanceGraph(
+                        points, dengraph.distances.euclidean_distance.EuclideanDistance()
+                    ),
+                    cluster_distance, 5
+                )
+                clustering = dengraph.dengraph.DenGraphIO(
+                    self.make_point_graph(points, max_distance=cluster_distance), cluster_distance, 5
+                )
+                self.assertEqual(
+                    sorted(sorted(cluster) for cluster in expected.clusters),
+                    sorted(sorted(cluster) for cluster in clustering.clusters),
+                )
+                for point in points[:100]:
+                    del expected[point]
+                    del clustering[point]
+                for point in make_points(rng, 100, dimensions):
+                    expected[point] = None
+                    clustering[point] = None
+                self.assertEqual(
+                    sorted(sorted(cluster) for cluster in expected.clusters),
+                    sorted(sorted(cluster) for cluster in clustering.clusters),
+                )
+                self.assertEqual(expected.noise, clustering.noise)